@@ -0,0 +1,90 @@
+import dataclasses
+import random
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from instance import default_instance, random_instance
+from optimisetester import build_model, solve, time_matrices
+from precheck import earliest_arrivals, useless_arcs
+from sparsify import covers, neighbour_arcs, sparse_arcs, sparse_solve
+
+#-----------------------------------------------------------------------------------------
+# Nearest-neighbour arcs: restricted models vs the full arc set
+#-----------------------------------------------------------------------------------------
+
+def run_case(inst, k):
+    """sparse_solve of `inst` and the full model with the same arcs fixed unused."""
+    t, t_prime = time_matrices(inst)
+    result = sparse_solve(inst, k, t, t_prime, max_time_in_seconds=20, num_search_workers=1)
+    model, var = build_model(inst, t, t_prime)
+    for key, v in var["x"].items():
+        if key not in result["var"]["x"]:
+            model.Add(v == 0)
+    solver, status = solve(model, max_time_in_seconds=20, num_search_workers=1)
+    assert result["status"] == status
+    if status == cp_model.OPTIMAL:
+        assert result["plan"]["objective"] == solver.ObjectiveValue()
+    return result
+
+#-----------------------------------------------------------------------------------------
+# Tests
+#-----------------------------------------------------------------------------------------
+def test_neighbour_arcs_mask():
+    inst = random_instance(random.Random(1), 30, N=2, grid=40)
+    t, _ = time_matrices(inst)
+    arcs = neighbour_arcs(t, 4)
+    assert (arcs == arcs.T).all() and not arcs.diagonal().any()
+    assert arcs[0, 1:].all() and arcs[1:, 0].all()
+    assert (arcs[1:].sum(axis=1) >= 4).all()
+    assert neighbour_arcs(t, 30).sum() == 31 * 30
+
+def test_full_mask_builds_the_same_model():
+    inst = default_instance()
+    t, t_prime = time_matrices(inst)
+    full, _ = build_model(inst, t, t_prime)
+    masked, _ = build_model(inst, t, t_prime, arcs=neighbour_arcs(t, inst.num_nodes - 1))
+    assert str(masked.Proto()) == str(full.Proto())
+
+def test_sparse_default_instance_keeps_optimum():
+    result = run_case(default_instance(), 2)
+    assert result["plan"]["objective"] == 433
+    assert result["arcs"] < default_instance().num_nodes * (default_instance().num_nodes - 1)
+
+def test_sparse_is_a_restriction():
+    rng = random.Random(0)
+    for _ in range(8):
+        inst = random_instance(rng, rng.randint(5, 7), N=rng.randint(1, 2))     # T == horizon
+        result = run_case(inst, 1)
+        assert len(result["var"]["x"]) == inst.N * result["arcs"]
+
+def test_sparse_widens_while_infeasible():
+    inst = dataclasses.replace(default_instance(), T=10, horizon=10)
+    result = run_case(inst, 2)
+    assert result["status"] == cp_model.INFEASIBLE
+    assert result["k"] == inst.num_nodes - 1 and len(result["rounds"]) > 1
+
+def test_sparse_arcs_widen_for_useless_neighbours():
+    inst = default_instance()
+    t, _ = time_matrices(inst)
+    usable = ~useless_arcs(inst, t, earliest_arrivals(inst, t)) & ~np.eye(inst.num_nodes, dtype=bool)
+    assert not covers(neighbour_arcs(t, 1), usable)
+    k, arcs = sparse_arcs(inst, t, 1)
+    assert k > 1 and covers(arcs, usable)
+
+def test_sparse_arc_reduction_at_scale():
+    inst = random_instance(random.Random(2), 120, N=2, grid=100, horizon=120)
+    t, _ = time_matrices(inst)
+    k, arcs = sparse_arcs(inst, t, 5)
+    assert arcs.sum() * 10 <= inst.num_nodes * (inst.num_nodes - 1)
+
+#-----------------------------------------------------------------------------------------
+# Feedback
+#-----------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    for n in (8, 12):
+        inst = random_instance(random.Random(n), n, N=2, grid=25, horizon=60)
+        for k in (2, 4):
+            result = run_case(inst, k)
+            print(f"n={n}, k={result['k']}: {result['arcs']} arcs, objective {result['plan']['objective']}, "
+                  f"rounds {result['rounds']}")
@@ -0,0 +1,123 @@
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ortools.sat.python import cp_model
+
+from asyncsolve import AsyncSolve, solve_async
+from instance import default_instance, random_instance
+from optimisetester import build_model, solve
+
+#-----------------------------------------------------------------------------------------
+# Asyncio solve: executor threads, incumbent streams and cancellation
+#-----------------------------------------------------------------------------------------
+
+def run_case(coroutine):
+    return asyncio.run(coroutine)
+
+def hard_instance():
+    return random_instance(random.Random(3), 14, N=3, grid=25, horizon=120)
+
+async def ticker(gaps, stop):
+    # Longest pause of the event loop while solves are running
+    last = time.time()
+    while not stop.is_set():
+        await asyncio.sleep(0.01)
+        gaps.append(time.time() - last)
+        last = time.time()
+
+#-----------------------------------------------------------------------------------------
+# Tests
+#-----------------------------------------------------------------------------------------
+def test_solve_async_matches_solve():
+    model, _ = build_model(default_instance())
+    solver, status = run_case(solve_async(model, max_time_in_seconds=20))
+    direct, direct_status = solve(build_model(default_instance())[0], max_time_in_seconds=20)
+    assert status == direct_status == cp_model.OPTIMAL
+    assert solver.ObjectiveValue() == direct.ObjectiveValue()
+
+def test_incumbents_stream():
+    inst = random_instance(random.Random(2), 8, N=2)
+    model, var = build_model(inst)
+
+    async def main():
+        run = AsyncSolve(model, var, inst, max_time_in_seconds=20)
+        incumbents = [incumbent async for incumbent in run]
+        return incumbents, await run
+
+    incumbents, (solver, status) = run_case(main())
+    assert status == cp_model.OPTIMAL and incumbents
+    objectives = [i["objective"] for i in incumbents]
+    assert objectives == sorted(objectives, reverse=True) and objectives[-1] == solver.ObjectiveValue()
+    assert incumbents[-1]["plan"]["objective"] == solver.ObjectiveValue()
+
+def test_cancel_stops_search():
+    model, _ = build_model(hard_instance())
+
+    async def main():
+        run = AsyncSolve(model, max_time_in_seconds=60, num_search_workers=2)
+        task = asyncio.create_task(run.wait())
+        await asyncio.sleep(0.5)
+        start = time.time()
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        return run, time.time() - start, task.cancelled()
+
+    run, elapsed, cancelled = run_case(main())
+    assert cancelled and run.future.done() and elapsed < 10
+    assert run.solver.WallTime() < 30
+
+def test_leaving_context_stops_search():
+    model, _ = build_model(hard_instance())
+
+    async def main():
+        async with AsyncSolve(model, max_time_in_seconds=60, num_search_workers=2) as run:
+            async for incumbent in run:
+                break
+        return run, incumbent
+
+    run, incumbent = run_case(main())
+    assert run.future.done() and "objective" in incumbent
+    assert run.solver.WallTime() < 30
+
+def test_concurrent_solves_keep_loop_responsive():
+    instances = [random_instance(random.Random(seed), 7, N=2) for seed in range(4)]
+    models = [build_model(inst)[0] for inst in instances]
+
+    async def main(executor):
+        gaps, stop = [], asyncio.Event()
+        tick = asyncio.create_task(ticker(gaps, stop))
+        results = await asyncio.gather(*(solve_async(m, 20, 2, executor=executor) for m in models))
+        stop.set()
+        await tick
+        return results, max(gaps)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results, gap = run_case(main(executor))
+    assert all(status == cp_model.OPTIMAL for _, status in results)
+    for (solver, _), inst in zip(results, instances):
+        assert solver.ObjectiveValue() == solve(build_model(inst)[0], 20)[0].ObjectiveValue()
+    assert gap < 0.5
+
+#-----------------------------------------------------------------------------------------
+# Feedback
+#-----------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    async def main(count):
+        models = [build_model(random_instance(random.Random(seed), 8, N=2))[0] for seed in range(count)]
+        gaps, stop = [], asyncio.Event()
+        tick = asyncio.create_task(ticker(gaps, stop))
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            await asyncio.gather(*(solve_async(m, 30, 2, executor=executor) for m in models))
+        stop.set()
+        await tick
+        print(f"{count} concurrent solves in {time.time() - start:.2f}s, "
+              f"longest event loop pause {max(gaps) * 1000:.1f}ms")
+
+    for count in (1, 4, 8):
+        asyncio.run(main(count))
@@ -0,0 +1,138 @@
+import asyncio
+
+from ortools.sat.python import cp_model
+
+from optimisetester import apply_params, solution_plan
+
+# ---------------- Asyncio Solve ----------------
+# Runs CP-SAT in an executor thread so a solve never blocks the event loop.
+# Improving solutions are passed back to the loop as they are found and read
+# with `async for`; awaiting the solve gives (solver, status) like
+# optimisetester.solve. Cancelling the task that awaits either one calls
+# StopSearch() and waits for the worker thread to return before re-raising,
+# so cancelled requests do not leave solver threads behind.
+#
+#   async with AsyncSolve(model, var, inst, max_time_in_seconds=30) as run:
+#       async for incumbent in run:
+#           print(incumbent["objective"], incumbent["bound"])
+#       solver, status = await run
+#
+# Leaving the `async with` block early stops the search as well. With an
+# executor of fixed size, at most that many solves run at a time and the
+# others wait for a free thread.
+
+
+class _Incumbents(cp_model.CpSolverSolutionCallback):
+    """Hands each solution over to the event loop (runs in the solver thread)."""
+
+    def __init__(self, run, loop):
+        super().__init__()
+        self.run, self.loop = run, loop
+
+    def on_solution_callback(self):
+        incumbent = {"objective": self.ObjectiveValue(), "bound": self.BestObjectiveBound(),
+                     "wall_time": self.WallTime()}
+        if self.run.var is not None and self.run.inst is not None:
+            incumbent["plan"] = solution_plan(self, self.run.var, self.run.inst)
+        self.loop.call_soon_threadsafe(self.run.queue.put_nowait, incumbent)
+
+
+class AsyncSolve:
+    """One solve of `model` in an executor thread; an async iterator over its
+    incumbents and an awaitable of (solver, status).
+
+    With `var` and `inst`, every incumbent carries its solution_plan().
+    """
+
+    def __init__(self, model, var=None, inst=None, max_time_in_seconds=30, num_search_workers=8,
+                 params=None, executor=None):
+        self.model, self.var, self.inst = model, var, inst
+        self.executor = executor
+        self.solver = cp_model.CpSolver()
+        self.solver.parameters.max_time_in_seconds = max_time_in_seconds
+        self.solver.parameters.num_search_workers = num_search_workers
+        if params:
+            apply_params(self.solver, params)
+        self.queue = None
+        self.future = None
+
+    def start(self):
+        """Submit the solve to the executor (done on first use)."""
+        if self.future is None:
+            loop = asyncio.get_running_loop()
+            self.queue = asyncio.Queue()
+            callback = _Incumbents(self, loop)
+            self.future = loop.run_in_executor(self.executor, self.solver.Solve, self.model, callback)
+            self.future.add_done_callback(lambda _: self.queue.put_nowait(None))
+        return self
+
+    async def stop(self):
+        """Stop the search and wait until the solver thread has returned."""
+        if self.future is None:
+            return
+        # StopSearch() is dropped before the search starts, so keep repeating it
+        while not self.future.done():
+            self.solver.StopSearch()
+            await asyncio.wait([self.future], timeout=0.05)
+
+    async def _guard(self, awaitable):
+        try:
+            return await awaitable
+        except asyncio.CancelledError:
+            await self.stop()
+            raise
+
+    def __aiter__(self):
+        return self.start()
+
+    async def __anext__(self):
+        incumbent = await self._guard(self.start().queue.get())
+        if incumbent is None:
+            self.queue.put_nowait(None)         # later reads end as well
+            raise StopAsyncIteration
+        return incumbent
+
+    async def wait(self):
+        status = await self._guard(asyncio.shield(self.start().future))
+        return self.solver, status
+
+    def __await__(self):
+        return self.wait().__await__()
+
+    async def __aenter__(self):
+        return self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+
+async def solve_async(model, max_time_in_seconds=30, num_search_workers=8, params=None, executor=None):
+    """Awaitable counterpart of optimisetester.solve; returns (solver, status)."""
+    return await AsyncSolve(model, max_time_in_seconds=max_time_in_seconds,
+                            num_search_workers=num_search_workers, params=params, executor=executor)
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    from instance import random_instance
+    from optimisetester import build_model
+
+    async def main():
+        start = time.time()
+        runs = []
+        for seed in range(4):
+            inst = random_instance(random.Random(seed), 8, N=2)
+            model, var = build_model(inst)
+            runs.append(AsyncSolve(model, var, inst, max_time_in_seconds=20, num_search_workers=2))
+
+        async def report(n, run):
+            async for incumbent in run:
+                print(f"{time.time() - start:6.2f}s  solve {n}: {incumbent['objective']}")
+            solver, status = await run
+            print(f"{time.time() - start:6.2f}s  solve {n}: {solver.StatusName(status)}")
+
+        await asyncio.gather(*(report(n, run) for n, run in enumerate(runs)))
+
+    asyncio.run(main())
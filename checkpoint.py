@@ -0,0 +1,163 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+from ortools.sat.python import cp_model
+
+from instance import instance_from_dict, instance_to_dict
+from optimisetester import EarlyStop, build_model, plan_to_json, solution_plan, solve
+from solcache import add_hint, request_key, solution_values
+
+# ---------------- Incumbent Checkpoints ----------------
+# Long solves write their best solution to a JSON file as they go, so a crash
+# or preemption only loses the time since the last write. A checkpoint holds
+# the instance and model options, the objective and bound, the variable values
+# (as solcache entries store them) and the plan. Files are written to a
+# temporary name and renamed over the old one, so a reader never sees half a
+# checkpoint.
+#
+# Without an interval every improving solution is written; with one, at most
+# one write happens per interval and the latest incumbent is flushed by the
+# solve's watch thread when the interval is up. The callback then only copies
+# the raw solution vector (values are unreadable once it returns); the values
+# and plan are built from it by the write, for the incumbents actually
+# written. Resuming rebuilds the model from the checkpoint and hints every
+# variable with its values; further checkpoints go to the same file and only
+# replace it with better solutions.
+
+
+def write_checkpoint(path, entry):
+    """Atomically replace `path` with the JSON of `entry`."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(entry, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+class _Snapshot:
+    """Solution vector copied out of a solution callback, read like a solver."""
+
+    def __init__(self, solution, objective):
+        self.solution, self.objective = solution, objective
+
+    def Value(self, v):
+        return self.solution[v.Index()]
+
+    def ObjectiveValue(self):
+        return self.objective
+
+
+class Checkpoints(EarlyStop):
+    """EarlyStop callback that also checkpoints the incumbent to `path`.
+
+    `best` is the objective already on disk (a resumed checkpoint); only
+    better solutions replace it. Other keyword arguments are EarlyStop's
+    termination criteria.
+    """
+
+    def __init__(self, path, var, inst, interval=None, compact_delay=False, best=None, **criteria):
+        super().__init__(**criteria)
+        self.path, self.var, self.inst = path, var, inst
+        self.interval = interval
+        self.compact_delay = compact_delay
+        self.best_written = best
+        self.pending = None
+        self.last_write = time.time()
+        self.writes = 0
+        self.write_lock = threading.Lock()
+
+    def watching(self):
+        return self.interval is not None or super().watching()
+
+    def on_solution_callback(self):
+        super().on_solution_callback()
+        objective = self.ObjectiveValue()
+        if self.best_written is not None and objective >= self.best_written:
+            return
+        self.pending = {"status": "FEASIBLE", "objective": objective, "bound": self.BestObjectiveBound(),
+                        "wall_time": self.WallTime(), "solution": list(self.Response().solution)}
+        if self.interval is None:
+            self.flush()
+
+    def tick(self, solver):
+        if self.interval is not None and time.time() - self.last_write >= self.interval:
+            self.flush()
+        return super().tick(solver)
+
+    def flush(self):
+        """Write the pending incumbent, if any; True when something was written."""
+        with self.write_lock:
+            entry, self.pending = self.pending, None
+            if entry is None or (self.best_written is not None and entry["objective"] > self.best_written):
+                return False
+            if "solution" in entry:
+                snapshot = _Snapshot(entry.pop("solution"), entry["objective"])
+                entry.update(values=solution_values(snapshot, self.var),
+                             plan=plan_to_json(solution_plan(snapshot, self.var, self.inst)))
+            write_checkpoint(self.path, dict(
+                entry, key=request_key(self.inst, compact_delay=self.compact_delay),
+                instance=instance_to_dict(self.inst), compact_delay=self.compact_delay, written=time.time()))
+            self.best_written = entry["objective"]
+            self.last_write = time.time()
+            self.writes += 1
+            return True
+
+    def finish(self, solver, status):
+        """Final write once the solve has returned, with its status."""
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            self.pending = {"status": solver.StatusName(status), "objective": solver.ObjectiveValue(),
+                            "bound": solver.BestObjectiveBound(), "wall_time": solver.WallTime(),
+                            "values": solution_values(solver, self.var),
+                            "plan": plan_to_json(solution_plan(solver, self.var, self.inst))}
+        self.flush()
+
+
+def checkpointed_solve(inst, path, interval=None, resume=False, compact_delay=False,
+                       max_time_in_seconds=30, num_search_workers=8, params=None, log=None, **criteria):
+    """Solve `inst` writing checkpoints to `path`; returns (solver, status,
+    model, var, checkpoints), the instance solved being checkpoints.inst.
+
+    With resume and an existing checkpoint, `inst` may be None (the instance
+    is read from the checkpoint); a given one must match the checkpointed
+    instance. EarlyStop criteria (relative_gap, stagnation_time, ...) pass
+    through.
+    """
+    entry = load_checkpoint(path) if resume and os.path.exists(path) else None
+    if entry is not None:
+        saved = instance_from_dict(entry["instance"])
+        if inst is not None and request_key(inst, compact_delay=compact_delay) != entry["key"]:
+            raise ValueError(f"Checkpoint {path} is for a different instance or model")
+        inst, compact_delay = saved, entry["compact_delay"]
+    model, var = build_model(inst, compact_delay=compact_delay)
+    if entry is not None:
+        add_hint(model, var, entry)
+    checkpoints = Checkpoints(path, var, inst, interval, compact_delay,
+                              None if entry is None else entry["objective"], **criteria)
+    solver, status = solve(model, max_time_in_seconds, num_search_workers, params, checkpoints, log)
+    checkpoints.finish(solver, status)
+    return solver, status, model, var, checkpoints
+
+
+if __name__ == "__main__":
+    import random
+
+    from instance import random_instance
+
+    inst = random_instance(random.Random(3), 14, N=3, grid=25, horizon=120)
+    path = os.path.join(tempfile.mkdtemp(), "checkpoint.json")
+    for phase in range(3):
+        solver, status, _, _, checkpoints = checkpointed_solve(inst, path, interval=1.0, resume=True,
+                                                            max_time_in_seconds=10)
+        saved = load_checkpoint(path) if os.path.exists(path) else {"status": None, "objective": None}
+        print(f"phase {phase}: {solver.StatusName(status)} {solver.ObjectiveValue()}, "
+              f"{checkpoints.writes} writes, checkpoint {saved['status']} {saved['objective']}")
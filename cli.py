@@ -0,0 +1,284 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+from instance import (default_instance, load_instance, model_size, random_instance,
+                      save_instance, validate_instance)
+
+# ---------------- Command Line ----------------
+# Entry point for the tandem model. Only solve and benchmark import ortools and
+# numpy (through optimisetester), so validate, stats and generate start in a
+# fraction of the time.
+#
+#   python cli.py solve [INSTANCE] [--time-limit S] [--workers W] [--profile FILE] [--json]
+#                       [--backend wrapper|proto] [--metrics] [--prune] [--neighbours K]
+#                       [--checkpoint FILE [--checkpoint-interval S] [--resume]]
+#   python cli.py benchmark [--instances N] [--nodes n] [--tandems K] [--backend wrapper|proto]
+#   python cli.py diagnose [INSTANCE] [--time-limit S] [--workers W] [--json]
+#   python cli.py precheck [INSTANCE] [--json]
+#   python cli.py validate INSTANCE
+#   python cli.py stats [INSTANCE]
+#   python cli.py generate --nodes n [--tandems K] [--seed S] [-o FILE]
+
+# Wall-clock budget for `python cli.py validate|stats|generate`, checked by the tests
+STARTUP_BUDGET_SECONDS = 0.5
+
+
+def _instance(path):
+    return default_instance() if path is None else load_instance(path)
+
+
+def _builder(backend):
+    if backend == "proto":
+        from protobuild import build_model
+    else:
+        from optimisetester import build_model
+    return build_model
+
+
+def cmd_solve(args):
+    from optimisetester import (EarlyStop, load_profile, plan_to_json, print_solution_min,
+                                solution_plan, solve)
+
+    # Options whose build paths do not combine, or that need another option
+    conflicts = [(a, b) for a, b, given in (
+        ("--neighbours", "cannot be combined with --backend proto",
+         args.neighbours is not None and args.backend == "proto"),
+        ("--checkpoint", "cannot be combined with --backend proto",
+         args.checkpoint and args.backend == "proto"),
+        ("--checkpoint", "cannot be combined with --neighbours",
+         args.checkpoint and args.neighbours is not None),
+        ("--checkpoint", "cannot be combined with --prune", args.checkpoint and args.prune),
+        ("--resume", "needs --checkpoint", args.resume and not args.checkpoint)) if given]
+    if conflicts:
+        for a, b in conflicts:
+            print(f"{a} {b}", file=sys.stderr)
+        return 2
+    inst = _instance(args.instance)
+    errors = validate_instance(inst)
+    if errors:
+        print("\n".join(errors), file=sys.stderr)
+        return 2
+    params = load_profile(args.profile) if args.profile else None
+    log = None
+    if args.metrics:
+        from solverlog import SearchLog, solve_metrics
+        log = SearchLog()
+    if args.checkpoint:
+        from checkpoint import checkpointed_solve
+
+        # Resuming without an instance argument solves the checkpointed one
+        resumed = args.resume and args.instance is None and os.path.exists(args.checkpoint)
+        try:
+            solver, status, model, var, early_stop = checkpointed_solve(
+                None if resumed else inst, args.checkpoint, args.checkpoint_interval, args.resume,
+                args.compact_delay, args.time_limit, args.workers, params, log,
+                relative_gap=args.gap, stagnation_time=args.stagnation)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 2
+        inst = early_stop.inst
+    else:
+        report = {}
+        if args.prune:
+            from precheck import precheck
+
+            report = precheck(inst)
+            if not report["feasible"]:
+                print("Infeasible before solving:\n  " + "\n  ".join(report["reasons"]), file=sys.stderr)
+                return 1
+        if args.neighbours is not None:
+            from optimisetester import build_model, time_matrices
+            from sparsify import sparse_arcs
+
+            _, arcs = sparse_arcs(inst, time_matrices(inst)[0], args.neighbours)
+            model, var = build_model(inst, compact_delay=args.compact_delay, arcs=arcs, prune=report)
+        elif args.backend == "proto":
+            model, var = _builder(args.backend)(inst, compact_delay=args.compact_delay)
+            if report:
+                from precheck import prune
+
+                prune(model, var, report)
+        else:
+            model, var = _builder(args.backend)(inst, compact_delay=args.compact_delay, prune=report)
+        early_stop = EarlyStop(relative_gap=args.gap, stagnation_time=args.stagnation)
+        solver, status = solve(model, args.time_limit, args.workers, params, early_stop, log)
+    if args.json:
+        result = {"status": solver.StatusName(status), "stop_reason": early_stop.reason,
+                  "wall_time": solver.WallTime()}
+        if solver.StatusName(status) in ("OPTIMAL", "FEASIBLE"):
+            result["bound"] = solver.BestObjectiveBound()
+            result["plan"] = plan_to_json(solution_plan(solver, var, inst))
+        if log is not None:
+            result["metrics"] = solve_metrics(solver, model, log)
+        print(json.dumps(result, indent=2))
+    else:
+        print_solution_min(solver, status, var, inst)
+        print("\nStop reason:", early_stop.reason)
+        if solver.StatusName(status) == "INFEASIBLE":
+            print("Run `python cli.py diagnose` on this instance to see which constraints conflict.")
+    return 0
+
+
+def cmd_diagnose(args):
+    from diagnose import diagnose, explain
+
+    inst = _instance(args.instance)
+    result = diagnose(inst, compact_delay=args.compact_delay, max_time_in_seconds=args.time_limit,
+                      num_search_workers=args.workers)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print("\n".join(explain(result)))
+    return 1 if result["status"] == "INFEASIBLE" else 0
+
+
+def cmd_precheck(args):
+    from precheck import precheck
+
+    report = precheck(_instance(args.instance))
+    del report["useless"]
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print("feasible:", report["feasible"])
+        for reason in report["reasons"]:
+            print("  ", reason)
+        print("lower bound:", report["lower_bound"])
+        print("never served:", report["unserved"] or "none")
+        print("always late:", ", ".join(f"{j} (+{late:g})" for j, late in report["late"].items()) or "none")
+        print("unserved at least:", report["min_unserved"])
+        print("fixed to zero:", ", ".join(f"{f} {count}" for f, count in report["removed"].items()))
+    return 0 if report["feasible"] else 1
+
+
+def cmd_benchmark(args):
+    import random
+
+    from optimisetester import solve, time_matrices
+
+    build_model = _builder(args.backend)
+    rng = random.Random(args.seed)
+    print(f"{'#':>3} {'status':>10} {'objective':>10} {'bound':>10} {'build s':>8} {'solve s':>8}")
+    for n in range(args.instances):
+        inst = random_instance(rng, args.nodes, N=args.tandems)
+        start = time.time()
+        t, t_prime = time_matrices(inst)
+        model, _ = build_model(inst, t, t_prime, compact_delay=args.compact_delay)
+        build = time.time() - start
+        solver, status = solve(model, args.time_limit, args.workers)
+        print(f"{n:>3} {solver.StatusName(status):>10} {solver.ObjectiveValue():>10.1f} "
+              f"{solver.BestObjectiveBound():>10.1f} {build:>8.3f} {solver.WallTime():>8.3f}")
+    return 0
+
+
+def cmd_validate(args):
+    try:
+        inst = load_instance(args.instance)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"{args.instance}: cannot read instance: {type(e).__name__}: {e}")
+        return 2
+    errors = validate_instance(inst)
+    for error in errors:
+        print(f"{args.instance}: {error}")
+    if not errors:
+        print(f"{args.instance}: ok ({len(inst.C)} affected areas, {inst.N} tandems)")
+    return 1 if errors else 0
+
+
+def cmd_stats(args):
+    inst = _instance(args.instance)
+    for name, count in model_size(inst, args.compact_delay).items():
+        print(f"{name:>13} {count}")
+    return 0
+
+
+def cmd_generate(args):
+    inst = random_instance(args.seed, args.nodes, N=args.tandems, grid=args.grid, horizon=args.horizon)
+    if args.output:
+        save_instance(inst, args.output)
+    else:
+        from instance import instance_to_dict
+        print(json.dumps(instance_to_dict(inst), indent=2))
+    return 0
+
+
+def parser():
+    p = argparse.ArgumentParser(prog="cli.py", description="Truck-drone tandem model.")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    s = sub.add_parser("solve", help="solve an instance file (default: the built-in scenario)")
+    s.add_argument("instance", nargs="?")
+    s.add_argument("--time-limit", type=float, default=30)
+    s.add_argument("--workers", type=int, default=8)
+    s.add_argument("--profile", help="parameter profile written by tune.py")
+    s.add_argument("--gap", type=float, default=None, help="relative gap target")
+    s.add_argument("--stagnation", type=float, default=None, help="stop after this many seconds without improvement")
+    s.add_argument("--compact-delay", action="store_true")
+    s.add_argument("--json", action="store_true", help="print the plan as JSON")
+    s.add_argument("--metrics", action="store_true", help="add search metrics to the JSON output")
+    s.add_argument("--backend", choices=("wrapper", "proto"), default="wrapper",
+                   help="build through cp_model (wrapper) or write the proto in bulk")
+    s.add_argument("--checkpoint", help="write the incumbent to this file during the solve")
+    s.add_argument("--checkpoint-interval", type=float, default=None,
+                   help="seconds between checkpoint writes (default: every improvement)")
+    s.add_argument("--resume", action="store_true", help="start from the checkpoint file if it exists")
+    s.add_argument("--prune", action="store_true",
+                   help="fix arcs and sorties the pre-check finds unusable (stop if it finds infeasibility)")
+    s.add_argument("--neighbours", type=int, default=None, metavar="K",
+                   help="only declare truck arcs between K nearest neighbours and to/from the depot")
+    s.set_defaults(func=cmd_solve)
+
+    b = sub.add_parser("benchmark", help="solve generated instances and report timings")
+    b.add_argument("--instances", type=int, default=5)
+    b.add_argument("--nodes", type=int, default=7)
+    b.add_argument("--tandems", type=int, default=2)
+    b.add_argument("--seed", type=int, default=0)
+    b.add_argument("--time-limit", type=float, default=30)
+    b.add_argument("--workers", type=int, default=8)
+    b.add_argument("--compact-delay", action="store_true")
+    b.add_argument("--backend", choices=("wrapper", "proto"), default="wrapper")
+    b.set_defaults(func=cmd_benchmark)
+
+    d = sub.add_parser("diagnose", help="explain why an instance is infeasible")
+    d.add_argument("instance", nargs="?")
+    d.add_argument("--time-limit", type=float, default=30)
+    d.add_argument("--workers", type=int, default=8)
+    d.add_argument("--compact-delay", action="store_true")
+    d.add_argument("--json", action="store_true", help="print the core as JSON")
+    d.set_defaults(func=cmd_diagnose)
+
+    pc = sub.add_parser("precheck", help="necessary conditions and an objective bound, without solving")
+    pc.add_argument("instance", nargs="?")
+    pc.add_argument("--json", action="store_true")
+    pc.set_defaults(func=cmd_precheck)
+
+    v = sub.add_parser("validate", help="check an instance file")
+    v.add_argument("instance")
+    v.set_defaults(func=cmd_validate)
+
+    st = sub.add_parser("stats", help="model size for an instance without building it")
+    st.add_argument("instance", nargs="?")
+    st.add_argument("--compact-delay", action="store_true")
+    st.set_defaults(func=cmd_stats)
+
+    g = sub.add_parser("generate", help="write a random instance")
+    g.add_argument("--nodes", type=int, required=True)
+    g.add_argument("--tandems", type=int, default=1)
+    g.add_argument("--seed", type=int, default=0)
+    g.add_argument("--grid", type=int, default=12)
+    g.add_argument("--horizon", type=int, default=60)
+    g.add_argument("-o", "--output")
+    g.set_defaults(func=cmd_generate)
+    return p
+
+
+def main(argv=None):
+    args = parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
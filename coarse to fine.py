@@ -0,0 +1,83 @@
+import random
+import time
+
+from ortools.sat.python import cp_model
+
+from instance import (default_instance, instance_from_dict, instance_to_dict, random_instance,
+                      rescale_instance, validate_instance)
+from multires import coarse_to_fine
+from optimisetester import build_model, solve, time_matrices
+
+#-----------------------------------------------------------------------------------------
+# Coarse-to-fine: solve in coarse time buckets, then warm-start the fine model
+#-----------------------------------------------------------------------------------------
+
+def run_case(inst, **kwargs):
+    start = time.time()
+    result = coarse_to_fine(inst, coarse_time=20, fine_time=20, **kwargs)
+    return result, time.time() - start
+
+#-----------------------------------------------------------------------------------------
+# Tests
+#-----------------------------------------------------------------------------------------
+def test_time_matrices_resolution():
+    inst = random_instance(random.Random(1), 6, grid=40, horizon=240)
+    t, t_prime = time_matrices(inst)
+    coarse_t, coarse_t_prime = time_matrices(rescale_instance(inst, 5))
+    assert abs(coarse_t * 5 - t).max() <= 3 and abs(coarse_t_prime * 5 - t_prime).max() <= 3
+    assert (time_matrices(rescale_instance(inst, 1))[0] == t).all()
+
+def test_rescale_instance():
+    inst = default_instance()
+    coarse = rescale_instance(inst, 5)
+    assert coarse.resolution == 5 and inst.resolution == 1
+    assert coarse.horizon == round(inst.horizon / 5) and coarse.T == round(inst.T / 5)
+    assert coarse.D == {i: round(d / 5) for i, d in inst.D.items()}
+    assert coarse.ct == inst.ct * 5 and coarse.alpha[1] == inst.alpha[1] * 5
+    assert coarse.beta == inst.beta and coarse.V == inst.V
+    assert validate_instance(coarse) == []
+    back = rescale_instance(coarse, 1)
+    assert back.ct == inst.ct and back.alpha == inst.alpha
+
+def test_resolution_round_trip():
+    coarse = rescale_instance(default_instance(), 5)
+    assert instance_from_dict(instance_to_dict(coarse)) == coarse
+    coarse.resolution = 0
+    assert "resolution must be positive" in validate_instance(coarse)
+
+def test_coarse_to_fine_hint():
+    result, _ = run_case(default_instance())
+    assert result["coarse"]["status"] in ("OPTIMAL", "FEASIBLE") and result["mode"] == "hint"
+    assert result["status"] == cp_model.OPTIMAL
+    assert result["solver"].ObjectiveValue() == 433 and result["plan"]["objective"] == 433
+
+def test_coarse_to_fine_fixed_routes():
+    inst = random_instance(random.Random(3), 6, N=2, grid=30, horizon=180)
+    result, _ = run_case(inst, fix_routes=True)
+    assert result["status"] in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    model, _ = build_model(inst)
+    solver, status = solve(model, max_time_in_seconds=20)
+    assert result["solver"].ObjectiveValue() >= solver.ObjectiveValue()
+    if result["mode"] == "hint":
+        assert result["solver"].ObjectiveValue() == solver.ObjectiveValue()
+
+def test_coarse_to_fine_fallback_shares_fine_time():
+    # 15-minute buckets hide a late arrival: the fixed routes are infeasible in fine units
+    inst = random_instance(random.Random(0), 6, N=2, grid=30, horizon=180)
+    result, _ = run_case(inst, resolution=15, fix_routes=True, num_search_workers=1)
+    assert result["mode"] == "hint" and result["status"] == cp_model.OPTIMAL
+    assert result["solver"].parameters.max_time_in_seconds < 20
+
+#-----------------------------------------------------------------------------------------
+# Feedback
+#-----------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    inst = random_instance(random.Random(3), 9, N=2, grid=40, horizon=240)
+    start = time.time()
+    solver, status = solve(build_model(inst)[0], max_time_in_seconds=60)
+    print(f"direct: {solver.StatusName(status)} {solver.ObjectiveValue()} in {time.time() - start:.2f}s")
+    for resolution in (2, 5, 10):
+        for fix_routes in (False, True):
+            result, elapsed = run_case(inst, resolution=resolution, fix_routes=fix_routes)
+            print(f"resolution {resolution} ({result['mode']}): coarse {result['coarse'].get('objective')}, "
+                  f"fine {result['solver'].ObjectiveValue()} in {elapsed:.2f}s")
@@ -0,0 +1,231 @@
+import time
+from dataclasses import replace
+
+from ortools.linear_solver import pywraplp
+from ortools.sat.python import cp_model
+
+import evaluator
+from optimisetester import (FAMILIES, add_variables, apply_params, build_model, capacity,
+                            objective, proper_sorties, solution_plan, time_matrices)
+
+# ---------------- Column Generation ----------------
+# Dantzig-Wolfe view of the tandem model: every family except (36) only ties
+# variables of one tandem together, and with per-tandem delays so does the
+# objective. A column is one complete tandem plan (truck arcs, sorties, times),
+# taken from a single-tandem copy of the model. The master picks at most one
+# column per tandem such that every affected area is covered at most once:
+#
+#   min  sum_c cost_c lam_c
+#   s.t. sum_c cover_jc lam_c <= 1    for j in C       (dual pi_j)
+#        sum_{c of k} lam_c   <= 1    for k in K       (dual mu_k)
+#
+# cost_c is the plan's share of the objective without the constant sum(beta)
+# (travel and delay cost minus its service credit), so the empty plan costs 0.
+# The LP relaxation is solved with GLOP; its duals price new columns by
+# solving the single-tandem model for  min cost - sum_j pi_j cover_j  with
+# CP-SAT, and every plan found with reduced cost below -EPS joins the master.
+# Once no tandem prices out, the LP value is a lower bound; the final
+# integer master over the generated columns is solved with CP-SAT.
+
+EPS = 1e-6
+
+
+class Pricing:
+    """Single-tandem copy of the model for tandem k, re-solved with new duals."""
+
+    def __init__(self, inst, t, t_prime, k):
+        self.inst, self.k, self.t, self.t_prime = replace(inst, N=1), k, t, t_prime
+        self.model = cp_model.CpModel()
+        self.var = add_variables(self.model, self.inst)
+        for name, add in FAMILIES.items():
+            if name == "45":
+                capacity(self.model, self.inst, self.var, [k])     # (45) depends on k
+            else:
+                add(self.model, self.inst, t, t_prime, self.var)
+        x, y_drone, sorties = self.var["x"], self.var["y_drone"], proper_sorties(self.var)
+        self.cover = {j: x.sum(x.index[0, :, j]) + y_drone.sum(sorties[0, :, j, :]) for j in self.inst.C}
+        self.cost = objective(self.inst, t, t_prime, self.var) - sum(self.inst.beta.values())
+        self.entries = [(f, key, v) for f, family in self.var.items() for key, v in family.items()]
+
+    def empty(self):
+        """Values of the plan that does nothing."""
+        return {f: dict.fromkeys(family.keys(), 0) for f, family in self.var.items()}
+
+    def plan_cost(self, values):
+        """Objective share of a plan: its objective less the constant sum(beta)."""
+        return evaluator.objective(self.inst, self.t, self.t_prime, values) - sum(self.inst.beta.values())
+
+    def solve(self, duals, max_time_in_seconds, num_search_workers, params=None, limit=5):
+        """(status, best reduced objective, plans) for the given cover duals;
+        plans are (values, cover, cost) of the improving solutions found."""
+        self.model.Minimize(self.cost - sum(duals[j] * self.cover[j] for j in self.inst.C))
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = max_time_in_seconds
+        solver.parameters.num_search_workers = num_search_workers
+        if params:
+            apply_params(solver, params)
+        collect = _Plans(self)
+        status = solver.Solve(self.model, collect)
+        best = solver.ObjectiveValue() if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else None
+        return status, best, collect.plans[-limit:]
+
+
+class _Plans(cp_model.CpSolverSolutionCallback):
+    def __init__(self, pricing):
+        super().__init__()
+        self.pricing = pricing
+        self.plans = []
+
+    def on_solution_callback(self):
+        pricing = self.pricing
+        values = {f: {} for f in pricing.var}
+        for f, key, v in pricing.entries:
+            values[f][key] = self.Value(v)
+        cover = frozenset(j for j, expr in pricing.cover.items() if self.Value(expr))
+        self.plans.append((values, cover, pricing.plan_cost(values)))
+
+
+def _signature(values):
+    return tuple((f, key) for f in ("x", "y_drone") for key, value in values[f].items() if value)
+
+
+def solve_master_lp(inst, columns):
+    """(objective, cover duals, tandem duals) of the LP relaxation over `columns`."""
+    lp = pywraplp.Solver.CreateSolver("GLOP")
+    lam = [lp.NumVar(0, 1, f"lam_{c}") for c in range(len(columns))]
+    cover_rows = {j: lp.Constraint(-lp.infinity(), 1, f"cover_{j}") for j in inst.C}
+    tandem_rows = {k: lp.Constraint(-lp.infinity(), 1, f"tandem_{k}") for k in inst.K}
+    goal = lp.Objective()
+    for v, column in zip(lam, columns):
+        goal.SetCoefficient(v, column["cost"])
+        tandem_rows[column["k"]].SetCoefficient(v, 1)
+        for j in column["cover"]:
+            cover_rows[j].SetCoefficient(v, 1)
+    goal.SetMinimization()
+    if lp.Solve() != pywraplp.Solver.OPTIMAL:
+        raise RuntimeError("master LP not solved to optimality")
+    return (goal.Value(), {j: row.dual_value() for j, row in cover_rows.items()},
+            {k: row.dual_value() for k, row in tandem_rows.items()})
+
+
+def solve_master(inst, columns, max_time_in_seconds=30, num_search_workers=8):
+    """Best integer selection of columns with CP-SAT; returns (solver, status, chosen)."""
+    model = cp_model.CpModel()
+    lam = [model.NewBoolVar(f"lam_{c}") for c in range(len(columns))]
+    for k in inst.K:
+        model.AddAtMostOne(v for v, column in zip(lam, columns) if column["k"] == k)
+    for j in inst.C:
+        model.AddAtMostOne(v for v, column in zip(lam, columns) if j in column["cover"])
+    model.Minimize(sum(column["cost"] * v for v, column in zip(lam, columns)))
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = max_time_in_seconds
+    solver.parameters.num_search_workers = num_search_workers
+    status = solver.Solve(model)
+    chosen = [c for c, v in enumerate(lam) if solver.Value(v)] \
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else []
+    return solver, status, chosen
+
+
+def column_generation(inst, t=None, t_prime=None, max_rounds=20, pricing_time=10, master_time=30,
+                      num_search_workers=8, columns_per_round=5, polish_time=0, params=None):
+    """Solve `inst` by column generation; returns a dict with the objective and
+    full-model values of the best plan, the LP lower bound (when pricing
+    converged), the generated columns and the timing of each phase.
+
+    With polish_time > 0 the full model is also solved for that long with the
+    column-generation plan as a hint; its solver, status and plan are added.
+    """
+    if t is None or t_prime is None:
+        t, t_prime = time_matrices(inst)
+    start = time.time()
+    pricing = {k: Pricing(inst, t, t_prime, k) for k in inst.K}
+    result = {"build_time": time.time() - start}
+
+    start = time.time()
+    columns, seen = [], set()
+    lp_value, bound, converged, rounds = None, None, False, 0
+    duals = {j: 0.0 for j in inst.C}
+    tandem_duals = {k: 0.0 for k in inst.K}
+    while rounds < max_rounds:
+        rounds += 1
+        added, exact, reduced = 0, True, 0.0
+        for k in inst.K:
+            status, best, plans = pricing[k].solve(duals, pricing_time, num_search_workers,
+                                                   params, columns_per_round)
+            exact = exact and status == cp_model.OPTIMAL
+            if best is not None:
+                reduced += min(0.0, best - tandem_duals[k])
+            for values, cover, cost in plans:
+                rc = cost - sum(duals[j] for j in cover) - tandem_duals[k]
+                signature = (k, _signature(values))
+                if rc < -EPS and signature not in seen:
+                    seen.add(signature)
+                    columns.append({"k": k, "values": values, "cover": cover, "cost": cost})
+                    added += 1
+        if lp_value is not None and exact:
+            bound = max(bound if bound is not None else -float("inf"), lp_value + reduced)
+        if added == 0:
+            converged = exact
+            break
+        lp_value, duals, tandem_duals = solve_master_lp(inst, columns)
+    result.update(rounds=rounds, converged=converged, columns=len(columns),
+                  pricing_time=time.time() - start)
+
+    if converged and lp_value is None:
+        bound = 0.0     # not even the empty duals price a plan: doing nothing is optimal
+    if bound is not None:
+        result["bound"] = bound + sum(inst.beta.values())
+
+    start = time.time()
+    plans = {k: pricing[k].empty() for k in inst.K}
+    chosen = []
+    if columns:
+        _, _, chosen = solve_master(inst, columns, master_time, num_search_workers)
+    for c in chosen:
+        plans[columns[c]["k"]] = columns[c]["values"]
+    result.update(master_time=time.time() - start, chosen=[columns[c] for c in chosen],
+                  values=_full_values(plans))
+    result["objective"] = evaluator.objective(inst, t, t_prime, result["values"])
+
+    if polish_time > 0:
+        start = time.time()
+        model, var = build_model(inst, t, t_prime)
+        for f, family in result["values"].items():
+            for key, value in family.items():
+                model.AddHint(var[f][key], value)
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = polish_time
+        solver.parameters.num_search_workers = num_search_workers
+        status = solver.Solve(model)
+        result.update(solver=solver, status=status, model=model, var=var, polish_time=time.time() - start)
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            result["plan"] = solution_plan(solver, var, inst)
+    return result
+
+
+def _full_values(plans):
+    """Values of the full model from the single-tandem plan of every tandem."""
+    values = {f: {} for f in plans[0]}
+    for k, plan in plans.items():
+        for f, family in plan.items():
+            for key, value in family.items():
+                values[f][(k,) + key[1:]] = value
+    return values
+
+
+if __name__ == "__main__":
+    import random
+
+    from instance import default_instance, random_instance
+    from optimisetester import solve
+
+    for inst in (default_instance(), random_instance(random.Random(3), 9, N=3)):
+        start = time.time()
+        model, _ = build_model(inst)
+        solver, status = solve(model, max_time_in_seconds=60)
+        print(f"compact model: {solver.StatusName(status)} {solver.ObjectiveValue()} "
+              f"in {time.time() - start:.2f}s")
+        start = time.time()
+        result = column_generation(inst)
+        print(f"column generation: {result['objective']} (bound {result.get('bound')}), "
+              f"{result['columns']} columns in {result['rounds']} rounds, {time.time() - start:.2f}s")
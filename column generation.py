@@ -0,0 +1,88 @@
+import random
+import time
+from dataclasses import replace
+
+from ortools.sat.python import cp_model
+
+import evaluator
+from colgen import Pricing, column_generation, solve_master_lp
+from instance import default_instance, random_instance
+from optimisetester import build_model, solve, time_matrices
+
+#-----------------------------------------------------------------------------------------
+# Column generation: tandem plans priced from LP duals, set-partitioning master
+#-----------------------------------------------------------------------------------------
+
+def run_case(inst, **kwargs):
+    start = time.time()
+    result = column_generation(inst, pricing_time=20, master_time=20, **kwargs)
+    return result, time.time() - start
+
+#-----------------------------------------------------------------------------------------
+# Tests
+#-----------------------------------------------------------------------------------------
+def test_column_generation_default_instance():
+    inst = default_instance()
+    result, _ = run_case(inst)
+    t, t_prime = time_matrices(inst)
+    assert result["converged"] and result["objective"] == 433 and result["bound"] == 433
+    assert evaluator.violations(inst, t, t_prime, result["values"]) == []
+
+def test_column_generation_matches_compact_model():
+    rng = random.Random(8)
+    for _ in range(3):
+        inst = random_instance(rng, 6, N=2)
+        t, t_prime = time_matrices(inst)
+        result, _ = run_case(inst)
+        solver, status = solve(build_model(inst)[0], max_time_in_seconds=20)
+        assert status == cp_model.OPTIMAL
+        assert evaluator.violations(inst, t, t_prime, result["values"]) == []
+        assert result["bound"] - 1e-6 <= solver.ObjectiveValue() <= result["objective"] + 1e-6
+        if result["converged"]:
+            assert abs(result["bound"] - solver.ObjectiveValue()) < 1e-6
+
+def test_column_covers_and_costs():
+    inst = default_instance()
+    t, t_prime = time_matrices(inst)
+    result, _ = run_case(inst)
+    covered = [j for column in result["chosen"] for j in column["cover"]]
+    assert len(covered) == len(set(covered))
+    assert sum(column["cost"] for column in result["chosen"]) + sum(inst.beta.values()) == \
+        result["objective"]
+    value, duals, tandem_duals = solve_master_lp(inst, result["chosen"])
+    assert value == sum(column["cost"] for column in result["chosen"])
+    assert set(duals) == inst.C and set(tandem_duals) == set(inst.K)
+
+def test_pricing_respects_tandem_capacity_quirk():
+    # (45) skips the drone term for launches at node k, so tandem plans differ by k
+    inst = default_instance()
+    t, t_prime = time_matrices(inst)
+    for k in inst.K:
+        pricing = Pricing(inst, t, t_prime, k)
+        proto = pricing.model.Proto()
+        names = [v.name for v in proto.variables]
+        capacity_row = [[names[v] for v in c.linear.vars] for c in proto.constraints
+                        if "x_0_1_2" in [names[v] for v in c.linear.vars]
+                        and list(c.linear.domain)[-1] == inst.WT_max][0]
+        assert ("y_drone_0_1_2_3" in capacity_row) == (k != 1)
+        assert evaluator.violations(replace(inst, N=1), t, t_prime, pricing.empty()) == []
+
+def test_column_generation_polish():
+    result, _ = run_case(random_instance(random.Random(2), 5, N=2), polish_time=10)
+    assert result["status"] == cp_model.OPTIMAL
+    assert result["solver"].ObjectiveValue() <= result["objective"] + 1e-6
+    assert result["plan"]["objective"] == result["solver"].ObjectiveValue()
+
+#-----------------------------------------------------------------------------------------
+# Feedback
+#-----------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    for n, N in ((8, 2), (10, 3), (12, 4)):
+        inst = random_instance(random.Random(n), n, N=N)
+        start = time.time()
+        solver, status = solve(build_model(inst)[0], max_time_in_seconds=120)
+        print(f"n={n}, N={N}: compact {solver.StatusName(status)} {solver.ObjectiveValue()} "
+              f"in {time.time() - start:.2f}s")
+        result, elapsed = run_case(inst)
+        print(f"    column generation {result['objective']} (bound {result.get('bound')}), "
+              f"{result['columns']} columns in {result['rounds']} rounds, {elapsed:.2f}s")
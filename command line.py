@@ -0,0 +1,81 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import cli
+
+#-----------------------------------------------------------------------------------------
+# Command line: subcommands, lazy imports and the startup-time budget
+#-----------------------------------------------------------------------------------------
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def run_case(*argv):
+    start = time.time()
+    done = subprocess.run([sys.executable, "cli.py", *argv], cwd=HERE, capture_output=True, text=True)
+    return done.returncode, done.stdout, time.time() - start
+
+def heavy_modules_after(*argv):
+    code = ("import sys, cli; cli.main(%r); "
+            "print(sorted(m for m in ('ortools', 'numpy') if m in sys.modules))" % (list(argv),))
+    done = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True)
+    return done.stdout.strip().splitlines()[-1]
+
+#-----------------------------------------------------------------------------------------
+# Tests
+#-----------------------------------------------------------------------------------------
+def test_cli_generate_then_validate(tmp_path):
+    path = str(tmp_path / "inst.json")
+    assert run_case("generate", "--nodes", "4", "--seed", "1", "-o", path)[0] == 0
+    code, out, _ = run_case("validate", path)
+    assert code == 0 and "ok (4 affected areas" in out
+
+def test_cli_validate_reports_errors(tmp_path):
+    path = tmp_path / "bad.json"
+    path.write_text(json.dumps({"V": [[0, 0], [1, 1]], "w": [0], "D": {}, "VT": [3]}))
+    code, out, _ = run_case("validate", str(path))
+    assert code == 1
+    assert "w has 1 entries" in out and "D is missing nodes [1]" in out and "VT has unknown nodes [3]" in out
+
+def test_cli_quick_commands_skip_heavy_imports(tmp_path):
+    path = str(tmp_path / "inst.json")
+    cli.main(["generate", "--nodes", "4", "-o", path])
+    assert heavy_modules_after("validate", path) == "[]"
+    assert heavy_modules_after("stats", path) == "[]"
+
+def test_cli_startup_budget(tmp_path):
+    path = str(tmp_path / "inst.json")
+    cli.main(["generate", "--nodes", "4", "-o", path])
+    best = min(run_case("validate", path)[2] for _ in range(3))
+    assert best < cli.STARTUP_BUDGET_SECONDS
+
+def test_cli_solve_json(tmp_path, capsys):
+    path = str(tmp_path / "inst.json")
+    cli.main(["generate", "--nodes", "4", "--seed", "2", "-o", path])
+    capsys.readouterr()
+    assert cli.main(["solve", path, "--json", "--time-limit", "10"]) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert result["status"] == "OPTIMAL" and result["stop_reason"] == "optimal"
+    assert result["plan"]["objective"] == result["bound"]
+
+def test_cli_solve_rejects_incompatible_options(tmp_path, capsys):
+    checkpoint = str(tmp_path / "run.ckpt")
+    for flags in (["--neighbours", "3", "--backend", "proto"], ["--checkpoint", checkpoint, "--neighbours", "3"],
+                  ["--checkpoint", checkpoint, "--prune"], ["--checkpoint", checkpoint, "--backend", "proto"]):
+        assert cli.main(["solve", *flags]) == 2
+        assert "cannot be combined" in capsys.readouterr().err
+    assert cli.main(["solve", "--resume"]) == 2
+    assert "--resume needs --checkpoint" in capsys.readouterr().err
+    assert not os.path.exists(checkpoint)
+
+#-----------------------------------------------------------------------------------------
+# Feedback
+#-----------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    cli.main(["generate", "--nodes", "6", "-o", "/tmp/cli_instance.json"])
+    for argv in (["validate", "/tmp/cli_instance.json"], ["stats", "/tmp/cli_instance.json"],
+                 ["solve", "/tmp/cli_instance.json", "--json"]):
+        code, _, elapsed = run_case(*argv)
+        print(f"{' '.join(argv[:1])}: exit {code} in {elapsed:.3f}s")
@@ -0,0 +1,49 @@
+import random
+
+from ortools.sat.python import cp_model
+
+import fuzz
+from instance import random_instance
+from optimisetester import build_model, solve
+
+#-----------------------------------------------------------------------------------------
+# Compact delay: one delay[i] per affected area instead of delay[k,i] per tandem and node
+#-----------------------------------------------------------------------------------------
+
+def run_case(seed, n=5, N=2):
+    inst = random_instance(random.Random(seed), n, N=N)
+    results = []
+    for compact in (False, True):
+        model, var = build_model(inst, compact_delay=compact)
+        solver, status = solve(model, max_time_in_seconds=20, num_search_workers=8)
+        results.append((status, solver.ObjectiveValue(), len(var["delay"])))
+    return inst, results
+
+#-----------------------------------------------------------------------------------------
+# Tests
+#-----------------------------------------------------------------------------------------
+def test_compact_delay_same_objective():
+    for seed in (1, 4, 7):
+        inst, ((status, obj, _), (c_status, c_obj, _)) = run_case(seed)
+        assert status == c_status == cp_model.OPTIMAL
+        assert obj == c_obj
+
+def test_compact_delay_one_variable_per_node():
+    inst, ((_, _, n_delay), (_, _, c_n_delay)) = run_case(2, N=3)
+    assert n_delay == 3 * len(inst.C)
+    assert c_n_delay == len(inst.C)
+
+def test_compact_delay_fuzz():
+    stats, found = fuzz.run(instances=10, assignments=20, seed=3, compact_delay=True)
+    assert stats["feasible"] > 0
+    assert found == []
+
+#-----------------------------------------------------------------------------------------
+# Feedback
+#-----------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    for seed in range(1, 8):
+        inst, results = run_case(seed)
+        print(f"seed {seed}: " + ", ".join(
+            f"{label} obj={obj} delay vars={n}"
+            for label, (_, obj, n) in zip(("per tandem", "compact"), results)))
@@ -0,0 +1,224 @@
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ortools.sat.python import cp_model
+
+from checkpoint import load_checkpoint, write_checkpoint
+from instance import default_instance, load_instance, save_instance
+from optimisetester import EarlyStop, build_model, plan_to_json, solution_plan, solve
+from portfolio import SHARED_FAMILIES
+from solcache import add_hint
+
+# ---------------- Cooperative Solving ----------------
+# Several solver processes, on one machine or on machines that share a
+# directory, solve the same instance with their own seed, formulation and
+# parameters and exchange incumbents through that directory:
+#
+#   DIR/instance.json        the instance (written by the coordinator)
+#   DIR/workers/NAME.json    each worker's state, best objective and bound,
+#                            and the values of its best solution
+#   DIR/done.json            written once the shared gap is closed or a
+#                            worker proved optimality or infeasibility
+#
+# Workers solve in cycles of cycle_time seconds. Each cycle starts hinted with
+# the best incumbent published by any worker (the SHARED_FAMILIES values, which
+# mean the same in every formulation), and every improving solution is
+# published straight away. Between solutions, the watch thread polls the
+# directory and stops the search once done.json appears or the best objective
+# and the best bound of all workers are within target_gap.
+#
+#   python coop.py start DIR [INSTANCE]
+#   python coop.py worker DIR NAME [--seed S] [--compact-delay] [--time-limit S] [--cycle-time S]
+#   python coop.py status DIR
+
+WORKERS = "workers"
+
+
+def publish(directory, state):
+    write_checkpoint(os.path.join(directory, WORKERS, f"{state['name']}.json"), state)
+
+
+def states(directory):
+    """Published worker states by name (files being replaced are skipped)."""
+    found = {}
+    for path in sorted(glob.glob(os.path.join(directory, WORKERS, "*.json"))):
+        try:
+            state = load_checkpoint(path)
+        except (OSError, ValueError):
+            continue
+        found[state["name"]] = state
+    return found
+
+
+def summary(directory):
+    """Best objective and its worker, best bound, and whether the run is done."""
+    found = states(directory)
+    solved = [s for s in found.values() if s.get("objective") is not None]
+    best = min(solved, key=lambda s: s["objective"], default=None)
+    bounds = [s["bound"] for s in found.values() if s.get("bound") is not None]
+    return {"objective": None if best is None else best["objective"],
+            "source": None if best is None else best["name"],
+            "bound": max(bounds, default=None),
+            "done": os.path.exists(os.path.join(directory, "done.json")),
+            "workers": {name: {k: s.get(k) for k in ("state", "objective", "bound", "cycles", "config")}
+                        for name, s in found.items()}}
+
+
+def gap_closed(result, target_gap):
+    if result["objective"] is None or result["bound"] is None:
+        return False
+    return result["objective"] - result["bound"] <= target_gap * max(1.0, abs(result["objective"]))
+
+
+def _raised(bound, new):
+    return new if bound is None else max(bound, new)
+
+
+def finish(directory, reason, name):
+    path = os.path.join(directory, "done.json")
+    if not os.path.exists(path):
+        write_checkpoint(path, {"reason": reason, "by": name, "time": time.time()})
+
+
+class _Exchange(EarlyStop):
+    """Publishes improving solutions and stops the search once the run is done."""
+
+    def __init__(self, directory, state, var, inst, target_gap, poll, deadline):
+        super().__init__(deadline=deadline)
+        self.directory, self.state, self.var, self.inst = directory, state, var, inst
+        self.target_gap, self.poll = target_gap, poll
+        self.last_poll = time.time()
+
+    def watching(self):
+        return True
+
+    def on_solution_callback(self):
+        super().on_solution_callback()
+        objective = self.ObjectiveValue()
+        if self.state["objective"] is None or objective < self.state["objective"]:
+            values = [[f, list(key) if isinstance(key, tuple) else [key], self.Value(v)]
+                      for f in SHARED_FAMILIES for key, v in self.var[f].items() if self.Value(v)]
+            self.state.update(objective=objective, bound=_raised(self.state["bound"], self.BestObjectiveBound()),
+                              values=values, plan=plan_to_json(solution_plan(self, self.var, self.inst)))
+            publish(self.directory, self.state)
+
+    def tick(self, solver):
+        if time.time() - self.last_poll >= self.poll:
+            self.last_poll = time.time()
+            result = summary(self.directory)
+            if result["done"] or gap_closed(result, self.target_gap):
+                solver.StopSearch()
+                return True
+        return super().tick(solver)
+
+
+def worker(directory, name, config=None, time_limit=60, cycle_time=10, target_gap=0.0, poll=0.5):
+    """Take part in the cooperative solve in `directory`; returns the final state.
+
+    `config` may set "seed", "compact_delay", "workers" (CP-SAT workers) and
+    "params" (extra CP-SAT parameters).
+    """
+    config = dict(config or {})
+    inst = load_instance(os.path.join(directory, "instance.json"))
+    model, var = build_model(inst, compact_delay=config.get("compact_delay", False))
+    params = dict(config.get("params") or {}, random_seed=config.get("seed", 0))
+    deadline = time.time() + time_limit
+    state = {"name": name, "config": config, "state": "running", "objective": None, "bound": None,
+             "cycles": 0, "values": None, "plan": None}
+    publish(directory, state)
+    while time.time() < deadline:
+        result = summary(directory)
+        if result["done"] or gap_closed(result, target_gap):
+            break
+        best = states(directory).get(result["source"]) if result["source"] else None
+        if best is not None and best.get("values") is not None:
+            add_hint(model, var, best)
+        exchange = _Exchange(directory, state, var, inst, target_gap, poll, deadline)
+        solver, status = solve(model, min(cycle_time, deadline - time.time()), config.get("workers", 1),
+                               params, exchange)
+        state["cycles"] += 1
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            state["bound"] = _raised(state["bound"], solver.BestObjectiveBound())
+        publish(directory, state)
+        if status == cp_model.OPTIMAL:
+            finish(directory, "optimal", name)
+        elif status == cp_model.INFEASIBLE:
+            state["state"] = "infeasible"
+            publish(directory, state)
+            finish(directory, "infeasible", name)
+    if state["state"] == "running":
+        state["state"] = "finished"
+    publish(directory, state)
+    return {k: v for k, v in state.items() if k != "values"}
+
+
+def prepare(directory, inst):
+    """Start a fresh run in `directory`: write the instance, drop old states."""
+    os.makedirs(os.path.join(directory, WORKERS), exist_ok=True)
+    for path in glob.glob(os.path.join(directory, WORKERS, "*.json")) + [os.path.join(directory, "done.json")]:
+        if os.path.exists(path):
+            os.remove(path)
+    save_instance(inst, os.path.join(directory, "instance.json"))
+
+
+def _run_worker(args):
+    return worker(*args)
+
+
+def cooperate(inst, directory, configs, time_limit=60, cycle_time=10, target_gap=0.0, poll=0.5):
+    """Run one local worker process per config on `inst` through `directory`.
+
+    configs maps worker names to worker() configs. Returns a dict with the
+    shared objective and bound, the winning worker ("source") and its plan,
+    the status (OPTIMAL, INFEASIBLE, FEASIBLE or UNKNOWN) and the final state
+    of every worker.
+    """
+    prepare(directory, inst)
+    jobs = [(directory, name, config, time_limit, cycle_time, target_gap, poll)
+            for name, config in configs.items()]
+    with ProcessPoolExecutor(len(jobs)) as pool:
+        finals = list(pool.map(_run_worker, jobs))
+    result = summary(directory)
+    found = states(directory)
+    if any(s["state"] == "infeasible" for s in found.values()):
+        result["status"] = "INFEASIBLE"
+    elif result["objective"] is None:
+        result["status"] = "UNKNOWN"
+    else:
+        result["status"] = "OPTIMAL" if gap_closed(result, 0.0) else "FEASIBLE"
+        result["plan"] = found[result["source"]]["plan"]
+    result["workers"] = {s["name"]: s for s in finals}
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cooperative solving through a shared directory.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("start", help="publish an instance (default: the built-in one) in DIR")
+    p.add_argument("directory")
+    p.add_argument("instance", nargs="?")
+    w = sub.add_parser("worker", help="join the run in DIR (instance.json must exist)")
+    w.add_argument("directory")
+    w.add_argument("name")
+    w.add_argument("--seed", type=int, default=0)
+    w.add_argument("--compact-delay", action="store_true")
+    w.add_argument("--workers", type=int, default=8, help="CP-SAT workers of this process")
+    w.add_argument("--time-limit", type=float, default=60)
+    w.add_argument("--cycle-time", type=float, default=10)
+    w.add_argument("--target-gap", type=float, default=0.0)
+    s = sub.add_parser("status", help="shared objective, bound and worker states")
+    s.add_argument("directory")
+    args = parser.parse_args()
+
+    if args.command == "start":
+        prepare(args.directory, default_instance() if args.instance is None else load_instance(args.instance))
+    elif args.command == "worker":
+        config = {"seed": args.seed, "compact_delay": args.compact_delay, "workers": args.workers}
+        final = worker(args.directory, args.name, config, args.time_limit, args.cycle_time, args.target_gap)
+        print(json.dumps(final["plan"], indent=2) if final["plan"] else final["state"])
+    else:
+        print(json.dumps(summary(args.directory), indent=2))
@@ -0,0 +1,90 @@
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from dataclasses import replace
+
+from ortools.sat.python import cp_model
+
+import coop
+from instance import default_instance, random_instance
+from optimisetester import build_model, solve
+
+#-----------------------------------------------------------------------------------------
+# Cooperative solving: worker processes exchanging incumbents through a shared directory
+#-----------------------------------------------------------------------------------------
+
+CONFIGS = {"a": {"seed": 1, "workers": 2}, "b": {"seed": 2, "compact_delay": True, "workers": 2}}
+
+def run_case(inst, directory, configs=CONFIGS, **kwargs):
+    kwargs.setdefault("time_limit", 20)
+    kwargs.setdefault("cycle_time", 4)
+    return coop.cooperate(inst, str(directory), configs, **kwargs)
+
+def state(name, objective, bound, **extra):
+    return dict({"name": name, "state": "running", "objective": objective, "bound": bound,
+                 "cycles": 1, "config": {}, "values": None, "plan": None}, **extra)
+
+#-----------------------------------------------------------------------------------------
+# Tests
+#-----------------------------------------------------------------------------------------
+def test_summary_of_published_states(tmp_path):
+    coop.prepare(str(tmp_path), default_instance())
+    coop.publish(str(tmp_path), state("a", 500.0, 300.0))
+    coop.publish(str(tmp_path), state("b", 450.0, 100.0))
+    coop.publish(str(tmp_path), state("c", None, None))
+    result = coop.summary(str(tmp_path))
+    assert (result["objective"], result["source"], result["bound"], result["done"]) == (450.0, "b", 300.0, False)
+    assert not coop.gap_closed(result, 0.1) and coop.gap_closed(result, 0.4)
+    coop.finish(str(tmp_path), "optimal", "a")
+    assert coop.summary(str(tmp_path))["done"]
+    coop.prepare(str(tmp_path), default_instance())
+    assert coop.summary(str(tmp_path))["workers"] == {} and not coop.summary(str(tmp_path))["done"]
+
+def test_cooperate_matches_direct_solve(tmp_path):
+    inst = random_instance(random.Random(2), 7, N=2)
+    result = run_case(inst, tmp_path)
+    solver, status = solve(build_model(inst)[0], max_time_in_seconds=20)
+    assert result["status"] == "OPTIMAL" and status == cp_model.OPTIMAL
+    assert result["objective"] == result["plan"]["objective"] == solver.ObjectiveValue()
+    assert set(result["workers"]) == set(CONFIGS)
+    assert json.loads((tmp_path / "done.json").read_text())["reason"] == "optimal"
+
+def test_worker_stops_on_shared_bound(tmp_path):
+    coop.prepare(str(tmp_path), default_instance())
+    coop.publish(str(tmp_path), state("other", 433.0, 433.0))
+    start = time.time()
+    final = coop.worker(str(tmp_path), "late", {"workers": 2}, time_limit=20)
+    assert final["cycles"] == 0 and time.time() - start < 10
+    coop.finish(str(tmp_path), "optimal", "other")
+    assert coop.worker(str(tmp_path), "later", time_limit=20)["cycles"] == 0
+
+def test_cooperate_infeasible(tmp_path):
+    result = run_case(replace(default_instance(), T=10, horizon=10), tmp_path)
+    assert result["status"] == "INFEASIBLE" and "plan" not in result
+
+def test_worker_command_line(tmp_path):
+    here = os.path.dirname(os.path.abspath(__file__))
+    run = lambda *args: subprocess.run([sys.executable, os.path.join(here, "coop.py"), *args],
+                                       capture_output=True, text=True, check=True).stdout
+    run("start", str(tmp_path))
+    plan = json.loads(run("worker", str(tmp_path), "w1", "--workers", "2", "--time-limit", "20"))
+    status = json.loads(run("status", str(tmp_path)))
+    assert status["objective"] == plan["objective"] == 433.0 and status["done"]
+
+#-----------------------------------------------------------------------------------------
+# Feedback
+#-----------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    import tempfile
+
+    inst = random_instance(random.Random(3), 10, N=2, grid=25, horizon=120)
+    solver, status = solve(build_model(inst)[0], max_time_in_seconds=30, num_search_workers=4)
+    print(f"single process, 4 workers: {solver.StatusName(status)} {solver.ObjectiveValue()} "
+          f"bound {solver.BestObjectiveBound()}")
+    configs = {f"w{n}": {"seed": n, "compact_delay": n % 2 == 1, "workers": 2} for n in range(4)}
+    result = run_case(inst, tempfile.mkdtemp(), configs, time_limit=30, cycle_time=5)
+    print(f"cooperative, 4 x 2 workers: {result['status']} {result['objective']} bound {result['bound']} "
+          f"(best from {result['source']})")
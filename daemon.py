@@ -0,0 +1,391 @@
+import argparse
+import heapq
+import itertools
+import json
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ortools.sat.python import cp_model
+
+from instance import instance_from_dict, instance_to_dict, load_instance
+from optimisetester import apply_params, build_model, plan_to_json, solution_plan, time_matrices
+from solcache import DEFINITIVE, SolutionCache, add_hint, request_key, solution_values
+from solverlog import SearchLog, solve_metrics
+
+# ---------------- Solver Daemon ----------------
+# Long-running local HTTP service that keeps ortools imported, caches travel
+# matrices and built models, and runs solve jobs on a bounded pool of worker
+# threads in priority order. With a solution cache, repeated requests for an
+# instance already solved to optimality are answered without solving, and
+# earlier feasible plans warm-start the solve (see solcache.py). Jobs asking
+# for "metrics" get the parsed search log with their result (solverlog.py),
+# and with a metrics log every finished job appends one JSON line to it.
+# Finished jobs are kept for job_ttl seconds, and at most max_jobs of them,
+# oldest evicted first; after that their ids answer 404.
+#
+#   POST   /jobs       {"instance": {...}} or {"instance_file": path}, plus optional
+#                      "priority" (higher first), "time_limit", "workers",
+#                      "params", "compact_delay" and "metrics"  ->  {"id": ...}
+#   GET    /jobs       all jobs (without results)
+#   GET    /jobs/<id>  job state and, once finished, its result
+#   DELETE /jobs/<id>  cancel a queued or running job
+#   GET    /health     queue length and cache sizes
+
+
+class LRU:
+    """Small thread-safe least-recently-used cache."""
+
+    def __init__(self, size):
+        self.size = size
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, make):
+        with self.lock:
+            if key in self.items:
+                self.items.move_to_end(key)
+                return self.items[key], True
+        value = make()
+        with self.lock:
+            self.items[key] = value
+            while len(self.items) > self.size:
+                self.items.popitem(last=False)
+        return value, False
+
+    def __len__(self):
+        return len(self.items)
+
+
+class SolverService:
+    """Job queue, worker pool and caches behind the HTTP handler."""
+
+    def __init__(self, workers=2, search_workers=4, cache_size=32, solutions=None, metrics_log=None,
+                 max_jobs=1000, job_ttl=3600):
+        self.search_workers = search_workers
+        self.solutions = solutions
+        self.metrics_log = metrics_log
+        self.matrices = LRU(cache_size)
+        self.models = LRU(cache_size)
+        self.max_jobs = max_jobs
+        self.job_ttl = job_ttl
+        self.jobs = {}
+        self.finished = OrderedDict()      # finished job ids, oldest first
+        self.queue = []
+        self.ids = itertools.count()
+        self.counter = itertools.count()   # heap tiebreak: FIFO within a priority
+        self.lock = threading.Lock()
+        self.ready = threading.Condition(self.lock)
+        self.running = True
+        self.threads = [threading.Thread(target=self._work, daemon=True) for _ in range(workers)]
+        for th in self.threads:
+            th.start()
+
+    # ---- jobs ----
+    def submit(self, request):
+        if "instance_file" in request:
+            inst = load_instance(request["instance_file"])
+        else:
+            inst = instance_from_dict(request["instance"])
+        job_id = f"job-{next(self.ids)}"
+        job = {
+            "id": job_id,
+            "state": "queued",
+            "priority": request.get("priority", 0),
+            "submitted": time.time(),
+            "instance": inst,
+            "options": {
+                "time_limit": request.get("time_limit", 30),
+                "workers": request.get("workers", self.search_workers),
+                "params": request.get("params"),
+                "compact_delay": request.get("compact_delay", False),
+                "metrics": request.get("metrics", False),
+            },
+            "solver": None,
+            "result": None,
+        }
+        with self.lock:
+            self._evict()
+            self.jobs[job_id] = job
+            heapq.heappush(self.queue, (-job["priority"], next(self.counter), job_id))
+            self.ready.notify()
+        return job_id
+
+    def cancel(self, job_id):
+        with self.lock:
+            job = self.jobs[job_id]
+            if job["state"] == "queued":
+                job["state"] = "cancelled"
+                self._finish(job)
+            elif job["state"] == "running":
+                job["state"] = "cancelling"
+                job["solver"].StopSearch()
+            return job["state"]
+
+    def describe(self, job_id, result=True):
+        job = self.jobs[job_id]
+        out = {key: job[key] for key in ("id", "state", "priority", "submitted")}
+        for key in ("started", "finished", "error"):
+            if key in job:
+                out[key] = job[key]
+        if result and job["result"] is not None:
+            out["result"] = job["result"]
+        return out
+
+    def stop(self):
+        with self.lock:
+            self.running = False
+            self.ready.notify_all()
+            for job in self.jobs.values():
+                if job["state"] == "running":
+                    job["solver"].StopSearch()
+
+    # ---- workers ----
+    def _next_job(self):
+        with self.lock:
+            while self.running:
+                while self.queue:
+                    _, _, job_id = heapq.heappop(self.queue)
+                    job = self.jobs.get(job_id)
+                    if job is not None and job["state"] == "queued":
+                        job["state"] = "running"
+                        job["started"] = time.time()
+                        job["solver"] = cp_model.CpSolver()
+                        return job
+                self.ready.wait()
+        return None
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            try:
+                job["result"] = self._solve(job)
+                state = "done"
+            except Exception as e:
+                job["error"] = f"{type(e).__name__}: {e}"
+                state = "failed"
+            with self.lock:
+                job["state"] = "cancelled" if job["state"] == "cancelling" else state
+                job["solver"] = None
+                self._finish(job)
+                if self.metrics_log is not None:
+                    self._log_metrics(job)
+
+    def _finish(self, job):
+        # Called with the lock held
+        job["finished"] = time.time()
+        self.finished[job["id"]] = job["finished"]
+        self._evict()
+
+    def _evict(self):
+        # Called with the lock held; finish times only grow, so the expired
+        # jobs are at the front
+        cutoff = time.time() - self.job_ttl
+        while self.finished:
+            job_id, finished = next(iter(self.finished.items()))
+            if len(self.finished) <= self.max_jobs and finished >= cutoff:
+                return
+            del self.finished[job_id], self.jobs[job_id]
+
+    def _solve(self, job):
+        inst, options = job["instance"], job["options"]
+        entry = solution_key = None
+        if self.solutions is not None:
+            solution_key = request_key(inst, options["params"], options["compact_delay"])
+            entry = self.solutions.get(solution_key)
+            if entry is not None and entry["status"] in DEFINITIVE:
+                result = {name: entry[name] for name in ("status", "objective", "bound", "plan")
+                          if name in entry}
+                return dict(result, wall_time=0.0, build_time=0.0, cached_model=False,
+                            cached_solution="hit")
+        key = json.dumps(instance_to_dict(inst), sort_keys=True)
+        start = time.time()
+        t, t_prime = self.matrices.get((tuple(map(tuple, inst.V)), inst.vt, inst.vd, inst.resolution),
+                                       lambda: time_matrices(inst))[0]
+        (model, var), cached = self.models.get(
+            (key, options["compact_delay"]),
+            lambda: build_model(inst, t, t_prime, options["compact_delay"]))
+        build_time = time.time() - start
+
+        solver = job["solver"]
+        solver.parameters.max_time_in_seconds = options["time_limit"]
+        solver.parameters.num_search_workers = options["workers"]
+        if options["params"]:
+            apply_params(solver, options["params"])
+        if job["state"] == "cancelling":
+            return None
+        if entry is not None:
+            # The cached model is shared by concurrent jobs; hints go on a copy
+            model = model.Clone()
+            add_hint(model, var, entry)
+        log = SearchLog() if options["metrics"] or self.metrics_log is not None else None
+        if log is not None:
+            log.attach(solver)
+        finished = threading.Event()
+        threading.Thread(target=self._stop_when_cancelled, args=(job, finished), daemon=True).start()
+        status = solver.Solve(model)
+        finished.set()
+        result = {
+            "status": solver.StatusName(status),
+            "wall_time": solver.WallTime(),
+            "build_time": build_time,
+            "cached_model": cached,
+        }
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            result["objective"] = solver.ObjectiveValue()
+            result["bound"] = solver.BestObjectiveBound()
+            result["plan"] = plan_to_json(solution_plan(solver, var, inst))
+        if solution_key is not None:
+            result["cached_solution"] = "miss" if entry is None else "hint"
+            if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                self.solutions.put(solution_key, dict(result, values=solution_values(solver, var)))
+            elif status == cp_model.INFEASIBLE:
+                self.solutions.put(solution_key, {"status": result["status"]})
+        if log is not None:
+            job["metrics"] = solve_metrics(solver, model, log)
+            if options["metrics"]:
+                result["metrics"] = job["metrics"]
+        return result
+
+    def _log_metrics(self, job):
+        result = job["result"] or {}
+        line = {"id": job["id"], "state": job["state"], "submitted": job["submitted"],
+                "started": job["started"], "finished": job["finished"],
+                "nodes": job["instance"].num_nodes, "tandems": job["instance"].N,
+                "time_limit": job["options"]["time_limit"], "workers": job["options"]["workers"]}
+        line.update({key: result[key] for key in ("status", "objective", "bound", "wall_time", "build_time",
+                                                  "cached_solution") if key in result})
+        if "metrics" in job:
+            line["metrics"] = job.pop("metrics")
+        with open(self.metrics_log, "a") as f:
+            f.write(json.dumps(line) + "\n")
+
+    def _stop_when_cancelled(self, job, finished):
+        # Solve() drops a StopSearch() that lands before the search has
+        # started, so keep repeating it until the solve returns
+        while not finished.wait(0.05):
+            if job["state"] == "cancelling":
+                job["solver"].StopSearch()
+
+
+# ---------------- HTTP Interface ----------------
+class Handler(BaseHTTPRequestHandler):
+    service = None
+
+    def _send(self, code, body):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _job_id(self):
+        parts = self.path.strip("/").split("/")
+        if len(parts) == 2 and parts[0] == "jobs":
+            if parts[1] in self.service.jobs:
+                return parts[1]
+            self._send(404, {"error": f"unknown job {parts[1]}"})
+        else:
+            self._send(404, {"error": f"unknown path {self.path}"})
+        return None
+
+    def do_GET(self):
+        if self.path == "/health":
+            service = self.service
+            self._send(200, {"queued": sum(j["state"] == "queued" for j in service.jobs.values()),
+                             "running": sum(j["state"] == "running" for j in service.jobs.values()),
+                             "cached_models": len(service.models),
+                             "cached_matrices": len(service.matrices),
+                             "cached_solutions": None if service.solutions is None else len(service.solutions)})
+        elif self.path.rstrip("/") == "/jobs":
+            self._send(200, [self.service.describe(j, result=False) for j in list(self.service.jobs)])
+        else:
+            job_id = self._job_id()
+            if job_id:
+                self._send(200, self.service.describe(job_id))
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            self._send(404, {"error": f"unknown path {self.path}"})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            job_id = self.service.submit(request)
+        except (ValueError, KeyError, TypeError, OSError) as e:
+            self._send(400, {"error": f"{type(e).__name__}: {e}"})
+            return
+        self._send(202, {"id": job_id})
+
+    def do_DELETE(self):
+        job_id = self._job_id()
+        if job_id:
+            self._send(200, {"id": job_id, "state": self.service.cancel(job_id)})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host="127.0.0.1", port=8765, workers=2, search_workers=4, cache_size=32, solution_cache=None,
+          metrics_log=None, max_jobs=1000, job_ttl=3600):
+    """Start the daemon in a background thread; returns (server, service).
+
+    solution_cache is a directory for a solcache.SolutionCache, or None;
+    metrics_log a file that gets one JSON line of metrics per finished job;
+    max_jobs and job_ttl bound how many finished jobs are kept, and how long.
+    """
+    solutions = SolutionCache(solution_cache) if solution_cache else None
+    service = SolverService(workers, search_workers, cache_size, solutions, metrics_log, max_jobs, job_ttl)
+    handler = type("BoundHandler", (Handler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, service
+
+
+# ---------------- Client ----------------
+def request(url, method="GET", body=None):
+    data = None if body is None else json.dumps(body).encode()
+    req = urllib.request.Request(url, data=data, method=method,
+                                 headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req) as response:
+        return json.loads(response.read())
+
+
+def wait(url, job_id, poll=0.05, timeout=None):
+    """Poll a job until it leaves the queued/running states."""
+    start = time.time()
+    while True:
+        job = request(f"{url}/jobs/{job_id}")
+        if job["state"] not in ("queued", "running", "cancelling"):
+            return job
+        if timeout is not None and time.time() - start > timeout:
+            return job
+        time.sleep(poll)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local solver daemon.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=2, help="jobs solved concurrently")
+    parser.add_argument("--search-workers", type=int, default=4, help="default CP-SAT workers per job")
+    parser.add_argument("--cache-size", type=int, default=32)
+    parser.add_argument("--solution-cache", help="directory of cached solve results")
+    parser.add_argument("--metrics-log", help="file to append per-job search metrics to (JSON lines)")
+    parser.add_argument("--max-jobs", type=int, default=1000, help="finished jobs kept for GET /jobs")
+    parser.add_argument("--job-ttl", type=float, default=3600, help="seconds a finished job is kept")
+    args = parser.parse_args()
+
+    server, service = serve(args.host, args.port, args.workers, args.search_workers, args.cache_size,
+                            args.solution_cache, args.metrics_log, args.max_jobs, args.job_ttl)
+    print(f"Serving on http://{args.host}:{server.server_address[1]}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        service.stop()
+        server.shutdown()
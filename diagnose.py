@@ -0,0 +1,163 @@
+import time
+
+import numpy as np
+
+from ortools.sat.python import cp_model
+
+from optimisetester import build_model, time_matrices
+
+# ---------------- Infeasibility Diagnosis ----------------
+# Finds out why a scenario is INFEASIBLE in one solve. Every row of the model
+# gets an enforcement literal shared by the rows of the same group: the
+# constraint family, the tandems and the nodes its variables are indexed by.
+# The instance-level restriction that arrival and delay times stay within the
+# horizon is lifted out of the variable domains into guarded rows of its own
+# ("horizon" group, one per tandem and node). Solving with all literals as
+# assumptions, CP-SAT reports a subset of them that is already infeasible,
+# which maps straight back to family numbers and node indices. With
+# minimize=True the core is then shrunk to an irreducible one by dropping
+# groups one at a time (a few more, much smaller solves).
+
+TIMES = ("a", "a_prime", "delay")       # families bounded by the horizon
+
+
+def variable_keys(proto, var):
+    """(family, key) of every proto variable index, or None for constants."""
+    keys = [None] * len(proto.variables)
+    for f, family in var.items():
+        for key in np.argwhere(family.index >= 0).tolist():
+            keys[int(family.index[tuple(key)])] = (f, tuple(key))
+    return keys
+
+
+def row_variables(c):
+    """Variable indices of a linear or clause row (negated literals as well)."""
+    if c.has_linear():
+        return list(c.linear.vars)
+    if c.has_bool_or():
+        return [v if v >= 0 else -v - 1 for v in c.bool_or.literals]
+    if c.has_bool_and():
+        return [v if v >= 0 else -v - 1 for v in c.bool_and.literals]
+    return []
+
+
+def group_of(family, keys, compact_delay):
+    """(family, tandems, nodes) of a row from the keys of its variables."""
+    tandems, nodes = set(), set()
+    for key in keys:
+        if key is None:
+            continue
+        f, index = key
+        if f == "delay" and compact_delay:
+            nodes.update(index)
+        else:
+            tandems.add(index[0])
+            nodes.update(index[1:])
+    return family, tuple(sorted(tandems)), tuple(sorted(nodes))
+
+
+def diagnose(inst, t=None, t_prime=None, compact_delay=False, max_time_in_seconds=30,
+             num_search_workers=8, minimize=True):
+    """Explain why `inst` is infeasible; returns a dict with "status" and, when
+    INFEASIBLE, "families" (sorted family names) and "core", a list of
+    {"family", "tandems", "nodes"} groups that together are infeasible.
+    """
+    if t is None or t_prime is None:
+        t, t_prime = time_matrices(inst)
+    start = time.time()
+    rows = {}
+    model, var = build_model(inst, t, t_prime, compact_delay, rows=rows)
+    proto = model.Proto()
+    proto.clear_objective()
+    proto.clear_floating_point_objective()
+    keys = variable_keys(proto, var)
+
+    groups = {}
+    def literal(group):
+        if group not in groups:
+            groups[group] = model.NewBoolVar("enable_" + "_".join(map(str, group[:1] + group[1] + group[2])))
+        return groups[group]
+
+    for family, indices in rows.items():
+        for r in indices:
+            c = proto.constraints[r]
+            group = group_of(family, [keys[v] for v in row_variables(c)], compact_delay)
+            c.enforcement_literal.append(literal(group).Index())
+
+    # Arrival and delay times: lift the horizon out of the domains
+    wide = inst.horizon + inst.T + inst.num_nodes * int(max(np.max(t), np.max(t_prime)) + inst.T)
+    for f in TIMES:
+        for key, v in var[f].items():
+            key = key if isinstance(key, tuple) else (key,)
+            proto.variables[v.Index()].domain[1] = wide
+            tandems, node = ((), key) if f == "delay" and compact_delay else ((key[0],), key[1:])
+            model.Add(v <= inst.horizon).OnlyEnforceIf(literal(("horizon", tandems, node)))
+    build_time = time.time() - start
+
+    names = list(groups)
+    model.AddAssumptions([groups[g] for g in names])
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = max_time_in_seconds
+    solver.parameters.num_search_workers = num_search_workers
+    status = solver.Solve(model)
+    result = {"status": solver.StatusName(status), "groups": len(groups), "build_time": build_time,
+              "wall_time": solver.WallTime()}
+    if status != cp_model.INFEASIBLE:
+        return result
+
+    index = {groups[g].Index(): g for g in names}
+    core = [index[i] for i in solver.SufficientAssumptionsForInfeasibility()]
+    result["assumptions_core"] = len(core)
+    if minimize:
+        core = _shrink(model, groups, core, max_time_in_seconds, num_search_workers)
+    result["families"] = sorted({family for family, _, _ in core}, key=_family_order)
+    result["core"] = [{"family": family, "tandems": list(tandems), "nodes": list(nodes)}
+                      for family, tandems, nodes in sorted(core, key=lambda g: (_family_order(g[0]), g[1:]))]
+    return result
+
+
+def _shrink(model, groups, core, max_time_in_seconds, num_search_workers):
+    """Deletion filter: drop every group whose removal keeps the core infeasible."""
+    needed = list(core)
+    for group in list(core):
+        trial = [g for g in needed if g != group]
+        model.ClearAssumptions()
+        model.AddAssumptions([groups[g] for g in trial])
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = max_time_in_seconds
+        solver.parameters.num_search_workers = num_search_workers
+        if solver.Solve(model) == cp_model.INFEASIBLE:
+            needed = trial
+    return needed
+
+
+def _family_order(family):
+    head = family.split(",")[0]
+    return (0, int(head), family) if head.isdigit() else (1, 0, family)
+
+
+def explain(result):
+    """Readable lines for a diagnose() result."""
+    if result["status"] != "INFEASIBLE":
+        return [f"Not infeasible ({result['status']}): nothing to explain."]
+    lines = [f"Infeasible because of families {', '.join(result['families'])}:"]
+    for g in result["core"]:
+        where = f"nodes {', '.join(map(str, g['nodes']))}" if g["nodes"] else "no node"
+        tandems = f"tandem {', '.join(map(str, g['tandems']))}, " if g["tandems"] else ""
+        lines.append(f"  ({g['family']}) {tandems}{where}")
+    return lines
+
+
+if __name__ == "__main__":
+    import random
+    from dataclasses import replace
+
+    from instance import default_instance, random_instance
+
+    cases = {"default, T=10": replace(default_instance(), T=10, horizon=10),
+             "n=12, N=3, T=40": replace(random_instance(random.Random(2), 12, N=3, grid=30, horizon=40), T=40)}
+    for name, inst in cases.items():
+        start = time.time()
+        result = diagnose(inst)
+        print(f"{name}: {result['groups']} groups, diagnosed in {time.time() - start:.2f}s")
+        print("\n".join(explain(result)))
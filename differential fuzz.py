@@ -0,0 +1,42 @@
+import dataclasses
+
+import fuzz
+from optimisetester import build_model
+
+#-----------------------------------------------------------------------------------------
+# Differential fuzzing: CP-SAT encoding (optimisetester.build_model) vs direct evaluator
+#-----------------------------------------------------------------------------------------
+
+def no_endurance(inst, t, t_prime):
+    # Deliberately broken encoding: E=0 forbids every sortie the evaluator allows
+    return build_model(dataclasses.replace(inst, E=0), t, t_prime)
+
+def run_case(builder, instances=15, assignments=20, seed=0):
+    return fuzz.run(instances=instances, assignments=assignments, seed=seed, builder=builder)
+
+#-----------------------------------------------------------------------------------------
+# Tests
+#-----------------------------------------------------------------------------------------
+def test_fuzz_encoding_matches_evaluator():
+    stats, found = run_case(build_model)
+    assert stats["feasible"] > 0 and stats["infeasible"] > 0
+    assert found == []
+
+def test_fuzz_detects_broken_encoding():
+    stats, found = run_case(no_endurance, seed=1)
+    assert stats["disagreements"] > 0
+    cx = found[0]
+    assert cx["solver_feasible"] is False and cx["evaluator_violations"] == []
+    # Shrunk to a single sortie, which is also the whole unsat core
+    assert len(cx["assignment"]["y_drone"]) == 1
+    assert cx["core"] == [("y_drone", key) for key in cx["assignment"]["y_drone"]]
+
+#-----------------------------------------------------------------------------------------
+# Feedback
+#-----------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    for label, builder in [("build_model", build_model), ("E=0 encoding", no_endurance)]:
+        stats, found = run_case(builder, seed=1)
+        print(f"{label}: {stats}")
+        if found:
+            print(fuzz.format_counterexample(found[0]))
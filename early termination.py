@@ -0,0 +1,61 @@
+import random
+import time
+
+from ortools.sat.python import cp_model
+
+from instance import default_instance, random_instance
+from optimisetester import EarlyStop, build_model, solve
+
+#-----------------------------------------------------------------------------------------
+# Early termination: gap targets, stagnation, hard deadline, and the reported stop reason
+#-----------------------------------------------------------------------------------------
+
+def slow_model():
+    # Proving optimality here takes far longer than finding the best plan
+    inst = random_instance(random.Random(3), 10, N=3, grid=25, horizon=120)
+    return build_model(inst)[0]
+
+def run_case(model, max_time_in_seconds=20, **criteria):
+    early_stop = EarlyStop(**criteria)
+    start = time.time()
+    solver, status = solve(model, max_time_in_seconds=max_time_in_seconds, early_stop=early_stop)
+    return status, early_stop.reason, time.time() - start
+
+#-----------------------------------------------------------------------------------------
+# Tests
+#-----------------------------------------------------------------------------------------
+def test_early_stop_optimal():
+    status, reason, _ = run_case(build_model(default_instance())[0])
+    assert status == cp_model.OPTIMAL and reason == "optimal"
+
+def test_early_stop_stagnation():
+    status, reason, elapsed = run_case(slow_model(), stagnation_time=0.5)
+    assert status == cp_model.FEASIBLE and reason == "stagnation"
+    assert elapsed < 15
+
+def test_early_stop_absolute_gap():
+    status, reason, _ = run_case(build_model(default_instance())[0], absolute_gap=10_000)
+    assert status == cp_model.OPTIMAL and reason == "absolute_gap"
+
+def test_early_stop_deadline():
+    status, reason, elapsed = run_case(slow_model(), deadline=time.time() + 0.5)
+    assert reason == "deadline" and elapsed < 5
+
+def test_early_stop_time_limit():
+    status, reason, _ = run_case(slow_model(), max_time_in_seconds=0.5)
+    assert reason == "time_limit"
+
+#-----------------------------------------------------------------------------------------
+# Feedback
+#-----------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    model = slow_model()
+    scenarios = [
+        ("no criteria (time limit 5s)", dict(max_time_in_seconds=5)),
+        ("stagnation 1s", dict(stagnation_time=1)),
+        ("relative gap 90%", dict(relative_gap=0.9)),
+        ("deadline in 2s", dict(deadline=time.time() + 2)),
+    ]
+    for label, args in scenarios:
+        status, reason, elapsed = run_case(model, **args)
+        print(f"{label}: {cp_model.CpSolver().StatusName(status)} reason={reason} in {elapsed:.1f}s")
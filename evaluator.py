@@ -0,0 +1,241 @@
+# ---------------- Direct Evaluator ----------------
+# Checks a complete assignment of the tandem model's variables against every
+# constraint family in plain Python, without CP-SAT. It mirrors the encoding in
+# optimisetester.build_model term for term (including its index filters), so
+# any disagreement with the solver points at a change in the encoding.
+
+
+def variable_domains(inst):
+    """(lo, hi) bounds of every variable family as created by build_model."""
+    n1 = inst.num_nodes - 1
+    return {
+        "x": (0, 1), "y": (0, 1), "y_drone": (0, 1), "P": (0, 1),
+        "u": (0, n1),
+        "a": (0, inst.horizon), "a_prime": (0, inst.horizon), "delay": (0, inst.horizon),
+    }
+
+
+def violations(inst, t, t_prime, val, compact_delay=False, sortie_intervals=False):
+    """Return the sorted list of constraint families violated by `val`.
+
+    `val` maps each family name (x, y, u, y_drone, P, a, a_prime, delay) to a
+    dict with the same keys as the model's variables and integer values.
+    compact_delay selects the per-node delay encoding and sortie_intervals
+    the no-overlap form of (62), as in build_model.
+    """
+    x, y, u = val["x"], val["y"], val["u"]
+    y_drone, P = val["y_drone"], val["P"]
+    a, a_prime, delay = val["a"], val["a_prime"], val["delay"]
+
+    K, depot = inst.K, inst.depot
+    C, VL, VR = inst.C, inst.VL, inst.VR
+    VT, VD = inst.VT, inst.VD
+    T, E, w, D = inst.T, inst.E, inst.w, inst.D
+    num_nodes = inst.num_nodes
+    M = len(C)
+    bad = set()
+
+    def check(family, ok):
+        if not ok:
+            bad.add(family)
+
+    # Variable domains
+    for name, (lo, hi) in variable_domains(inst).items():
+        for v in val[name].values():
+            check("domain", lo <= v <= hi)
+
+    # Order variables are positive exactly on visited nodes
+    for k in K:
+        for i in range(1, num_nodes):
+            check("u", u[k, i] >= y[k, i])
+            check("u", u[k, i] <= (num_nodes - 1) * y[k, i])
+
+    # (36) Each affected area visited at most once (truck or drone)
+    for j in C:
+        truck_part = sum(x[k, i, j] for k in K for i in VL if i != j)
+        drone_part = sum(y_drone[k, i, j, l] for k in K for i in VL if i != j
+                         for l in VR if l != i and l != j)
+        check("36", truck_part + drone_part <= 1)
+
+    for k in K:
+        # (37, 38) Depot departure and return
+        check("37,38", sum(x[k, depot, j] for j in C) <= 1)
+        check("37,38", sum(x[k, i, depot] for i in C) <= 1)
+
+        # (39) Flow conservation
+        for j in C:
+            incoming = sum(x[k, i, j] for i in VL if i != j)
+            outgoing = sum(x[k, j, l] for l in VR if l != j)
+            check("39", incoming == outgoing)
+
+        # (40) Trucks cannot reach road-damaged areas
+        for i in VT:
+            for j in VT:
+                if i != j:
+                    check("40", x[k, i, j] == 0)
+
+        # (41, 42) MTZ subtour elimination
+        for i in VL:
+            for j in VR:
+                if i != j and i != depot and j != depot:
+                    check("41,42", u[k, i] - u[k, j] + 1 <= M * (1 - x[k, i, j]))
+        for j in VR:
+            incoming = sum(x[k, i, j] for i in VL if i != j)
+            check("41,42", u[k, j] <= M * incoming)
+
+        # (43, 44) Precedence
+        for i in VL:
+            for j in C:
+                if i != j and i != depot:
+                    check("43,44", u[k, j] - u[k, i] <= M * P[k, i, j])
+                    check("43,44", u[k, j] - u[k, i] >= M * (P[k, i, j] - 1) + 1)
+
+        # (45) Truck capacity (the drone term skips i == k, as the model does)
+        effort = sum(w[j] * x[k, i, j] for i in C for j in VR if j != i)
+        effort += sum(w[j] * y_drone[k, i, j, l] for j in VD for i in VL if i != j and i != k
+                      for l in VR if l != i and l != j)
+        check("45", effort <= inst.WT_max)
+
+        # (46) Drones only serve VD, on proper (i, j, l) triples
+        for i in VL:
+            for j in C:
+                for l in VR:
+                    if i == j or i == l or j == l or j not in VD:
+                        check("46", y_drone[k, i, j, l] == 0)
+
+        # (47, 48) One launch and one rendezvous per node
+        for i in VL:
+            check("47,48", sum(y_drone[k, i, j, l] for j in C if j != i
+                               for l in VR if l != i and l != j) <= 1)
+        for l in VR:
+            check("47,48", sum(y_drone[k, i, j, l] for i in VL if i != l
+                               for j in C if j != i and j != l) <= 1)
+
+        # (49) Launch and rendezvous on the truck route
+        road = VT | {depot}
+        for i in road:
+            for j in VD:
+                for l in VR:
+                    if i == l or i == j or j == l:
+                        continue
+                    out_i = sum(x[k, i, s] for s in road if s != i)
+                    in_l = sum(x[k, s, l] for s in road if s != l)
+                    check("49", 2 * y_drone[k, i, j, l] <= out_i + in_l)
+
+        # (50) Truck reaches the rendezvous of depot launches
+        for j in C:
+            for l in VR:
+                if j != l:
+                    rhs = sum(x[k, i, l] for i in VL if i != j and i != l)
+                    check("50", y_drone[k, depot, j, l] <= rhs)
+
+        # (51, 52) Routes start at time zero
+        check("51,52", a[k, 0] == 0 and a_prime[k, 0] == 0)
+
+        # (53) Depot within the horizon
+        check("53", a[k, depot] <= T)
+
+        # (54) Truck arrival continuity
+        for i in VL:
+            for j in VR:
+                if i != j:
+                    check("54", a[k, i] + t[i][j] <= a[k, j] + T * (1 - x[k, i, j]))
+
+        # (55) Launch-to-service drone timing
+        for i in VL:
+            for j in C:
+                if i == j:
+                    continue
+                flights = [y_drone[k, i, j, l] for l in VR if l != i and l != j]
+                if flights:
+                    s = sum(flights)
+                    check("55,56", a[k, i] + t_prime[i][j] - T * (1 - s) <= a_prime[k, j])
+
+        # (56) Service-to-rendezvous drone timing
+        for j in C:
+            for l in VR:
+                if j == l:
+                    continue
+                flights = [y_drone[k, i, j, l] for i in VL if i != j and i != l]
+                if flights:
+                    s = sum(flights)
+                    check("55,56", a_prime[k, j] + t_prime[j][l] - T * (1 - s) <= a[k, l])
+
+        # (57, 58) Launch synchronization
+        for i in VL:
+            terms = [y_drone[k, i, j, l] for j in C if j != i for l in VR if l != i and l != j]
+            if terms:
+                s = sum(terms)
+                check("57,60", a_prime[k, i] >= a[k, i] - T * (1 - s))
+                check("57,60", a_prime[k, i] <= a[k, i] + T * (1 - s))
+
+        # (59, 60) Rendezvous synchronization
+        for l in VR:
+            terms = [y_drone[k, i, j, l] for i in VL if i != l for j in C if j != i and j != l]
+            if terms:
+                s = sum(terms)
+                check("57,60", a_prime[k, l] >= a[k, l] - T * (1 - s))
+                check("57,60", a_prime[k, l] <= a[k, l] + T * (1 - s))
+
+        # (61) Drone endurance
+        for i in VL:
+            for j in C:
+                for l in VR:
+                    if i != j and i != l and j != l:
+                        check("61", t_prime[i][j] + t_prime[j][l] - T * (1 - y_drone[k, i, j, l]) <= E)
+
+        # (62) Sequential drone operations
+        if sortie_intervals:
+            busy = []
+            for i in VL:
+                for j in VD:
+                    for l in VR:
+                        if i != j and i != l and j != l and y_drone[k, i, j, l]:
+                            flight = t_prime[i][j] + t_prime[j][l]
+                            check("62", flight <= inst.horizon and a[k, l] - a[k, i] >= flight)
+                            busy.append((a[k, i], a[k, l]))
+            for n, (start, end) in enumerate(busy):
+                for other_start, other_end in busy[n + 1:]:
+                    check("62", end <= other_start or other_end <= start)
+        else:
+            for i in VL:
+                for l in VR:
+                    for b in C:
+                        if i != b and i != l and l != b:
+                            sum1 = sum(y_drone[k, i, j, l] for j in C if j != i and j != l)
+                            sum2 = sum(y_drone[k, b, q, m] for q in C if q != b
+                                       for m in VR if m != b and m != q)
+                            p = P.get((k, l, b), 0)
+                            check("62", a_prime[k, l] - T * (3 - sum1 - sum2 - p) <= a_prime[k, b])
+
+        # (63) Delay
+        for i in C:
+            if compact_delay:
+                truck_visit = sum(x[k, h, i] for h in VL if h != i)
+                check("63", delay[i] >= a[k, i] - D[i] - T * (1 - truck_visit))
+                if i in VD:
+                    drone_visit = sum(y_drone[k, h, i, l] for h in VL if h != i
+                                      for l in VR if l != h and l != i)
+                    check("63", delay[i] >= a_prime[k, i] - D[i] - T * (1 - drone_visit))
+            else:
+                check("63", delay[k, i] >= a[k, i] - D[i])
+                check("63", delay[k, i] >= a_prime[k, i] - D[i])
+
+    return sorted(bad)
+
+
+def objective(inst, t, t_prime, val):
+    """Objective value of `val` as the model's Minimize expression computes it."""
+    x, y_drone, delay = val["x"], val["y_drone"], val["delay"]
+    K, C, VL, VR = inst.K, inst.C, inst.VL, inst.VR
+    truck_cost = sum(t[i][j] * inst.ct * v for (k, i, j), v in x.items())
+    drone_cost = sum((t_prime[i][j] + t_prime[j][l]) * inst.cd * v
+                     for (k, i, j, l), v in y_drone.items() if i != j and j != l and i != l)
+    delay_penalty = sum(inst.alpha[key if key in C else key[1]] * v for key, v in delay.items())
+    unserved = sum(
+        inst.beta[i] * (1 - sum(x[k, i, j] for k in K for j in VR if j != i)
+                        - sum(y_drone[k, i, j, l] for k in K for j in C for l in VR
+                              if j != i and l != i and l != j))
+        for i in C
+    )
+    return truck_cost + drone_cost + delay_penalty + unserved
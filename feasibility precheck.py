@@ -0,0 +1,97 @@
+import dataclasses
+import json
+import random
+
+from ortools.sat.python import cp_model
+
+import cli
+from instance import default_instance, random_instance
+from optimisetester import build_model, solution_plan, solve, time_matrices
+from precheck import precheck, useless_mask
+
+#-----------------------------------------------------------------------------------------
+# Pre-check: necessary conditions and bound vs the solved model, with and without pruning
+#-----------------------------------------------------------------------------------------
+
+def run_case(inst):
+    t, t_prime = time_matrices(inst)
+    report = precheck(inst, t, t_prime)
+    results = []
+    for prune in (False, True):
+        model, var = build_model(inst, t, t_prime, prune=prune)
+        solver, status = solve(model, max_time_in_seconds=20, num_search_workers=1)
+        plan = solution_plan(solver, var, inst) if status == cp_model.OPTIMAL else None
+        results.append((status, plan))
+    return report, results
+
+#-----------------------------------------------------------------------------------------
+# Tests
+#-----------------------------------------------------------------------------------------
+def test_precheck_default_instance():
+    report, [(status, plan), (pruned_status, pruned)] = run_case(default_instance())
+    assert report["feasible"] and report["reasons"] == []
+    assert status == pruned_status == cp_model.OPTIMAL
+    assert pruned["objective"] == plan["objective"] == 433
+    assert report["lower_bound"] <= 433
+    assert report["removed"]["x"] > 0 and report["removed"]["y_drone"] > 0
+
+def test_prune_leaves_useless_variables_undeclared():
+    inst = default_instance()
+    t, t_prime = time_matrices(inst)
+    report = precheck(inst, t, t_prime)
+    n = inst.num_nodes
+    assert report["useless"]["y_drone"].shape == (n, n, n)
+    full, full_var = build_model(inst, t, t_prime)
+    pruned, var = build_model(inst, t, t_prime, prune=report)
+    assert len(var["x"]) == len(full_var["x"]) - report["removed"]["x"]
+    assert len(var["y_drone"]) <= len(full_var["y_drone"]) - report["removed"]["y_drone"]
+    assert not (useless_mask(report, inst.N) & (var["y_drone"].index >= 0)).any()
+    assert len(pruned.Proto().variables) < len(full.Proto().variables)
+
+def test_precheck_sound_on_random_instances():
+    rng = random.Random(7)
+    for _ in range(12):
+        inst = random_instance(rng, rng.randint(3, 5), N=rng.randint(1, 2), grid=rng.choice([6, 25]),
+                               horizon=rng.choice([20, 60]))
+        inst = dataclasses.replace(inst, WT_max=rng.choice([2, inst.WT_max]))
+        report, [(status, plan), (pruned_status, pruned)] = run_case(inst)
+        assert pruned_status == status
+        if not report["feasible"]:
+            assert status == cp_model.INFEASIBLE
+        if plan is not None:
+            assert pruned["objective"] == plan["objective"]
+            assert report["lower_bound"] <= plan["objective"]
+            assert len(plan["unserved"]) >= report["min_unserved"]
+            assert set(report["unserved"]) <= set(plan["unserved"])
+
+def test_precheck_detects_infeasible_horizon():
+    inst = dataclasses.replace(default_instance(), T=10, horizon=10)
+    report, [(status, _), _] = run_case(inst)
+    assert not report["feasible"] and report["reasons"][0].startswith("(54)")
+    assert status == cp_model.INFEASIBLE
+
+def test_precheck_unreachable_and_late_nodes():
+    base = default_instance()
+    # Node 8 is too far for any truck arc to end within the horizon and no drone can reach it
+    inst = dataclasses.replace(base, V=base.V + [(110, 90)], w=base.w + [1], D={**base.D, 3: 0, 8: 300},
+                               alpha={**base.alpha, 8: 5.0}, beta={**base.beta, 8: 100.0}, horizon=150, T=200)
+    report, [(status, plan), (_, pruned)] = run_case(inst)
+    assert report["unserved"] == [8] and 8 in plan["unserved"]
+    assert 3 in report["late"]
+    assert pruned["objective"] == plan["objective"]
+
+def test_precheck_cli(capsys):
+    assert cli.main(["precheck", "--json"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["feasible"] and "useless" not in report
+
+#-----------------------------------------------------------------------------------------
+# Feedback
+#-----------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    for n in (10, 40, 100):
+        inst = random_instance(random.Random(n), n, N=3, grid=30, horizon=60)
+        report = precheck(inst)
+        print(f"n={n}: feasible={report['feasible']} bound {report['lower_bound']:.1f} "
+              f"never served {report['unserved']} at least {report['min_unserved']} unserved, "
+              f"removed {report['removed']}")
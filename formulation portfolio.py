@@ -0,0 +1,63 @@
+import random
+
+from ortools.sat.python import cp_model
+
+import portfolio
+from instance import random_instance
+from optimisetester import build_model, solve
+
+#-----------------------------------------------------------------------------------------
+# Portfolio racing of formulation variants
+#-----------------------------------------------------------------------------------------
+
+def run_case(seed, **kwargs):
+    inst = random_instance(random.Random(seed), 5, N=2)
+    model, _ = build_model(inst)
+    solver, status = solve(model, max_time_in_seconds=20)
+    return portfolio.race(inst, time_limit=20, **kwargs), solver.ObjectiveValue()
+
+#-----------------------------------------------------------------------------------------
+# Tests
+#-----------------------------------------------------------------------------------------
+def test_portfolio_matches_direct_solve():
+    result, direct = run_case(1)
+    assert result["status"] == cp_model.OPTIMAL
+    assert result["variant"] in portfolio.VARIANTS
+    assert result["objective"] == result["solver"].ObjectiveValue() == direct
+    assert set(result["wall_times"]) == set(portfolio.VARIANTS)
+
+def test_portfolio_single_variant():
+    result, direct = run_case(2, variants={"compact": {"compact_delay": True}})
+    assert result["variant"] == "compact"
+    assert len(result["var"]["delay"]) == 5
+    assert result["objective"] == direct
+
+def test_every_variant_matches_direct_solve():
+    for seed in (4, 5):
+        for name, options in portfolio.VARIANTS.items():
+            result, direct = run_case(seed, variants={name: options})
+            assert result["status"] == cp_model.OPTIMAL and result["objective"] == direct, name
+
+def test_finished_race_skips_solve():
+    inst = random_instance(random.Random(6), 5, N=2)
+    model, var = build_model(inst)
+    shared = portfolio._Race(0.0)
+    shared.done.set()
+    entry = {"name": "per_tandem_delay", "model": model, "var": var}
+    portfolio._run_variant(shared, entry, 1, 20, None)
+    assert "solver" not in entry and shared.solvers == []
+
+def test_portfolio_restarts_share_incumbent():
+    result, direct = run_case(3, restart_interval=0.5, total_workers=2)
+    assert result["status"] in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    assert result["incumbent_from"] in portfolio.VARIANTS
+    assert result["objective"] == direct
+
+#-----------------------------------------------------------------------------------------
+# Feedback
+#-----------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    for seed in range(1, 6):
+        result, direct = run_case(seed)
+        print(f"seed {seed}: winner={result['variant']} objective={result['objective']} "
+              f"direct={direct} times={result['wall_times']}")
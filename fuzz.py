@@ -0,0 +1,246 @@
+import argparse
+import random
+
+from ortools.sat.python import cp_model
+
+from evaluator import variable_domains, violations
+from instance import random_instance
+from optimisetester import build_model, time_matrices
+
+# ---------------- Differential Fuzzing ----------------
+# Generates random small instances and complete variable assignments, fixes each
+# assignment in the CP-SAT model through assumptions and compares the solver's
+# verdict with the direct evaluator. Any disagreement is shrunk to a minimal
+# counterexample (fewest non-zero variables) and reported.
+
+BOOL_FAMILIES = ("x", "y", "y_drone", "P")
+
+
+# ---------------- Assignment Generator ----------------
+def random_assignment(inst, t, t_prime, var, rng, mutations=2):
+    """Plausible assignment (random truck paths and sorties with consistent
+    times) followed by a few random mutations, so both feasible and
+    near-boundary infeasible assignments are produced."""
+    val = {name: dict.fromkeys(family, 0) for name, family in var.items()}
+    x, y, u, y_drone, P = val["x"], val["y"], val["u"], val["y_drone"], val["P"]
+    a, a_prime, delay = val["a"], val["a_prime"], val["delay"]
+    slack = lambda: rng.choice((0, 0, 1, 2))
+    served = set()
+
+    for k in inst.K:
+        # Truck path from the depot through a few customers
+        route = []
+        if rng.random() < 0.5:
+            free = sorted(inst.C - served)
+            route = rng.sample(free, rng.randint(0, min(3, len(free))))
+        prev = inst.depot
+        for pos, j in enumerate(route, start=1):
+            x[k, prev, j] = 1
+            y[k, j] = 1
+            u[k, j] = pos
+            a[k, j] = a[k, prev] + int(t[prev][j]) + slack()
+            served.add(j)
+            prev = j
+        if route and rng.random() < 0.5:
+            x[k, prev, inst.depot] = 1
+        for (kk, i, j) in P:
+            if kk == k:
+                P[k, i, j] = int(u[k, j] > u[k, i]) if i != inst.depot else rng.randint(0, 1)
+
+        # Drone sorties (i, j, l)
+        for _ in range(rng.randint(0, 2)):
+            targets = sorted(inst.VD - served)
+            if not targets:
+                break
+            j = rng.choice(targets)
+            i = rng.choice(sorted(inst.VL - {j}))
+            l = rng.choice(sorted(inst.VR - {i, j}) or [None])
+            if l is None:
+                break
+            y_drone[k, i, j, l] = 1
+            a_prime[k, i] = a[k, i]
+            a_prime[k, j] = a[k, i] + int(t_prime[i][j]) + slack()
+            a[k, l] = max(a[k, l], a_prime[k, j] + int(t_prime[j][l]) + slack())
+            a_prime[k, l] = a[k, l]
+            served.add(j)
+
+        for i in inst.C:
+            late = max(0, a[k, i] - inst.D[i], a_prime[k, i] - inst.D[i])
+            if (k, i) in delay:
+                delay[k, i] = late
+            elif i in route or any(y_drone[k, h, i, l] for h in inst.VL for l in inst.VR):
+                delay[i] = late     # per-node delay of the serving tandem
+
+    domains = variable_domains(inst)
+    names = [name for name in val if val[name]]
+    for _ in range(rng.randint(0, mutations)):
+        name = rng.choice(names)
+        key = rng.choice(list(val[name]))
+        lo, hi = domains[name]
+        if name in BOOL_FAMILIES:
+            val[name][key] = 1 - val[name][key]
+        else:
+            val[name][key] = max(lo, min(hi, val[name][key] + rng.randint(-3, 3)))
+    return val
+
+
+# ---------------- Solver Side ----------------
+def solver_verdict(model, var, val, refs=None):
+    """Fix `val` in a copy of `model` via assumptions and solve.
+
+    Only the (family, key) pairs in `refs` are fixed when it is given. Returns
+    (feasible, core) where core lists the pairs whose assumptions are
+    sufficient for infeasibility.
+    """
+    fixed = model.Clone()
+    assumptions = []
+    for name, family in var.items():
+        for key, v in family.items():
+            if refs is not None and (name, key) not in refs:
+                continue
+            value = val[name][key]
+            if name in BOOL_FAMILIES:
+                lit = v if value == 1 else v.Not()
+            else:
+                lit = fixed.NewBoolVar(f"fix_{v.Name()}")
+                fixed.Add(v == value).OnlyEnforceIf(lit)
+            assumptions.append(((name, key), lit))
+    fixed.AddAssumptions([lit for _, lit in assumptions])
+
+    solver = cp_model.CpSolver()
+    solver.parameters.num_search_workers = 1
+    solver.parameters.max_time_in_seconds = 10
+    status = solver.Solve(fixed)
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return True, []
+    if status != cp_model.INFEASIBLE:
+        raise RuntimeError(f"Undecided fixed model: {solver.StatusName(status)}")
+    by_index = {fixed.Proto().assumptions[n]: ref for n, (ref, _) in enumerate(assumptions)}
+    core = [by_index[i] for i in solver.SufficientAssumptionsForInfeasibility() if i in by_index]
+    return False, core
+
+
+def minimize_core(model, var, val, core):
+    """Drop assumptions from `core` one at a time while it stays infeasible."""
+    core = list(core)
+    for ref in list(core):
+        if ref not in core:
+            continue
+        rest = [r for r in core if r != ref]
+        feasible, smaller = solver_verdict(model, var, val, set(rest))
+        if not feasible:
+            core = smaller or rest
+    return core
+
+
+def compare(inst, t, t_prime, model, var, val, **options):
+    """Solver and evaluator verdicts for one assignment."""
+    feasible, core = solver_verdict(model, var, val)
+    bad = violations(inst, t, t_prime, val, **options)
+    return feasible, bad, core
+
+
+def disagree(feasible, bad):
+    return feasible != (not bad)
+
+
+# ---------------- Shrinking ----------------
+def shrink(inst, t, t_prime, model, var, val, **options):
+    """Greedily zero out variables while solver and evaluator still disagree."""
+    val = {name: dict(family) for name, family in val.items()}
+    changed = True
+    while changed:
+        changed = False
+        for name, family in val.items():
+            for key, value in family.items():
+                if value == 0:
+                    continue
+                family[key] = 0
+                if disagree(*compare(inst, t, t_prime, model, var, val, **options)[:2]):
+                    changed = True
+                else:
+                    family[key] = value
+    return val
+
+
+def counterexample(inst, t, t_prime, model, var, val, minimize=True, **options):
+    if minimize:
+        val = shrink(inst, t, t_prime, model, var, val, **options)
+    feasible, bad, core = compare(inst, t, t_prime, model, var, val, **options)
+    if minimize and core:
+        core = minimize_core(model, var, val, core)
+    return {
+        "instance": inst,
+        "assignment": {name: {key: v for key, v in family.items() if v}
+                       for name, family in val.items()},
+        "solver_feasible": feasible,
+        "evaluator_violations": bad,
+        "core": core,
+    }
+
+
+def format_counterexample(cx):
+    inst = cx["instance"]
+    lines = [
+        f"n={len(inst.C)} N={inst.N} VT={sorted(inst.VT)} T={inst.T} E={inst.E} WT_max={inst.WT_max}",
+        f"  V={inst.V}",
+        f"  w={inst.w} D={inst.D}",
+        f"  solver feasible={cx['solver_feasible']} evaluator violations={cx['evaluator_violations']}",
+    ]
+    for name, family in cx["assignment"].items():
+        if family:
+            lines.append(f"  {name}: {family}")
+    if cx["core"]:
+        lines.append(f"  core: {cx['core']}")
+    return "\n".join(lines)
+
+
+# ---------------- Batch Runner ----------------
+def run(instances=100, assignments=20, seed=0, min_nodes=2, max_nodes=5,
+        max_tandems=2, builder=build_model, minimize=True, **options):
+    """Fuzz `builder` against the evaluator.
+
+    `options` (e.g. compact_delay) are passed to both the builder and the
+    evaluator. Returns (stats, counterexamples); counterexamples are sorted so
+    the smallest instance comes first.
+    """
+    rng = random.Random(seed)
+    stats = {"instances": 0, "assignments": 0, "feasible": 0, "infeasible": 0, "disagreements": 0}
+    found = []
+    for _ in range(instances):
+        inst = random_instance(rng, rng.randint(min_nodes, max_nodes), N=rng.randint(1, max_tandems))
+        t, t_prime = time_matrices(inst)
+        model, var = builder(inst, t, t_prime, **options)
+        stats["instances"] += 1
+        for _ in range(assignments):
+            val = random_assignment(inst, t, t_prime, var, rng)
+            feasible, bad, _ = compare(inst, t, t_prime, model, var, val, **options)
+            stats["assignments"] += 1
+            stats["feasible" if feasible else "infeasible"] += 1
+            if disagree(feasible, bad):
+                stats["disagreements"] += 1
+                found.append(counterexample(inst, t, t_prime, model, var, val, minimize, **options))
+    found.sort(key=lambda cx: (cx["instance"].num_nodes, sum(map(len, cx["assignment"].values()))))
+    return stats, found
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cross-check the CP-SAT encoding against the direct evaluator.")
+    parser.add_argument("--instances", type=int, default=200)
+    parser.add_argument("--assignments", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-nodes", type=int, default=2)
+    parser.add_argument("--max-nodes", type=int, default=5)
+    parser.add_argument("--max-tandems", type=int, default=2)
+    parser.add_argument("--compact-delay", action="store_true", help="fuzz the per-node delay encoding")
+    parser.add_argument("--sortie-intervals", action="store_true", help="fuzz the no-overlap form of (62)")
+    parser.add_argument("--show", type=int, default=3, help="counterexamples to print")
+    args = parser.parse_args()
+
+    stats, found = run(args.instances, args.assignments, args.seed,
+                       args.min_nodes, args.max_nodes, args.max_tandems,
+                       compact_delay=args.compact_delay, sortie_intervals=args.sortie_intervals)
+    print(", ".join(f"{k}={v}" for k, v in stats.items()))
+    for cx in found[:args.show]:
+        print()
+        print(format_counterexample(cx))
@@ -0,0 +1,107 @@
+import json
+import os
+import random
+import time
+from dataclasses import replace
+
+import pytest
+from ortools.sat.python import cp_model
+
+import cli
+from checkpoint import Checkpoints, checkpointed_solve, load_checkpoint, write_checkpoint
+from instance import default_instance, random_instance, save_instance
+from optimisetester import build_model, solve
+from solcache import add_hint, solution_values
+
+#-----------------------------------------------------------------------------------------
+# Incumbent checkpoints: atomic writes, write intervals and resuming from a hint
+#-----------------------------------------------------------------------------------------
+
+def run_case(inst, path, **kwargs):
+    kwargs.setdefault("max_time_in_seconds", 20)
+    return checkpointed_solve(inst, str(path), **kwargs)
+
+def hard_instance():
+    # First solution after about a second, still improving after several
+    return random_instance(random.Random(3), 10, N=2, grid=25, horizon=120)
+
+#-----------------------------------------------------------------------------------------
+# Tests
+#-----------------------------------------------------------------------------------------
+def test_write_checkpoint_replaces_atomically(tmp_path):
+    path = tmp_path / "ck.json"
+    write_checkpoint(str(path), {"objective": 2})
+    write_checkpoint(str(path), {"objective": 1})
+    assert load_checkpoint(str(path)) == {"objective": 1}
+    assert os.listdir(tmp_path) == ["ck.json"]
+
+def test_checkpoint_every_improvement(tmp_path):
+    inst = default_instance()
+    solver, status, _, _, checkpoints = run_case(inst, tmp_path / "ck.json")
+    saved = load_checkpoint(str(tmp_path / "ck.json"))
+    assert status == cp_model.OPTIMAL and saved["status"] == "OPTIMAL"
+    assert saved["objective"] == solver.ObjectiveValue() == saved["plan"]["objective"]
+    assert checkpoints.writes >= 2
+
+    model, var = build_model(inst)
+    add_hint(model, var, saved)
+    check = cp_model.CpSolver()
+    check.parameters.fix_variables_to_their_hinted_value = True
+    check.parameters.num_search_workers = 1
+    assert check.Solve(model) == cp_model.OPTIMAL and check.ObjectiveValue() == saved["objective"]
+
+def test_checkpoint_interval(tmp_path):
+    path = tmp_path / "ck.json"
+    solver, status, _, _, checkpoints = run_case(hard_instance(), path, interval=1.0, max_time_in_seconds=4)
+    assert status == cp_model.FEASIBLE
+    assert 1 <= checkpoints.writes <= 6
+    assert load_checkpoint(str(path))["objective"] == solver.ObjectiveValue()
+
+def test_interval_snapshot_written_by_flush(tmp_path):
+    inst = default_instance()
+    model, var = build_model(inst)
+    checkpoints = Checkpoints(str(tmp_path / "ck.json"), var, inst, interval=100.0)
+    solver, status = solve(model, 20, 1, early_stop=checkpoints)
+    assert status == cp_model.OPTIMAL
+    assert set(checkpoints.pending) == {"status", "objective", "bound", "wall_time", "solution"}
+    assert checkpoints.flush()
+    saved = load_checkpoint(str(tmp_path / "ck.json"))
+    assert saved["objective"] == saved["plan"]["objective"] == solver.ObjectiveValue()
+    assert saved["values"] == solution_values(solver, var)
+
+def test_resume_from_checkpoint(tmp_path):
+    path = tmp_path / "ck.json"
+    inst = hard_instance()
+    run_case(inst, path, max_time_in_seconds=4)
+    first = load_checkpoint(str(path))
+    solver, status, _, _, checkpoints = run_case(None, path, resume=True, max_time_in_seconds=3)
+    assert checkpoints.inst == inst
+    assert solver.ObjectiveValue() <= first["objective"]
+    assert load_checkpoint(str(path))["objective"] == min(first["objective"], solver.ObjectiveValue())
+    with pytest.raises(ValueError):
+        run_case(replace(inst, E=inst.E + 1), path, resume=True)
+
+def test_cli_checkpoint_and_resume(tmp_path, capsys):
+    path, checkpoint = str(tmp_path / "inst.json"), str(tmp_path / "ck.json")
+    save_instance(default_instance(), path)
+    assert cli.main(["solve", path, "--json", "--checkpoint", checkpoint, "--time-limit", "20"]) == 0
+    first = json.loads(capsys.readouterr().out)
+    assert load_checkpoint(checkpoint)["objective"] == first["plan"]["objective"]
+    assert cli.main(["solve", "--json", "--checkpoint", checkpoint, "--resume", "--time-limit", "20"]) == 0
+    resumed = json.loads(capsys.readouterr().out)
+    assert resumed["status"] == "OPTIMAL" and resumed["plan"]["objective"] == first["plan"]["objective"]
+
+#-----------------------------------------------------------------------------------------
+# Feedback
+#-----------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    import tempfile
+
+    path = os.path.join(tempfile.mkdtemp(), "ck.json")
+    inst = hard_instance()
+    start = time.time()
+    for phase in range(4):
+        solver, status, _, _, checkpoints = run_case(inst, path, interval=2.0, resume=True,
+                                                    max_time_in_seconds=15)
+        print(f"{time.time() - start:6.1f}s phase {phase}: {solver.StatusName(status)} "
+              f"{solver.ObjectiveValue()} bound {solver.BestObjectiveBound()}, {checkpoints.writes} writes")
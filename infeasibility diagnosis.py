@@ -0,0 +1,79 @@
+import json
+import random
+import time
+from dataclasses import replace
+
+from ortools.sat.python import cp_model
+
+import cli
+from diagnose import diagnose, explain
+from instance import default_instance, random_instance, save_instance
+from optimisetester import build_model, solve, time_matrices
+
+#-----------------------------------------------------------------------------------------
+# Infeasibility diagnosis: guarded families solved under assumptions
+#-----------------------------------------------------------------------------------------
+
+def run_case(inst, **kwargs):
+    start = time.time()
+    result = diagnose(inst, max_time_in_seconds=20, **kwargs)
+    return result, time.time() - start
+
+def short_horizon():
+    # Big-M T shorter than a round trip between two nodes: (54) cannot hold with x = 0
+    return replace(default_instance(), T=10, horizon=10)
+
+#-----------------------------------------------------------------------------------------
+# Tests
+#-----------------------------------------------------------------------------------------
+def test_feasible_instance_has_no_core():
+    result, _ = run_case(default_instance())
+    assert result["status"] == "OPTIMAL" and "core" not in result
+    assert explain(result) == ["Not infeasible (OPTIMAL): nothing to explain."]
+
+def test_core_names_family_and_nodes():
+    inst = short_horizon()
+    solver, status = solve(build_model(inst)[0], max_time_in_seconds=20)
+    assert status == cp_model.INFEASIBLE
+    result, _ = run_case(inst)
+    assert result["status"] == "INFEASIBLE" and result["families"] == ["54"]
+    t, _ = time_matrices(inst)
+    for group in result["core"]:
+        i, j = group["nodes"]
+        assert t[i][j] + t[j][i] > 2 * inst.T
+
+def test_core_for_endurance():
+    # E = 0: (61) fails even for unflown sorties whose two legs exceed T
+    inst = replace(random_instance(random.Random(0), 5, N=1, grid=12, horizon=14), T=14, E=0)
+    result, _ = run_case(inst)
+    assert result["families"] == ["61"]
+    _, t_prime = time_matrices(inst)
+    for group in result["core"]:
+        i, j, l = group["nodes"]
+        assert max(t_prime[a][b] + t_prime[b][c] for a, b, c in
+                   ((i, j, l), (i, l, j), (j, i, l), (j, l, i), (l, i, j), (l, j, i))) > inst.T + inst.E
+
+def test_compact_delay_diagnosis():
+    result, _ = run_case(short_horizon(), compact_delay=True)
+    assert result["families"] == ["54"]
+
+def test_cli_diagnose(tmp_path, capsys):
+    path = str(tmp_path / "inst.json")
+    save_instance(short_horizon(), path)
+    assert cli.main(["diagnose", path, "--json", "--time-limit", "20"]) == 1
+    result = json.loads(capsys.readouterr().out)
+    assert result["families"] == ["54"]
+    assert cli.main(["diagnose", "--time-limit", "20"]) == 0
+
+#-----------------------------------------------------------------------------------------
+# Feedback
+#-----------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    for n, N in ((8, 2), (12, 3), (16, 3)):
+        inst = replace(random_instance(random.Random(n), n, N=N, grid=30, horizon=40), T=40)
+        start = time.time()
+        solver, status = solve(build_model(inst)[0], max_time_in_seconds=30)
+        print(f"n={n}, N={N}: plain solve {solver.StatusName(status)} in {time.time() - start:.2f}s")
+        result, elapsed = run_case(inst)
+        print(f"    diagnosed in {elapsed:.2f}s over {result['groups']} groups")
+        print("\n".join("    " + line for line in explain(result)))
@@ -0,0 +1,213 @@
+import json
+import random
+from dataclasses import asdict, dataclass, field, replace
+
+# ---------------- Instance Data ----------------
+# Everything the truck-drone tandem model needs to know about one scenario.
+# Kept free of numpy/ortools so it can be imported cheaply.
+
+@dataclass
+class Instance:
+    V: list                        # node coordinates, V[0] is the depot
+    w: list                        # weights (w[0] = 0 for the depot)
+    D: dict                        # deadlines per affected area
+    VT: set                        # truck-accessible affected areas
+    VD: set                        # affected areas served by drone
+    horizon: int = 150
+    T: int = 150                   # Planning horizon (minutes)
+    E: int = 35                    # Maximum drone endurance (minutes)
+    N: int = 2                     # Number of truck-drone tandems
+    WT_max: int = 15               # Truck capacity
+    WD_max: int = 5                # Drone capacity
+    ct: int = 2                    # Truck cost per minute
+    cd: int = 1                    # Drone cost per minute
+    vt: float = 1.0                # Truck speed (km/min)
+    vd: float = 1.5                # Drone speed (km/min)
+    alpha: dict = field(default_factory=dict)   # cost per minute of delay
+    beta: dict = field(default_factory=dict)    # penalty if unserved
+    resolution: int = 1            # Minutes per model time unit (horizon, T, E, D are in units)
+
+    depot = 0
+
+    @property
+    def num_nodes(self):
+        return len(self.V)
+
+    @property
+    def K(self):
+        return range(self.N)        # Set of tandems
+
+    @property
+    def C(self):
+        return set(range(1, self.num_nodes))   # Affected areas (excluding depot)
+
+    @property
+    def VL(self):
+        return set(range(self.num_nodes))      # Separation nodes (truck-accessible)
+
+    @property
+    def VR(self):
+        return set(range(1, self.num_nodes))   # Rendezvous nodes (excluding depot)
+
+
+def make_instance(V, w, D, VT, VD=None, alpha_value=5.0, beta_value=100.0, **params):
+    """Build an Instance with the same alpha/beta for every affected area."""
+    C = range(1, len(V))
+    return Instance(
+        V=list(V), w=list(w), D=dict(D),
+        VT=set(VT), VD=set(VT if VD is None else VD),
+        alpha={i: alpha_value for i in C},
+        beta={i: beta_value for i in C},
+        **params,
+    )
+
+
+def default_instance():
+    """The 7-area scenario the model was developed against."""
+    V = [
+        (0, 0),    # depot
+        (15, 3),   # node 1
+        (18, 7),   # node 2
+        (4, 2),    # node 3
+        (5, 4),    # node 4
+        (3, 6),    # node 5
+        (20, 10),  # node 6
+        (6, 1)     # node 7
+    ]
+    w = [0, 6, 7, 1, 2, 2, 8, 1]
+    D = {1: 100, 2: 110, 3: 35, 4: 45, 5: 55, 6: 120, 7: 40}
+    VT = {1, 2, 6}
+    return make_instance(V, w, D, VT)
+
+
+def random_instance(rng, n, N=1, grid=12, horizon=60):
+    """Small random scenario with n affected areas, for fuzzing and benchmarks."""
+    if not isinstance(rng, random.Random):
+        rng = random.Random(rng)
+    V = [(0, 0)] + [(rng.randint(0, grid), rng.randint(0, grid)) for _ in range(n)]
+    w = [0] + [rng.randint(1, 8) for _ in range(n)]
+    D = {i: rng.randint(horizon // 4, horizon) for i in range(1, n + 1)}
+    VT = {i for i in range(1, n + 1) if rng.random() < 0.5}
+    return make_instance(
+        V, w, D, VT,
+        horizon=horizon, T=horizon,
+        E=rng.randint(horizon // 6, horizon // 2),
+        N=N,
+        WT_max=rng.randint(5, 20),
+    )
+
+
+def rescale_instance(inst, resolution):
+    """Copy of `inst` measured in time units of `resolution` minutes.
+
+    horizon, T, E and D are rounded to the new units; the per-unit costs
+    ct, cd and alpha are scaled so objectives stay in the same currency.
+    """
+    f = resolution / inst.resolution
+    if f == int(f):
+        f = int(f)
+
+    def units(value):
+        return int(round(value / f))
+
+    return replace(
+        inst,
+        resolution=resolution,
+        horizon=units(inst.horizon), T=units(inst.T), E=units(inst.E),
+        D={i: units(d) for i, d in inst.D.items()},
+        ct=inst.ct * f, cd=inst.cd * f,
+        alpha={i: a * f for i, a in inst.alpha.items()},
+        beta=dict(inst.beta),
+    )
+
+
+# ---------------- Instance Files ----------------
+# JSON with the Instance fields; node-keyed dicts use string keys, sets are
+# lists. alpha/beta may be omitted in favour of alpha_value/beta_value.
+
+def instance_to_dict(inst):
+    d = asdict(inst)
+    d["V"] = [list(p) for p in inst.V]
+    d["VT"], d["VD"] = sorted(inst.VT), sorted(inst.VD)
+    for key in ("D", "alpha", "beta"):
+        d[key] = {str(i): v for i, v in sorted(d[key].items())}
+    return d
+
+
+def instance_from_dict(d):
+    d = dict(d)
+    V = [tuple(p) for p in d.pop("V")]
+    w, VT, VD = d.pop("w"), d.pop("VT"), d.pop("VD", None)
+    D = {int(i): v for i, v in d.pop("D").items()}
+    alpha, beta = d.pop("alpha", None), d.pop("beta", None)
+    inst = make_instance(V, w, D, VT, VD, d.pop("alpha_value", 5.0), d.pop("beta_value", 100.0), **d)
+    if alpha is not None:
+        inst.alpha = {int(i): v for i, v in alpha.items()}
+    if beta is not None:
+        inst.beta = {int(i): v for i, v in beta.items()}
+    return inst
+
+
+def load_instance(path):
+    with open(path) as f:
+        return instance_from_dict(json.load(f))
+
+
+def save_instance(inst, path):
+    with open(path, "w") as f:
+        json.dump(instance_to_dict(inst), f, indent=2)
+
+
+# ---------------- Validation ----------------
+def validate_instance(inst):
+    """List of problems with `inst`; empty when it can be solved."""
+    errors = []
+    n = inst.num_nodes
+    C = inst.C
+    if n < 2:
+        errors.append("V needs the depot and at least one affected area")
+    if len(inst.w) != n:
+        errors.append(f"w has {len(inst.w)} entries for {n} nodes")
+    elif any(weight < 0 for weight in inst.w):
+        errors.append("w has negative weights")
+    for name in ("D", "alpha", "beta"):
+        values = getattr(inst, name)
+        missing = sorted(C - set(values))
+        extra = sorted(set(values) - C)
+        if missing:
+            errors.append(f"{name} is missing nodes {missing}")
+        if extra:
+            errors.append(f"{name} has unknown nodes {extra}")
+    for name in ("VT", "VD"):
+        extra = sorted(getattr(inst, name) - C)
+        if extra:
+            errors.append(f"{name} has unknown nodes {extra}")
+    for name in ("horizon", "T", "E", "N", "WT_max", "WD_max"):
+        if getattr(inst, name) < 0:
+            errors.append(f"{name} must not be negative")
+    for name in ("vt", "vd", "resolution"):
+        if getattr(inst, name) <= 0:
+            errors.append(f"{name} must be positive")
+    if inst.horizon > inst.T:
+        errors.append("horizon exceeds T, which the big-M rows assume as a bound")
+    return errors
+
+
+def model_size(inst, compact_delay=False):
+    """Variable counts of build_model for `inst`, computed without building it."""
+    N, n = inst.N, inst.num_nodes
+    nC, nVL, nVR = len(inst.C), len(inst.VL), len(inst.VR)
+    sorties = sum(1 for i in inst.VL for j in inst.VD for l in inst.VR if len({i, j, l}) == 3)
+    size = {
+        "x": N * n * (n - 1),
+        "y": N * (n - 1),
+        "u": N * (n - 1),
+        "y_drone": N * nVL * nC * nVR,
+        "P": N * (nVL * nC - nC),
+        "a": N * n,
+        "a_prime": N * n,
+        "delay": nC if compact_delay else N * nC,
+    }
+    size["variables"] = sum(size.values())
+    size["free_sorties"] = N * sorties
+    return size
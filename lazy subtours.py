@@ -0,0 +1,85 @@
+import random
+import time
+from dataclasses import replace
+
+import pytest
+from ortools.sat.python import cp_model
+
+import evaluator
+from instance import default_instance, random_instance
+from optimisetester import build_model, solve, time_matrices
+from subtours import STATIC, build_relaxed, lazy_solve, routes
+
+#-----------------------------------------------------------------------------------------
+# Lazy subtour elimination: relaxed model, detected cycles and added cuts
+#-----------------------------------------------------------------------------------------
+
+def run_case(inst, **kwargs):
+    t, t_prime = time_matrices(inst)
+    result = lazy_solve(inst, t, t_prime, max_time_in_seconds=60, **kwargs)
+    solver, status = solve(build_model(inst, t, t_prime)[0], max_time_in_seconds=60)
+    return result, solver, status
+
+def coincident():
+    # Two pairs of affected areas at the same spot: zero-time cycles pass (54)
+    inst = default_instance()
+    V = list(inst.V)
+    V[3], V[5] = V[2], V[4]
+    return replace(inst, V=V)
+
+#-----------------------------------------------------------------------------------------
+# Tests
+#-----------------------------------------------------------------------------------------
+def test_routes_split():
+    inst = default_instance()
+    assert routes(inst, {}) == ([], [])
+    assert routes(inst, {0: 3, 3: 5, 5: 0}) == ([3, 5], [])
+    route, cycles = routes(inst, {0: 1, 1: 0, 2: 4, 4: 2, 6: 7, 7: 3, 3: 6})
+    assert route == [1] and sorted(map(sorted, cycles)) == [[2, 4], [3, 6, 7]]
+
+def test_relaxed_model_drops_static_rows():
+    inst = default_instance()
+    t, t_prime = time_matrices(inst)
+    rows = {}
+    full, _ = build_model(inst, t, t_prime, rows=rows)
+    relaxed, _ = build_relaxed(inst, t, t_prime)
+    dropped = sum(len(rows[f]) for f in STATIC)
+    assert len(relaxed.Proto().constraints) == len(full.Proto().constraints) - dropped
+
+@pytest.mark.parametrize("n, N", [(7, 2), (9, 2)])
+def test_lazy_matches_static_model(n, N):
+    inst = random_instance(random.Random(n), n, N=N)
+    result, solver, status = run_case(inst)
+    assert result["status"] == status == cp_model.OPTIMAL
+    assert result["plan"]["objective"] == solver.ObjectiveValue()
+    t, t_prime = time_matrices(inst)
+    assert evaluator.violations(inst, t, t_prime, result["values"]) == []
+
+@pytest.mark.parametrize("cut", ["subtour", "circuit"])
+def test_cuts_remove_zero_time_cycles(cut):
+    inst = coincident()
+    result, solver, status = run_case(inst, cut=cut)
+    assert result["rounds"][0]["subtours"] > 0 and result["rounds"][-1]["subtours"] == 0
+    assert result["rounds"][0]["objective"] < solver.ObjectiveValue()
+    assert result["status"] == status == cp_model.OPTIMAL
+    assert result["plan"]["objective"] == solver.ObjectiveValue()
+    t, t_prime = time_matrices(inst)
+    assert evaluator.violations(inst, t, t_prime, result["values"]) == []
+
+def test_infeasible_and_bad_cut():
+    result = lazy_solve(replace(default_instance(), T=10, horizon=10), max_time_in_seconds=20)
+    assert result["status"] == cp_model.INFEASIBLE and "plan" not in result
+    with pytest.raises(ValueError):
+        lazy_solve(default_instance(), cut="comb")
+
+#-----------------------------------------------------------------------------------------
+# Feedback
+#-----------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    for n, N in ((8, 2), (10, 2), (12, 3)):
+        inst = random_instance(random.Random(n), n, N=N)
+        start = time.time()
+        result, solver, status = run_case(inst)
+        print(f"n={n}, N={N}: lazy {[r['constraints'] for r in result['rounds']]} rows, "
+              f"{result.get('plan', {}).get('objective')} in {result['wall_time']:.2f}s; "
+              f"static {solver.StatusName(status)} {solver.ObjectiveValue()} in {solver.WallTime():.2f}s")
@@ -0,0 +1,111 @@
+import time
+
+from ortools.sat.python import cp_model
+
+from instance import rescale_instance
+from optimisetester import apply_params, build_model, solution_plan
+
+# ---------------- Coarse-to-Fine Solve ----------------
+# Solves the instance first in coarse time buckets (e.g. 5 minutes), where
+# horizon, deadlines and travel times shrink by that factor and so do the
+# arrival-time domains and big-M rows, then solves the fine model warm-started
+# from the coarse routing. With fix_routes the coarse truck arcs and sorties are
+# fixed instead of hinted; if that leaves the fine model infeasible (rounding
+# can hide a late arrival or a too-long flight) or finds no solution in time,
+# it falls back to the hint for what is left of fine_time.
+
+ROUTING = ("x", "y", "y_drone", "P")     # families carried over unchanged
+TIMES = ("a", "a_prime", "delay")         # families rescaled to the fine units
+
+
+def _solver(max_time_in_seconds, num_search_workers, params):
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = max_time_in_seconds
+    solver.parameters.num_search_workers = num_search_workers
+    if params:
+        apply_params(solver, params)
+    return solver
+
+
+def coarse_values(solver, var, factor, horizon):
+    """Solution of the coarse model as {(family, key): value} in fine units."""
+    values = {}
+    for f, family in var.items():
+        for key, v in family.items():
+            value = solver.Value(v)
+            if f in TIMES:
+                value = min(value * factor, horizon)
+            values[f, key] = value
+    return values
+
+
+def coarse_to_fine(inst, resolution=5, coarse_time=10, fine_time=30, num_search_workers=8,
+                   compact_delay=False, fix_routes=False, params=None):
+    """Solve `inst` in two phases; returns a dict with the fine solver, status,
+    model, var and plan plus a "coarse" summary and the time of each phase.
+
+    `inst` sets the fine resolution; `resolution` is the coarse one, in minutes.
+    """
+    factor = resolution / inst.resolution
+    coarse = rescale_instance(inst, resolution)
+    start = time.time()
+    coarse_model, coarse_var = build_model(coarse, compact_delay=compact_delay)
+    coarse_solver = _solver(coarse_time, num_search_workers, params)
+    coarse_status = coarse_solver.Solve(coarse_model)
+    result = {
+        "coarse": {"status": coarse_solver.StatusName(coarse_status), "resolution": resolution,
+                   "wall_time": time.time() - start},
+    }
+
+    start = time.time()
+    model, var = build_model(inst, compact_delay=compact_delay)
+    values = {}
+    if coarse_status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        result["coarse"]["objective"] = coarse_solver.ObjectiveValue()
+        values = coarse_values(coarse_solver, coarse_var, factor, inst.horizon)
+        for (f, key), value in values.items():
+            model.AddHint(var[f][key], int(value))
+
+    mode = "hint" if values else "cold"
+    solver = _solver(fine_time, num_search_workers, params)
+    if fix_routes and values:
+        fixed = model.Clone()
+        for (f, key), value in values.items():
+            if f in ROUTING:
+                fixed.Add(var[f][key] == value)
+        fixed_start = time.time()
+        status = solver.Solve(fixed)
+        if status in (cp_model.INFEASIBLE, cp_model.UNKNOWN):
+            remaining = max(0.0, fine_time - (time.time() - fixed_start))
+            solver = _solver(remaining, num_search_workers, params)
+            status = solver.Solve(model)
+        else:
+            model, mode = fixed, "fixed"
+    else:
+        status = solver.Solve(model)
+
+    result.update(solver=solver, status=status, model=model, var=var, mode=mode,
+                  fine_wall_time=time.time() - start)
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        result["plan"] = solution_plan(solver, var, inst)
+    return result
+
+
+if __name__ == "__main__":
+    import random
+
+    from instance import random_instance
+    from optimisetester import solve
+
+    inst = random_instance(random.Random(3), 9, N=2, grid=40, horizon=240)
+    start = time.time()
+    model, _ = build_model(inst)
+    solver, status = solve(model, max_time_in_seconds=60)
+    print(f"direct: {solver.StatusName(status)} objective={solver.ObjectiveValue()} "
+          f"in {time.time() - start:.2f}s")
+    for fix_routes in (False, True):
+        result = coarse_to_fine(inst, resolution=5, fine_time=60, fix_routes=fix_routes)
+        print(f"coarse-to-fine ({result['mode']}): {result['coarse']['status']} "
+              f"{result['coarse'].get('objective')} in {result['coarse']['wall_time']:.2f}s, then "
+              f"{result['solver'].StatusName(result['status'])} {result['solver'].ObjectiveValue()} "
+              f"in {result['fine_wall_time']:.2f}s")
@@ -1,485 +1,909 @@
-from ortools.sat.python import cp_model
-import numpy as np
-model = cp_model.CpModel()
-
-# ---------------- Input Data ----------------
-V = [
-    (0, 0),    # depot
-    (15, 3),   # node 1 
-    (18, 7),   # node 2 
-    (4, 2),    # node 3 
-    (5, 4),    # node 4 
-    (3, 6),    # node 5 
-    (20, 10),  # node 6 
-    (6, 1)     # node 7
-]
-#weights
-w = [
-    0,   
-    6,   
-    7,   
-    1,   
-    2,   
-    2,   
-    8,   
-    1    
-]
-
-#deadlines
-D = {
-    1: 100,  
-    2: 110,  
-    3: 35,   
-    4: 45,   
-    5: 55,   
-    6: 120,  
-    7: 40    
-}
-
-#parameters
-horizon = 150
-T = 150                        # Planning horizon (minutes)
-E = 35                         # Maximum drone endurance (minutes)
-N = 2                          # Number of truck-drone tandems
-K = range(N)                   # Set of tandems
-depot = 0
-num_nodes = len(V)
-C = set(range(1, num_nodes))   # Affected areas (excluding depot)
-VL = set(range(num_nodes))     # Separation nodes (truck-accessible)
-VR = set(range(1, num_nodes))  # Rendezvous nodes (excluding depot)
-VT = {1, 2, 6}                 # truck-accessible affected areas
-VD = VT        # remaining affected areas served by drone
-n = len(C)
-
-WT_max = 15   # Truck capacity
-WD_max = 5    # Drone capacity
-ct = 2      # Truck cost per minute
-cd = 1      # Drone cost per minute
-vt = 1.0      # Truck speed (km/min)
-vd = 1.5      # Drone speed (km/min)
-
-alpha_value = 5.0    # cost per minute of delay (same for all nodes)
-beta_value  = 100.0  # penalty if unserved (same for all nodes)
-
-alpha = {i: alpha_value for i in C}
-beta  = {i: beta_value  for i in C}
-
-# ---------------- Time Matrices ----------------
-pts = np.array(V)
-truck_dist_matrix = np.abs(pts[:, None, :] - pts[None, :, :]).sum(axis=2)
-t_float = truck_dist_matrix / vt                  # truck travel time (float)
-euclidean_matrix = np.linalg.norm(pts[:, None, :] - pts[None, :, :], axis=2)
-t_prime_float = euclidean_matrix / vd             # drone travel time (float)
-
-# Convert to integer minutes
-t = np.rint(t_float).astype(int)                  # truck time matrix (int)
-t_prime = np.rint(t_prime_float).astype(int)      # drone time matrix (int)
-
-# ---------------- Decision Variables ----------------
-x = {}
-y = {}
-u = {}
-y_drone = {}
-
-for k in K:
-    for i in range(num_nodes):
-        for j in range(num_nodes):
-            if i != j:
-                x[k, i, j] = model.NewBoolVar(f"x_{k}_{i}_{j}")
-    for i in range(1, num_nodes):
-        y[k, i] = model.NewBoolVar(f"y_{k}_{i}")
-        u[k, i] = model.NewIntVar(0, num_nodes - 1, f"u_{k}_{i}")
-        model.Add(u[k, i] >= y[k, i])
-        model.Add(u[k, i] <= (num_nodes - 1) * y[k, i])
-
-
-y_drone = {}
-for k in K:
-    for i in VL:          
-        for j in C:       
-            for l in VR:  
-                y_drone[k, i, j, l] = model.NewBoolVar(f"y_drone_{k}_{i}_{j}_{l}")
-                if (j not in VD) or (i == j) or (i == l) or (j == l):
-                    model.Add(y_drone[k, i, j, l] == 0)
-
-P = {}
-for k in K:
-    for i in VL:
-        for j in C:
-            if i != j:
-                P[k, i, j] = model.NewBoolVar(f"P_{k}_{i}_{j}")
-
-a = {}
-a_prime = {}
-
-for k in K:
-    for i in range(num_nodes):
-        a[k, i] = model.NewIntVar(0, horizon, f"a_{k}_{i}")         
-        a_prime[k, i] = model.NewIntVar(0, horizon, f"a_prime_{k}_{i}")  
-
-delay = {}
-for k in K:
-    for i in C:
-        delay[k, i] = model.NewIntVar(0, horizon, f"delay_{k}_{i}")
-
-
-# ---------------- Constraints ----------------
-# (36) Each affected area visited at most once (truck or drone)
-for j in C:
-    truck_part = sum(x[k, i, j] for k in K for i in VL if i != j)
-    drone_part = sum(
-        y_drone[k, i, j, l]
-        for k in K
-        for i in VL if i != j
-        for l in VR if l != i and l != j
-        if (k, i, j, l) in y_drone  # ensures j∈VD and variable was created
-    )
-    model.Add(truck_part + drone_part <= 1)
-
-# (37, 38) Depot departure and return
-for k in K:
-    model.Add(sum(x[k, depot, j] for j in C) <= 1)  
-    model.Add(sum(x[k, i, depot] for i in C) <= 1)  
-
-# (39) Flow conservation
-for k in K:
-    for j in C:
-        incoming = sum(x[k, i, j] for i in VL if i != j)
-        outgoing = sum(x[k, j, l] for l in VR if l != j)
-        model.Add(incoming - outgoing == 0)
-
-# (40) Trucks cannot reach road-damaged areas
-for k in K:
-    for i in VT:
-        for j in VT:
-            if i != j:
-                model.Add(x[k, i, j] == 0)
-
-# (41,42) prevent the formation of subtours for the truck by ensuring that the truck does not traverse through previously visited arcs
-M = len(C)  # maximum number of customer nodes
-for k in K:
-    for i in VL:
-        for j in VR:
-            if i != j and i != depot and j != depot:
-                model.Add(u[k, i] - u[k, j] + 1 <= M * (1 - x[k, i, j]))
-
-for k in K:
-    for j in VR:
-        incoming = sum(x[k, i, j] for i in VL if i != j)
-        model.Add(u[k, j] <= M * incoming)
-
-# (43,44) define the sequence of truck tours to prevent a node from being visited mulitple times within a single truck route
-for k in K:
-    for i in VL:
-        for j in C:
-            if i != j and i != depot and j != depot:
-                model.Add(u[k, j] - u[k, i] <= M * P[k, i, j])
-                model.Add(u[k, j] - u[k, i] >= M * (P[k, i, j] - 1) + 1)
-
-# (45): enforces capacity limit for truck
-for k in K:
-    weighted_effort = []
-
-    for i in C:
-        # First term: truck arcs from i to rendezvous j
-        for j in VR:
-            if j != i:
-                weighted_effort.append(w[j] * x[k, i, j])
-
-    # Second term: drone arcs from i to j to l
-    for j in VD:
-        for i in VL:
-            if i != j and i != k:
-                for l in VR:
-                    if l != i and l != j:
-                        weighted_effort.append(w[j] * y_drone[k, i, j, l])
-
-    model.Add(sum(weighted_effort) <= WT_max)
-
-# (46) drones are restricted to serving affected areas within a set (V_d)
-for k in K:
-    for i in VL:
-        for j in C:
-            for l in VR:
-                if (
-                    i == j or i == l or
-                    j == i or j == l or j not in VD or
-                    l == i or l == j
-                ):
-                    model.Add(y_drone[k, i, j, l] == 0)
-
-# (47,48) the drone can be launched and returned only once per node
-for k in K:
-    for i in VL:
-        launch_trips = []
-        for j in C:
-            if j != i:
-                for l in VR:
-                    if l != i and l != j:
-                        launch_trips.append(y_drone[k, i, j, l])
-        model.Add(sum(launch_trips) <= 1)
-
-for k in K:
-    for l in VR:
-        rendezvous_trips = []
-        for i in VL:
-            if i != l:
-                for j in C:
-                    if j != i and j != l:
-                        rendezvous_trips.append(y_drone[k, i, j, l])
-        model.Add(sum(rendezvous_trips) <= 1)
-
-# (49)the drone can be launched and retrieved at different nodes along the truck route
-for k in K:
-    for i in VT.union({depot}):     
-        for j in VD:                
-            for l in VR:            
-                if i == l or i == j or j == l:
-                    continue
-                if (k, i, j, l) not in y_drone:
-                    continue  
-                y_var = y_drone[k, i, j, l]
-                sum_out_i = sum(x[k, i, t] for t in VT.union({depot}) if t != i)
-                sum_in_l  = sum(x[k, t, l] for t in VT.union({depot}) if t != l)
-                model.Add(2 * y_var <= sum_out_i + sum_in_l)
-
-# (50) mandates that the associated truck must depart from any node to reach the rendezvous node l
-for k in K:
-    for j in C:
-        for l in VR:
-            if j != l:
-                rhs = sum(x[k, i, l] for i in VL if i != j and i != l)
-                model.Add(y_drone[k, 0, j, l] <= rhs)
-
-# (51,52) initialize the arrival time of the truck and drone at the start of each route to zero, ensuring routes commence from the depot at the beginning
-for k in K:
-    model.Add(a[k, 0] == 0)
-    model.Add(a_prime[k, 0] == 0)
-
-# (53) ensures that the arrival time of the truck at the depot does not exceed the planning horizon T
-for k in K:
-    model.Add(a[k, depot] <= T)
-
-# (54) ensures the continuity of truck arrival times, requiring that a truck’s arrival at node j is later than at node i if j is visited after i
-for k in K:
-    for i in VL:
-        for j in VR:
-            if i != j:
-                model.Add(
-                    a[k, i] + t[i][j] <= a[k, j] + T * (1 - x[k, i, j])
-                )
-            
-# (55, 56) similarly guarantee drone arrival time continuity, ensuring that a drone’s arrival at subsequent nodes is sequential
-# (55) 
-for k in K:
-    for i in VL:
-        for j in C:
-            if i == j:
-                continue
-            # collect flights (i,j,l)
-            flights_ijl = [y_drone[k, i, j, l]
-                           for l in VR
-                           if l != i and l != j and (k, i, j, l) in y_drone]
-            if flights_ijl:
-                # sum is 0 or 1 (due to launch/rendezvous uniqueness)
-                sum_ijl = sum(flights_ijl)
-                model.Add(a[k, i] + t_prime[i][j] - T * (1 - sum_ijl) <= a_prime[k, j])
-
-# (56) 
-for k in K:
-    for j in C:
-        for l in VR:
-            if j == l:
-                continue
-            flights_ijl = [y_drone[k, i, j, l]
-                           for i in VL
-                           if i != j and i != l and (k, i, j, l) in y_drone]
-            if flights_ijl:
-                sum_ijl = sum(flights_ijl)
-                model.Add(a_prime[k, j] + t_prime[j][l] - T * (1 - sum_ijl) <= a[k, l])
-
-# (57-60) synchronize the arrival times of trucks and drones, ensuring synchronized launch and rendezvous
-# 57 and 58: launch synchronization
-for k in K:
-    for i in VL:
-        terms = [
-            y_drone[k, i, j, l]
-            for j in C if j != i
-            for l in VR if l != i and l != j and (k, i, j, l) in y_drone
-        ]
-        if terms:  # check the list, not the sum
-            sortie_sum = sum(terms)
-            model.Add(a_prime[k, i] >= a[k, i] - T * (1 - sortie_sum))  # 57
-            model.Add(a_prime[k, i] <= a[k, i] + T * (1 - sortie_sum))  # 58
-
-# 59 and 60: rendezvous synchronization
-for k in K:
-    for l in VR:
-        terms = [
-            y_drone[k, i, j, l]
-            for i in VL if i != l
-            for j in C if j != i and j != l and (k, i, j, l) in y_drone
-        ]
-        if terms:
-            sortie_sum = sum(terms)
-            model.Add(a_prime[k, l] >= a[k, l] - T * (1 - sortie_sum))  # 59
-            model.Add(a_prime[k, l] <= a[k, l] + T * (1 - sortie_sum))  # 60
-
-# (61) ensures that the total flight time of the drone does not exceed its endurance E
-for k in K:
-    for i in VL:
-        for j in C:
-            for l in VR:
-                if i != j and i != l and j != l and (k, i, j, l) in y_drone:
-                    model.Add(
-                        t_prime[i][j]        # t'_{ij}
-                        + t_prime[j][l]      # t'_{jl}
-                        - T * (1 - y_drone[k, i, j, l])
-                        <= E
-                    )
-
-# (62) prevents trucks from launching drones that are still delivering, ensuring sequential operations
-for k in K:
-    for i in VL:
-        for l in VR:
-            for b in C:
-                if i != b and i != l and l != b:
-                    # First sum: Σ_{j ∈ C \ {i,l}} y_{i j l}^k
-                    sum1_terms = [
-                        y_drone[k, i, j, l]
-                        for j in C
-                        if j != i and j != l and (k, i, j, l) in y_drone
-                    ]
-
-                    # Second sum: Σ_{q ∈ C \ {b,m}} Σ_{m ∈ VR \ {b,q}} y_{b q m}^k
-                    sum2_terms = [
-                        y_drone[k, b, q, m]
-                        for q in C if q != b
-                        for m in VR if m != b and m != q and (k, b, q, m) in y_drone
-                    ]
-
-                    # Only add if at least one term exists
-                    if sum1_terms or sum2_terms or (k, l, b) in P:
-                        sum1 = sum(sum1_terms) if sum1_terms else 0
-                        sum2 = sum(sum2_terms) if sum2_terms else 0
-                        P_var = P[k, l, b] if (k, l, b) in P else 0
-
-                        model.Add(
-                            a_prime[k, l]
-                            - T * (3 - sum1 - sum2 - P_var)
-                            <= a_prime[k, b]
-                        )
-
-#63 calculates the delay time of truck k or drone k at node i.
-for k in K:
-    for i in C:
-        model.Add(delay[k, i] >= a[k, i] - D[i])       # truck lateness
-        model.Add(delay[k, i] >= a_prime[k, i] - D[i])  # drone lateness
-
-# ---------------- Objective Function ----------------
-truck_cost = sum(t[i][j] * ct * x[k, i, j]
-                 for k in K
-                 for i in range(num_nodes)
-                 for j in range(num_nodes) if i != j)
-
-drone_cost = sum((t_prime[i][j] + t_prime[j][l]) * cd * y_drone[k, i, j, l]
-                 for k in K
-                 for i in VL
-                 for j in C
-                 for l in VR
-                 if i != j and j != l and i != l)
-
-delay_penalty = sum(alpha[i] * delay[k, i] for k in K for i in C)
-
-# Truck service credit: Σ_{k∈K} Σ_{j∈VR\{i}} x_{i j}^k
-truck_service_terms = {
-    i: [x[k, i, j] for k in K for j in VR
-        if j != i and (k, i, j) in x]
-    for i in C
-}
-
-# Drone service credit: Σ_{k∈K} Σ_{j∈C\{i,l}} Σ_{l∈VR\{i,j}} y_{i j l}^k
-drone_service_terms = {
-    i: [y_drone[k, i, j, l] for k in K for j in C for l in VR
-        if j != i and l != i and l != j and (k, i, j, l) in y_drone]
-    for i in C
-}
-
-# Unserved penalty: Σ_{i∈C} β_i (1 − Σtruck − Σdrone)
-unserved_penalty = sum(
-    beta[i] * (1 - (sum(truck_service_terms[i]) + sum(drone_service_terms[i])))
-    for i in C
-)
-
-# Final objective
-model.Minimize(truck_cost + drone_cost + delay_penalty + unserved_penalty)
-
-# ---------------- Solve ----------------
-solver = cp_model.CpSolver()
-solver.parameters.max_time_in_seconds = 30
-solver.parameters.num_search_workers = 8
-status = solver.Solve(model)
-
-# ---------------- Solution Printer ----------------
-def print_solution_min(status):
-    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-        print("Status:", solver.StatusName(status))
-        print("No solution.")
-        return
-    print("Status:", solver.StatusName(status))
-    print("Objective:", solver.ObjectiveValue())
-
-    # ---- Truck deliveries (nodes in VT) ----
-    print("\nTruck deliveries:")
-    found_truck_delivery = False
-    for k in K:
-        for j in VT:
-            # Check if any incoming arc exists and is selected
-            incoming_arcs = []
-            for i in VT.union({depot}):
-                if i != j and (k, i, j) in x:
-                    if solver.Value(x[k, i, j]) == 1:
-                        incoming_arcs.append(i)
-            
-            if len(incoming_arcs) == 1:
-                found_truck_delivery = True
-                # Get arrival time if variable exists
-                if (k, j) in a:
-                    t_arr = solver.Value(a[k, j])
-                else:
-                    t_arr = "N/A"
-                print(f"  Truck {k} delivers to node {j} at time {t_arr}")
-    if not found_truck_delivery:
-        print("  None")
-
-    # ---- Drone flights ----
-    print("\nDrone flights:")
-    found_drone_flight = False
-    for key, var in y_drone.items():
-        if solver.Value(var) == 1:
-            k, i, j, l = key
-            found_drone_flight = True
-            # Get times if variables exist
-            launch_t = solver.Value(a[k, i]) if (k, i) in a else "N/A"
-            service_t = solver.Value(a_prime[k, j]) if (k, j) in a_prime else "N/A"
-            rend_t = solver.Value(a[k, l]) if (k, l) in a else "N/A"
-            print(f"  Tandem {k}: launch from {i} at t={launch_t}, deliver to {j} at t={service_t}, rendezvous at {l} at t={rend_t}")
-    if not found_drone_flight:
-        print("  None")
-
-    # ---- Rendezvous summary ----
-    print("\nRendezvous events:")
-    rnd_events = set()
-    for key, var in y_drone.items():
-        if solver.Value(var) == 1:
-            k, i, j, l = key
-            rnd_events.add((k, l))
-    if rnd_events:
-        for k, l in sorted(rnd_events):
-            rt = solver.Value(a[k, l]) if (k, l) in a else "N/A"
-            print(f"  Tandem {k} at node {l}, time={rt}")
-    else:
-        print("  None")
-
-# Call after solving
-print_solution_min(status)
+import json
+import threading
+import time
+
+from ortools.sat.python import cp_model
+import numpy as np
+
+from instance import default_instance
+from varstore import VarArray, distinct, masked
+
+# ---------------- Time Matrices ----------------
+def time_matrices(inst):
+    """Integer truck (Manhattan) and drone (Euclidean) travel times in time
+    units of inst.resolution minutes."""
+    pts = np.array(inst.V)
+    truck_dist_matrix = np.abs(pts[:, None, :] - pts[None, :, :]).sum(axis=2)
+    t_float = truck_dist_matrix / inst.vt             # truck travel time (float)
+    euclidean_matrix = np.linalg.norm(pts[:, None, :] - pts[None, :, :], axis=2)
+    t_prime_float = euclidean_matrix / inst.vd        # drone travel time (float)
+
+    # Convert to integer time units
+    t = np.rint(t_float / inst.resolution).astype(int)              # truck time matrix (int)
+    t_prime = np.rint(t_prime_float / inst.resolution).astype(int)  # drone time matrix (int)
+    return t, t_prime
+
+
+# ---------------- Model ----------------
+def add_variables(model, inst, compact_delay=False, arcs=None, sorties=None):
+    """Decision variables, as a dict mapping each family name (x, y, u, y_drone,
+    P, a, a_prime, delay) to its VarArray, indexed like the subscripts of the
+    model (x[k, i, j], y_drone[k, i, j, l], ...). An (n, n) boolean `arcs`
+    mask restricts x to the truck arcs it keeps, an (N, n, n, n) `sorties`
+    mask y_drone to the sorties it keeps."""
+    K, C, VL, VR = inst.K, inst.C, inst.VL, inst.VR
+    num_nodes, horizon = inst.num_nodes, inst.horizon
+    N, n = inst.N, num_nodes
+
+    x = VarArray(model, (N, n, n))
+    y = VarArray(model, (N, n))
+    u = VarArray(model, (N, n))
+    y_drone = VarArray(model, (N, n, n, n))
+
+    for k in K:
+        for i in range(num_nodes):
+            for j in range(num_nodes):
+                if i != j and (arcs is None or arcs[i][j]):
+                    x[k, i, j] = model.NewBoolVar(f"x_{k}_{i}_{j}")
+        for i in range(1, num_nodes):
+            y[k, i] = model.NewBoolVar(f"y_{k}_{i}")
+            u[k, i] = model.NewIntVar(0, num_nodes - 1, f"u_{k}_{i}")
+
+    for k in K:
+        for i in VL:
+            for j in C:
+                for l in VR:
+                    if sorties is None or sorties[k, i, j, l]:
+                        y_drone[k, i, j, l] = model.NewBoolVar(f"y_drone_{k}_{i}_{j}_{l}")
+
+    P = VarArray(model, (N, n, n))
+    for k in K:
+        for i in VL:
+            for j in C:
+                if i != j:
+                    P[k, i, j] = model.NewBoolVar(f"P_{k}_{i}_{j}")
+
+    a = VarArray(model, (N, n))
+    a_prime = VarArray(model, (N, n))
+
+    for k in K:
+        for i in range(num_nodes):
+            a[k, i] = model.NewIntVar(0, horizon, f"a_{k}_{i}")
+            a_prime[k, i] = model.NewIntVar(0, horizon, f"a_prime_{k}_{i}")
+
+    # With compact_delay there is one delay per affected area, keyed by node
+    if compact_delay:
+        delay = VarArray(model, (n,))
+        for i in C:
+            delay[i] = model.NewIntVar(0, horizon, f"delay_{i}")
+    else:
+        delay = VarArray(model, (N, n))
+        for k in K:
+            for i in C:
+                delay[k, i] = model.NewIntVar(0, horizon, f"delay_{k}_{i}")
+
+    return dict(x=x, y=y, u=u, y_drone=y_drone, P=P, a=a, a_prime=a_prime, delay=delay)
+
+
+def is_compact_delay(var):
+    return var["delay"].index.ndim == 1
+
+
+def proper_sorties(var):
+    """y_drone index array restricted to sorties with distinct i, j and l."""
+    index = var["y_drone"].index
+    return masked(index, distinct(index.shape[1], 3))
+
+
+# ---------------- Constraints ----------------
+def order_links(model, inst, t, t_prime, var):
+    K, num_nodes = inst.K, inst.num_nodes
+    y, u = var["y"], var["u"]
+
+    # Order variables are positive exactly on visited nodes
+    for k in K:
+        for i in range(1, num_nodes):
+            model.Add(u[k, i] >= y[k, i])
+            model.Add(u[k, i] <= (num_nodes - 1) * y[k, i])
+
+
+def sortie_slots(inst):
+    """(n, n, n) mask of the proper sorties (i, j, l) of the full model, whether
+    or not their y_drone is declared: rows keep their y = 0 form for the
+    sorties build_model(prune=True) leaves out."""
+    n = inst.num_nodes
+    slots = distinct(n, 3)
+    slots[:, 0, :] = slots[:, :, 0] = False
+    return slots
+
+
+def improper_sorties(inst, var):
+    """y_drone variables outside the proper (i, j, l) triples serving VD, in key order."""
+    y_drone = var["y_drone"]
+    serves_vd = np.isin(np.arange(inst.num_nodes), sorted(inst.VD))[None, :, None]
+    return y_drone.vars(masked(y_drone.index, ~(distinct(inst.num_nodes, 3) & serves_vd)))
+
+
+def sortie_domain(model, inst, t, t_prime, var):
+    # Sorties only exist for proper (i, j, l) triples serving VD
+    for v in improper_sorties(inst, var):
+        model.Add(v == 0)
+
+
+def constraint_36(model, inst, t, t_prime, var):
+    C = inst.C
+    x, y_drone = var["x"], var["y_drone"]
+    sorties = proper_sorties(var)
+
+    # (36) Each affected area visited at most once (truck or drone)
+    for j in C:
+        truck_part = x.sum(x.index[:, :, j])
+        drone_part = y_drone.sum(sorties[:, :, j, :])
+        model.Add(truck_part + drone_part <= 1)
+
+
+def constraint_37_38(model, inst, t, t_prime, var):
+    K, C, depot = inst.K, inst.C, inst.depot
+    x = var["x"]
+
+    # (37, 38) Depot departure and return
+    for k in K:
+        model.Add(sum(x.get((k, depot, j), 0) for j in C) <= 1)  
+        model.Add(sum(x.get((k, i, depot), 0) for i in C) <= 1)
+
+
+def constraint_39(model, inst, t, t_prime, var):
+    K, C, VL, VR = inst.K, inst.C, inst.VL, inst.VR
+    x = var["x"]
+
+    # (39) Flow conservation
+    for k in K:
+        for j in C:
+            incoming = sum(x.get((k, i, j), 0) for i in VL if i != j)
+            outgoing = sum(x.get((k, j, l), 0) for l in VR if l != j)
+            model.Add(incoming - outgoing == 0)
+
+
+def constraint_40(model, inst, t, t_prime, var):
+    K, VT = inst.K, inst.VT
+    x = var["x"]
+
+    # (40) Trucks cannot reach road-damaged areas
+    for k in K:
+        for i in VT:
+            for j in VT:
+                if (k, i, j) in x:
+                    model.Add(x[k, i, j] == 0)
+
+
+def constraint_41_42(model, inst, t, t_prime, var):
+    K, C, VL, VR, depot = inst.K, inst.C, inst.VL, inst.VR, inst.depot
+    x, u = var["x"], var["u"]
+
+    # (41,42) prevent the formation of subtours for the truck by ensuring that the truck does not traverse through previously visited arcs
+    M = len(C)  # maximum number of customer nodes
+    for k in K:
+        for i in VL:
+            for j in VR:
+                if i != j and i != depot and j != depot:
+                    # An undeclared arc keeps its x = 0 row (see build_model's arcs)
+                    used = x.get((k, i, j), 0)
+                    model.Add(u[k, i] - u[k, j] + 1 <= M * (1 - used))
+
+    for k in K:
+        for j in VR:
+            incoming = sum(x.get((k, i, j), 0) for i in VL if i != j)
+            model.Add(u[k, j] <= M * incoming)
+
+
+def constraint_43_44(model, inst, t, t_prime, var):
+    K, C, VL, depot = inst.K, inst.C, inst.VL, inst.depot
+    u, P = var["u"], var["P"]
+    M = len(C)  # maximum number of customer nodes
+
+    # (43,44) define the sequence of truck tours to prevent a node from being visited mulitple times within a single truck route
+    for k in K:
+        for i in VL:
+            for j in C:
+                if i != j and i != depot and j != depot:
+                    model.Add(u[k, j] - u[k, i] <= M * P[k, i, j])
+                    model.Add(u[k, j] - u[k, i] >= M * (P[k, i, j] - 1) + 1)
+
+
+def constraint_45(model, inst, t, t_prime, var):
+    capacity(model, inst, var, inst.K)
+
+
+def capacity(model, inst, var, tandems):
+    """Rows of (45) for `tandems`, stored in that order along the tandem axis of var."""
+    C, VL, VR, VD, w, WT_max = inst.C, inst.VL, inst.VR, inst.VD, inst.w, inst.WT_max
+    x, y_drone = var["x"], var["y_drone"]
+
+    # (45): enforces capacity limit for truck
+    for row, k in enumerate(tandems):
+        weighted_effort = []
+
+        for i in C:
+            # First term: truck arcs from i to rendezvous j
+            for j in VR:
+                if (row, i, j) in x:
+                    weighted_effort.append(w[j] * x[row, i, j])
+
+        # Second term: drone arcs from i to j to l (skipping launch node i == k)
+        for j in VD:
+            for i in VL:
+                if i != j and i != k:
+                    for l in VR:
+                        if l != i and l != j and (row, i, j, l) in y_drone:
+                            weighted_effort.append(w[j] * y_drone[row, i, j, l])
+
+        model.Add(sum(weighted_effort) <= WT_max)
+
+
+def constraint_46(model, inst, t, t_prime, var):
+    # (46) drones are restricted to serving affected areas within a set (V_d)
+    for v in improper_sorties(inst, var):
+        model.Add(v == 0)
+
+
+def constraint_47_48(model, inst, t, t_prime, var):
+    K, VL, VR = inst.K, inst.VL, inst.VR
+    y_drone = var["y_drone"]
+    sorties = proper_sorties(var)
+
+    # (47,48) the drone can be launched and returned only once per node
+    for k in K:
+        for i in VL:
+            model.Add(y_drone.sum(sorties[k, i]) <= 1)
+
+    for k in K:
+        for l in VR:
+            model.Add(y_drone.sum(sorties[k, :, :, l]) <= 1)
+
+
+def constraint_49(model, inst, t, t_prime, var):
+    K, VR, VT, VD, depot = inst.K, inst.VR, inst.VT, inst.VD, inst.depot
+    x, y_drone = var["x"], var["y_drone"]
+
+    # (49)the drone can be launched and retrieved at different nodes along the truck route
+    stops = sorted(VT.union({depot}))
+    for k in K:
+        out_of = {i: x.sum(x.index[k, i, stops]) for i in stops}
+        into = {l: x.sum(x.index[k, stops, l]) for l in VR}
+        for i in stops:
+            for j in VD:
+                for l in VR:
+                    if i == l or i == j or j == l:
+                        continue
+                    if (k, i, j, l) not in y_drone:
+                        continue
+                    model.Add(2 * y_drone[k, i, j, l] <= out_of[i] + into[l])
+
+
+def constraint_50(model, inst, t, t_prime, var):
+    K, C, VL, VR = inst.K, inst.C, inst.VL, inst.VR
+    x, y_drone = var["x"], var["y_drone"]
+
+    # (50) mandates that the associated truck must depart from any node to reach the rendezvous node l
+    for k in K:
+        for j in C:
+            for l in VR:
+                if j != l and (k, 0, j, l) in y_drone:
+                    rhs = sum(x.get((k, i, l), 0) for i in VL if i != j and i != l)
+                    model.Add(y_drone[k, 0, j, l] <= rhs)
+
+
+def constraint_51_52(model, inst, t, t_prime, var):
+    K = inst.K
+    a, a_prime = var["a"], var["a_prime"]
+
+    # (51,52) initialize the arrival time of the truck and drone at the start of each route to zero, ensuring routes commence from the depot at the beginning
+    for k in K:
+        model.Add(a[k, 0] == 0)
+        model.Add(a_prime[k, 0] == 0)
+
+
+def constraint_53(model, inst, t, t_prime, var):
+    K, T, depot = inst.K, inst.T, inst.depot
+    a = var["a"]
+
+    # (53) ensures that the arrival time of the truck at the depot does not exceed the planning horizon T
+    for k in K:
+        model.Add(a[k, depot] <= T)
+
+
+def constraint_54(model, inst, t, t_prime, var):
+    K, T, VL, VR = inst.K, inst.T, inst.VL, inst.VR
+    x, a = var["x"], var["a"]
+
+    # (54) ensures the continuity of truck arrival times, requiring that a truck’s arrival at node j is later than at node i if j is visited after i
+    for k in K:
+        for i in VL:
+            for j in VR:
+                if i != j:
+                    # An undeclared arc keeps its x = 0 row (see build_model's arcs)
+                    used = x.get((k, i, j), 0)
+                    model.Add(
+                        a[k, i] + t[i][j] <= a[k, j] + T * (1 - used)
+                    )
+
+
+def constraint_55_56(model, inst, t, t_prime, var):
+    K, C, T, VL, VR = inst.K, inst.C, inst.T, inst.VL, inst.VR
+    y_drone, a, a_prime = var["y_drone"], var["a"], var["a_prime"]
+    sorties, slots = proper_sorties(var), sortie_slots(inst)
+
+    # (55, 56) similarly guarantee drone arrival time continuity, ensuring that a drone’s arrival at subsequent nodes is sequential
+    # (55) 
+    for k in K:
+        for i in VL:
+            for j in C:
+                # flights (i,j,l) over all l; their sum is 0 or 1 (due to launch/rendezvous uniqueness)
+                flights_ijl = sorties[k, i, j, :]
+                if slots[i, j, :].any():
+                    sum_ijl = y_drone.sum(flights_ijl)
+                    model.Add(a[k, i] + t_prime[i][j] - T * (1 - sum_ijl) <= a_prime[k, j])
+
+    # (56) 
+    for k in K:
+        for j in C:
+            for l in VR:
+                flights_ijl = sorties[k, :, j, l]
+                if slots[:, j, l].any():
+                    sum_ijl = y_drone.sum(flights_ijl)
+                    model.Add(a_prime[k, j] + t_prime[j][l] - T * (1 - sum_ijl) <= a[k, l])
+
+
+def constraint_57_60(model, inst, t, t_prime, var):
+    K, T, VL, VR = inst.K, inst.T, inst.VL, inst.VR
+    y_drone, a, a_prime = var["y_drone"], var["a"], var["a_prime"]
+    sorties, slots = proper_sorties(var), sortie_slots(inst)
+
+    # (57-60) synchronize the arrival times of trucks and drones, ensuring synchronized launch and rendezvous
+    # 57 and 58: launch synchronization
+    for k in K:
+        for i in VL:
+            terms = sorties[k, i]
+            if slots[i].any():  # check the terms, not the sum
+                sortie_sum = y_drone.sum(terms)
+                model.Add(a_prime[k, i] >= a[k, i] - T * (1 - sortie_sum))  # 57
+                model.Add(a_prime[k, i] <= a[k, i] + T * (1 - sortie_sum))  # 58
+
+    # 59 and 60: rendezvous synchronization
+    for k in K:
+        for l in VR:
+            terms = sorties[k, :, :, l]
+            if slots[:, :, l].any():
+                sortie_sum = y_drone.sum(terms)
+                model.Add(a_prime[k, l] >= a[k, l] - T * (1 - sortie_sum))  # 59
+                model.Add(a_prime[k, l] <= a[k, l] + T * (1 - sortie_sum))  # 60
+
+
+def constraint_61(model, inst, t, t_prime, var):
+    T, E = inst.T, inst.E
+    y_drone = var["y_drone"]
+    sorties = proper_sorties(var)
+
+    # (61) ensures that the total flight time of the drone does not exceed its endurance E
+    for (k, i, j, l), v in zip(np.argwhere(sorties >= 0).tolist(), y_drone.vars(sorties)):
+        model.Add(
+            t_prime[i][j]        # t'_{ij}
+            + t_prime[j][l]      # t'_{jl}
+            - T * (1 - v)
+            <= E
+        )
+    # An undeclared sortie keeps its y = 0 row, which only fails when the
+    # flight exceeds E + T: then no assignment satisfies the model
+    t_prime = np.asarray(t_prime)
+    flight = t_prime[:, :, None] + t_prime[None, :, :]
+    absent = sortie_slots(inst)[None] & (sorties < 0)
+    if (absent & (flight - T > E)[None]).any():
+        model.AddBoolOr([])
+
+
+def constraint_62(model, inst, t, t_prime, var):
+    K, C, T, VL, VR = inst.K, inst.C, inst.T, inst.VL, inst.VR
+    y_drone, P, a_prime = var["y_drone"], var["P"], var["a_prime"]
+    sorties, slots = proper_sorties(var), sortie_slots(inst)
+
+    # (62) prevents trucks from launching drones that are still delivering, ensuring sequential operations
+    for k in K:
+        # Second sum: Σ_{q ∈ C \ {b,m}} Σ_{m ∈ VR \ {b,q}} y_{b q m}^k, shared by every (i, l)
+        sum2_terms = {b: sorties[k, b] for b in C}
+        sum2_exprs = {b: y_drone.sum(sum2_terms[b]) for b in C}
+        for i in VL:
+            for l in VR:
+                # First sum: Σ_{j ∈ C \ {i,l}} y_{i j l}^k
+                sum1_terms = sorties[k, i, :, l]
+                sum1 = y_drone.sum(sum1_terms)
+                for b in C:
+                    if i != b and i != l and l != b:
+                        # Only add if at least one term exists
+                        if slots[i, :, l].any() or slots[b].any() or (k, l, b) in P:
+                            sum2 = sum2_exprs[b]
+                            P_var = P[k, l, b] if (k, l, b) in P else 0
+
+                            model.Add(
+                                a_prime[k, l]
+                                - T * (3 - sum1 - sum2 - P_var)
+                                <= a_prime[k, b]
+                            )
+
+
+def constraint_63(model, inst, t, t_prime, var):
+    K, C, T, D, VD = inst.K, inst.C, inst.T, inst.D, inst.VD
+    x, y_drone, a, a_prime, delay = var["x"], var["y_drone"], var["a"], var["a_prime"], var["delay"]
+    compact_delay = is_compact_delay(var)
+
+    #63 calculates the delay time of truck k or drone k at node i.
+    if compact_delay:
+        # Visit sums are 0/1 by (36), so T relaxes the rows of non-serving tandems
+        sorties = proper_sorties(var)
+        for k in K:
+            for i in C:
+                truck_visit = x.sum(x.index[k, :, i])
+                model.Add(delay[i] >= a[k, i] - D[i] - T * (1 - truck_visit))
+                if i in VD:
+                    drone_visit = y_drone.sum(sorties[k, :, i, :])
+                    model.Add(delay[i] >= a_prime[k, i] - D[i] - T * (1 - drone_visit))
+    else:
+        for k in K:
+            for i in C:
+                model.Add(delay[k, i] >= a[k, i] - D[i])       # truck lateness
+                model.Add(delay[k, i] >= a_prime[k, i] - D[i])  # drone lateness
+
+
+def sortie_no_overlap(model, inst, t, t_prime, var):
+    K, VD, horizon = inst.K, inst.VD, inst.horizon
+    y_drone, a = var["y_drone"], var["a"]
+    sorties = proper_sorties(var)
+
+    # Interval form of (62): a flown sortie (i, j, l) keeps the drone busy from
+    # its launch a_i until the truck picks it up at a_l, at least its flight
+    # time t'_{ij} + t'_{jl}; one drone per tandem, so the sorties of a tandem
+    # never overlap
+    intervals = {k: [] for k in K}
+    for (k, i, j, l), v in zip(np.argwhere(sorties >= 0).tolist(), y_drone.vars(sorties)):
+        if j not in VD:
+            continue
+        flight = int(t_prime[i][j] + t_prime[j][l])
+        if flight > horizon:
+            model.Add(v == 0)
+            continue
+        busy = model.NewIntVar(flight, horizon, f"busy_{k}_{i}_{j}_{l}")
+        intervals[k].append(model.NewOptionalIntervalVar(a[k, i], busy, a[k, l], v, f"sortie_{k}_{i}_{j}_{l}"))
+    for k in K:
+        model.AddNoOverlap(intervals[k])
+
+
+def enforced_order(model, inst, t, t_prime, var):
+    K, C, VL, VR, depot = inst.K, inst.C, inst.VL, inst.VR, inst.depot
+    x, u = var["x"], var["u"]
+    M = len(C)
+
+    # (41,42) with enforcement literals: the x = 0 row of (41) holds always and
+    # the x = 1 row only under the arc's literal, instead of one big-M row
+    for k in K:
+        for i in VL:
+            for j in VR:
+                if i != j and i != depot and j != depot:
+                    model.Add(u[k, i] - u[k, j] + 1 <= M)
+                    if (k, i, j) in x:
+                        model.Add(u[k, i] - u[k, j] + 1 <= 0).OnlyEnforceIf(x[k, i, j])
+
+    for k in K:
+        for j in VR:
+            incoming = sum(x.get((k, i, j), 0) for i in VL if i != j)
+            model.Add(u[k, j] <= M * incoming)
+
+
+def enforced_arrivals(model, inst, t, t_prime, var):
+    K, T, VL, VR = inst.K, inst.T, inst.VL, inst.VR
+    x, a = var["x"], var["a"]
+
+    # (54) with enforcement literals, split like enforced_order
+    for k in K:
+        for i in VL:
+            for j in VR:
+                if i != j:
+                    model.Add(a[k, i] + t[i][j] <= a[k, j] + T)
+                    if (k, i, j) in x:
+                        model.Add(a[k, i] + t[i][j] <= a[k, j]).OnlyEnforceIf(x[k, i, j])
+
+
+def circuit_order(model, inst, t, t_prime, var):
+    from subtours import circuit
+
+    K, C, VL, VR, depot = inst.K, inst.C, inst.VL, inst.VR, inst.depot
+    x, u = var["x"], var["u"]
+    M = len(C)
+
+    # One AddCircuit per tandem eliminates the subtours; u only numbers the
+    # route (1 after the depot, +1 per arc) for the sequence rows (43,44)
+    for k in K:
+        circuit(model, inst, var, k)
+        for i in VL:
+            for j in VR:
+                if i != j and j != depot:
+                    if i != depot:
+                        model.Add(u[k, i] - u[k, j] + 1 <= M)
+                    if (k, i, j) in x:
+                        position = 1 if i == depot else u[k, i] + 1
+                        model.Add(u[k, j] == position).OnlyEnforceIf(x[k, i, j])
+        for j in VR:
+            if j != depot:
+                model.Add(u[k, j] <= M * sum(x.get((k, i, j), 0) for i in VL if i != j))
+
+
+# Constraint families in build order, keyed by their equation numbers
+FAMILIES = {
+    "u": order_links,
+    "y_drone": sortie_domain,
+    "36": constraint_36,
+    "37,38": constraint_37_38,
+    "39": constraint_39,
+    "40": constraint_40,
+    "41,42": constraint_41_42,
+    "43,44": constraint_43_44,
+    "45": constraint_45,
+    "46": constraint_46,
+    "47,48": constraint_47_48,
+    "49": constraint_49,
+    "50": constraint_50,
+    "51,52": constraint_51_52,
+    "53": constraint_53,
+    "54": constraint_54,
+    "55,56": constraint_55_56,
+    "57,60": constraint_57_60,
+    "61": constraint_61,
+    "62": constraint_62,
+    "63": constraint_63,
+}
+
+# Families replaced when build_model is asked for sortie_intervals
+INTERVAL_FAMILIES = {
+    "62": sortie_no_overlap,
+}
+
+# Families replaced when build_model is asked for enforce (big-M rows as
+# enforced rows) or circuit (AddCircuit instead of the MTZ rows (41))
+ENFORCED_FAMILIES = {
+    "41,42": enforced_order,
+    "54": enforced_arrivals,
+}
+CIRCUIT_FAMILIES = {
+    "41,42": circuit_order,
+}
+
+
+# ---------------- Objective Function ----------------
+def objective(inst, t, t_prime, var):
+    K, C, ct, cd = inst.K, inst.C, inst.ct, inst.cd
+    alpha, beta = inst.alpha, inst.beta
+    x, y_drone, delay = var["x"], var["y_drone"], var["delay"]
+    compact_delay = is_compact_delay(var)
+    t, t_prime = np.asarray(t), np.asarray(t_prime)
+    sorties = proper_sorties(var)
+
+    # Arc costs as coefficient arrays broadcast over the index arrays
+    truck_coeffs = np.broadcast_to(t * ct, x.index.shape)[x.index >= 0]
+    truck_cost = cp_model.LinearExpr.WeightedSum(x.values(), truck_coeffs.tolist())
+
+    flight = t_prime[:, :, None] + t_prime[None, :, :]      # t'_{ij} + t'_{jl}
+    drone_coeffs = np.broadcast_to(flight * cd, sorties.shape)[sorties >= 0]
+    drone_cost = cp_model.LinearExpr.WeightedSum(y_drone.vars(sorties), drone_coeffs.tolist())
+
+    if compact_delay:
+        delay_penalty = sum(alpha[i] * delay[i] for i in C)
+    else:
+        delay_penalty = sum(alpha[i] * delay[k, i] for k in K for i in C)
+
+    # Truck service credit: Σ_{k∈K} Σ_{j∈VR\{i}} x_{i j}^k
+    truck_service_terms = {i: x.index[:, i, 1:] for i in C}
+
+    # Drone service credit: Σ_{k∈K} Σ_{j∈C\{i,l}} Σ_{l∈VR\{i,j}} y_{i j l}^k
+    drone_service_terms = {i: sorties[:, i] for i in C}
+
+    # Unserved penalty: Σ_{i∈C} β_i (1 − Σtruck − Σdrone)
+    unserved_penalty = sum(
+        beta[i] * (1 - (x.sum(truck_service_terms[i]) + y_drone.sum(drone_service_terms[i])))
+        for i in C
+    )
+
+    return truck_cost + drone_cost + delay_penalty + unserved_penalty
+
+
+def build_model(inst, t=None, t_prime=None, compact_delay=False, rows=None, sortie_intervals=False,
+                prune=False, arcs=None, enforce=False, circuit=False):
+    """Build the tandem model for `inst`; returns (model, var) where var maps
+    the variable family names (x, y, u, y_drone, P, a, a_prime, delay) to
+    their VarArray stores (see varstore.py).
+
+    With compact_delay, delay is a single variable per affected area keyed by
+    node, bounded only by the arrival of the tandem that serves it (truck
+    arrival a for a truck visit, drone arrival a_prime for a drone delivery)
+    instead of one delay per tandem and node.
+
+    With sortie_intervals, (62) becomes one NoOverlap per tandem over optional
+    sortie intervals from launch to rendezvous (see sortie_no_overlap). This
+    is tighter than the P-based rows, which only order a launch after an
+    earlier rendezvous, so the optimum can be higher.
+
+    With prune (True, or a precheck.precheck report of `inst` to reuse), the
+    arcs and sorties the pre-check finds unusable are not declared; like arcs outside an `arcs` mask, their rows keep the form
+    they take with x = 0 or y_drone = 0 (see sortie_slots).
+
+    An (n, n) boolean `arcs` mask declares only the truck arcs it keeps
+    (see sparsify.py). The big-M rows of (41,42) and (54) still hold with
+    x = 0 for the others, so the model is the full one with those arcs unused.
+
+    With enforce, the big-M rows of (41,42) and (54) are posted as their
+    x = 0 row plus an x = 1 row enforced by the arc literal (see
+    ENFORCED_FAMILIES); with circuit, the MTZ rows (41) give way to one
+    AddCircuit per tandem (see circuit_order). Both are equivalent to the
+    default rows; circuit takes precedence over enforce for (41,42).
+
+    If a dict is passed as `rows`, it is filled with the constraint indices
+    of each family in FAMILIES.
+    """
+    if t is None or t_prime is None:
+        t, t_prime = time_matrices(inst)
+    model = cp_model.CpModel()
+    sorties = None
+    if prune:
+        from precheck import precheck, useless_mask
+
+        report = prune if isinstance(prune, dict) else precheck(inst, t, t_prime)
+        usable = ~report["useless"]["x"]
+        arcs = usable if arcs is None else usable & np.asarray(arcs, dtype=bool)
+        sorties = ~useless_mask(report, inst.N)
+    var = add_variables(model, inst, compact_delay, arcs, sorties)
+    for name, add in FAMILIES.items():
+        if sortie_intervals:
+            add = INTERVAL_FAMILIES.get(name, add)
+        if enforce:
+            add = ENFORCED_FAMILIES.get(name, add)
+        if circuit:
+            add = CIRCUIT_FAMILIES.get(name, add)
+        start = len(model.Proto().constraints)
+        add(model, inst, t, t_prime, var)
+        if rows is not None:
+            rows[name] = list(range(start, len(model.Proto().constraints)))
+
+    model.Minimize(objective(inst, t, t_prime, var))
+    return model, var
+
+
+# ---------------- Solve ----------------
+def apply_params(solver, params):
+    """Set CP-SAT parameters from a {name: value} dict; enum values are given by name."""
+    for name, value in params.items():
+        if isinstance(value, bool):
+            value = "true" if value else "false"
+        solver.parameters.merge_text_format(f"{name}: {value}")
+
+
+def load_profile(path):
+    """Parameter dict of a profile file written by tune.py."""
+    with open(path) as f:
+        return json.load(f)["params"]
+
+
+class EarlyStop(cp_model.CpSolverSolutionCallback):
+    """Termination criteria beyond the time limit.
+
+    relative_gap / absolute_gap go to CP-SAT's gap limits, deadline is an
+    absolute time.time() after which the search stops, and stagnation_time
+    stops it once the incumbent has not improved for that many seconds. After
+    solve(), `reason` says why the search ended: "optimal", "infeasible",
+    "relative_gap", "absolute_gap", "stagnation", "deadline", "time_limit" or
+    "unknown".
+    """
+
+    def __init__(self, relative_gap=None, absolute_gap=None, stagnation_time=None, deadline=None):
+        super().__init__()
+        self.relative_gap = relative_gap
+        self.absolute_gap = absolute_gap
+        self.stagnation_time = stagnation_time
+        self.deadline = deadline
+        self.reason = None
+        self.best = None
+        self.last_improvement = None
+        self.stagnated = False
+
+    def configure(self, solver):
+        self.reason, self.best, self.last_improvement, self.stagnated = None, None, None, False
+        if self.relative_gap is not None:
+            solver.parameters.relative_gap_limit = self.relative_gap
+        if self.absolute_gap is not None:
+            solver.parameters.absolute_gap_limit = self.absolute_gap
+        if self.deadline is not None:
+            remaining = max(0.0, self.deadline - time.time())
+            solver.parameters.max_time_in_seconds = min(solver.parameters.max_time_in_seconds, remaining)
+
+    def on_solution_callback(self):
+        objective = self.ObjectiveValue()
+        if self.best is None or objective < self.best:
+            self.best = objective
+            self.last_improvement = time.time()
+
+    def watching(self):
+        """Whether solve() runs watch() next to the search."""
+        return self.stagnation_time is not None
+
+    def watch(self, solver, finished):
+        # Stagnation needs a clock: no callback fires while nothing improves
+        period = 0.1 if self.stagnation_time is None else min(0.1, self.stagnation_time)
+        while not finished.wait(period):
+            if self.tick(solver):
+                return
+
+    def tick(self, solver):
+        """Periodic check from watch(); True once the search has been stopped."""
+        if self.stagnation_time is not None and self.last_improvement is not None and \
+                time.time() - self.last_improvement >= self.stagnation_time:
+            self.stagnated = True
+            solver.StopSearch()
+            return True
+        return False
+
+    def explain(self, solver, status):
+        if status == cp_model.INFEASIBLE:
+            return "infeasible"
+        if status == cp_model.OPTIMAL:
+            gap = abs(solver.ObjectiveValue() - solver.BestObjectiveBound())
+            if gap < 1e-9:
+                return "optimal"
+            if self.absolute_gap is not None and gap <= self.absolute_gap:
+                return "absolute_gap"
+            return "relative_gap"
+        if self.stagnated:
+            return "stagnation"
+        if self.deadline is not None and time.time() >= self.deadline - 1e-3:
+            return "deadline"
+        if status == cp_model.FEASIBLE or solver.WallTime() >= solver.parameters.max_time_in_seconds - 1e-3:
+            return "time_limit"
+        return "unknown"
+
+
+def solve(model, max_time_in_seconds=30, num_search_workers=8, params=None, early_stop=None, log=None):
+    """Solve `model`; returns (solver, status). A solverlog.SearchLog passed as
+    `log` captures the search log."""
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = max_time_in_seconds
+    solver.parameters.num_search_workers = num_search_workers
+    if params:
+        apply_params(solver, params)
+    if log is not None:
+        log.attach(solver)
+    if early_stop is None:
+        status = solver.Solve(model)
+        return solver, status
+
+    early_stop.configure(solver)
+    finished = threading.Event()
+    watcher = None
+    if early_stop.watching():
+        watcher = threading.Thread(target=early_stop.watch, args=(solver, finished), daemon=True)
+        watcher.start()
+    status = solver.Solve(model, early_stop)
+    finished.set()
+    if watcher is not None:
+        watcher.join()
+    early_stop.reason = early_stop.explain(solver, status)
+    return solver, status
+
+
+# ---------------- Solution Plan ----------------
+def solution_plan(solver, var, inst):
+    """Structured plan of the solver's current solution.
+
+    truck maps (k, j) to the truck arrival at every affected area j with an
+    incoming arc of tandem k, drone maps each flown sortie (k, i, j, l) to its
+    (launch, service, rendezvous) times.
+    """
+    x, y_drone, a, a_prime = var["x"], var["y_drone"], var["a"], var["a_prime"]
+    truck = {}
+    for k in inst.K:
+        for j in inst.C:
+            if any(solver.Value(x[k, i, j]) for i in inst.VL if (k, i, j) in x):
+                truck[k, j] = solver.Value(a[k, j])
+    drone = {}
+    for (k, i, j, l), v in y_drone.items():
+        if solver.Value(v):
+            drone[k, i, j, l] = (solver.Value(a[k, i]), solver.Value(a_prime[k, j]), solver.Value(a[k, l]))
+    served = {j for _, j in truck} | {j for _, _, j, _ in drone}
+    return {
+        "objective": solver.ObjectiveValue(),
+        "truck": truck,
+        "drone": drone,
+        "unserved": sorted(inst.C - served),
+    }
+
+
+def plan_to_json(plan):
+    """solution_plan result with its tuple keys spelled out, for JSON output."""
+    return {
+        "objective": plan["objective"],
+        "truck": [{"tandem": k, "node": j, "arrival": arrival}
+                  for (k, j), arrival in sorted(plan["truck"].items())],
+        "drone": [{"tandem": k, "launch_node": i, "node": j, "rendezvous_node": l,
+                   "launch": launch, "service": service, "rendezvous": rendezvous}
+                  for (k, i, j, l), (launch, service, rendezvous) in sorted(plan["drone"].items())],
+        "unserved": plan["unserved"],
+    }
+
+
+# ---------------- Solution Printer ----------------
+def print_solution_min(solver, status, var, inst):
+    x, y_drone, a, a_prime = var["x"], var["y_drone"], var["a"], var["a_prime"]
+    K, VT, depot = inst.K, inst.VT, inst.depot
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        print("Status:", solver.StatusName(status))
+        print("No solution.")
+        return
+    print("Status:", solver.StatusName(status))
+    print("Objective:", solver.ObjectiveValue())
+
+    # ---- Truck deliveries (nodes in VT) ----
+    print("\nTruck deliveries:")
+    found_truck_delivery = False
+    for k in K:
+        for j in VT:
+            # Check if any incoming arc exists and is selected
+            incoming_arcs = []
+            for i in VT.union({depot}):
+                if i != j and (k, i, j) in x:
+                    if solver.Value(x[k, i, j]) == 1:
+                        incoming_arcs.append(i)
+            
+            if len(incoming_arcs) == 1:
+                found_truck_delivery = True
+                # Get arrival time if variable exists
+                if (k, j) in a:
+                    t_arr = solver.Value(a[k, j])
+                else:
+                    t_arr = "N/A"
+                print(f"  Truck {k} delivers to node {j} at time {t_arr}")
+    if not found_truck_delivery:
+        print("  None")
+
+    # ---- Drone flights ----
+    print("\nDrone flights:")
+    found_drone_flight = False
+    for key, var in y_drone.items():
+        if solver.Value(var) == 1:
+            k, i, j, l = key
+            found_drone_flight = True
+            # Get times if variables exist
+            launch_t = solver.Value(a[k, i]) if (k, i) in a else "N/A"
+            service_t = solver.Value(a_prime[k, j]) if (k, j) in a_prime else "N/A"
+            rend_t = solver.Value(a[k, l]) if (k, l) in a else "N/A"
+            print(f"  Tandem {k}: launch from {i} at t={launch_t}, deliver to {j} at t={service_t}, rendezvous at {l} at t={rend_t}")
+    if not found_drone_flight:
+        print("  None")
+
+    # ---- Rendezvous summary ----
+    print("\nRendezvous events:")
+    rnd_events = set()
+    for key, var in y_drone.items():
+        if solver.Value(var) == 1:
+            k, i, j, l = key
+            rnd_events.add((k, l))
+    if rnd_events:
+        for k, l in sorted(rnd_events):
+            rt = solver.Value(a[k, l]) if (k, l) in a else "N/A"
+            print(f"  Tandem {k} at node {l}, time={rt}")
+    else:
+        print("  None")
+
+
+if __name__ == "__main__":
+    import sys
+    params = load_profile(sys.argv[1]) if len(sys.argv) > 1 else None
+    inst = default_instance()
+    model, var = build_model(inst)
+    early_stop = EarlyStop()
+    solver, status = solve(model, params=params, early_stop=early_stop)
+    print_solution_min(solver, status, var, inst)
+    print("\nStop reason:", early_stop.reason)
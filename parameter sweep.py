@@ -0,0 +1,70 @@
+import io
+import random
+
+import pytest
+from ortools.sat.python import cp_model
+
+from instance import random_instance
+from optimisetester import build_model, solve
+from sweep import chains, grid, point_instance, sweep, write_table
+
+#-----------------------------------------------------------------------------------------
+# Parameter sweep: rows from the shared skeleton vs models built from scratch per point
+#-----------------------------------------------------------------------------------------
+
+def scenario(seed=0):
+    return random_instance(random.Random(seed), 5, N=2)
+
+def run_case(inst, points, jobs=1):
+    rows = sweep(inst, points, jobs, max_time_in_seconds=20, num_search_workers=1)
+    for point, row in zip(points, rows):
+        model, _ = build_model(point_instance(inst, point))
+        solver, status = solve(model, max_time_in_seconds=20, num_search_workers=1)
+        assert row["status"] == solver.StatusName(status)
+        if status == cp_model.OPTIMAL:
+            assert row["objective"] == solver.ObjectiveValue()
+    return rows
+
+#-----------------------------------------------------------------------------------------
+# Tests
+#-----------------------------------------------------------------------------------------
+def test_sweep_endurance_and_capacity():
+    rows = run_case(scenario(1), grid(E=[1, 10, 30], WT_max=[3, 20]))
+    assert [row["hinted"] for row in rows] == [False] + [True] * 5
+
+def test_sweep_costs_and_horizon():
+    inst = scenario(2)
+    run_case(inst, grid(alpha_value=[0.0, 50.0], beta_value=[10.0, 500.0]))
+    run_case(inst, grid(T=[inst.T // 2, inst.T], horizon=[inst.horizon // 2, inst.horizon * 2]))
+
+def test_sweep_fleet_size_and_infeasible_point():
+    inst = scenario(3)
+    rows = run_case(inst, [{"N": 1, "T": 0}, {"N": 1}, {"N": 3}])
+    assert rows[2]["hinted"] is False           # new N, new skeleton
+    assert chains([{"N": 1}, {"N": 1}, {"N": 3}], 1) == [[0, 1], [2]]
+
+def test_sweep_parallel_matches_serial():
+    inst = scenario(4)
+    points = grid(N=[1, 2], E=[5, 30])
+    serial = sweep(inst, points, 1, max_time_in_seconds=20, num_search_workers=1)
+    parallel = sweep(inst, points, 2, max_time_in_seconds=20, num_search_workers=1)
+    assert [r["objective"] for r in parallel] == [r["objective"] for r in serial]
+
+def test_sweep_table_and_unknown_field():
+    inst = scenario(5)
+    out = io.StringIO()
+    write_table(sweep(inst, grid(E=[5, 30]), max_time_in_seconds=20, num_search_workers=1), out)
+    lines = out.getvalue().splitlines()
+    assert lines[0].startswith("E,status,objective,bound") and len(lines) == 3
+    with pytest.raises(ValueError):
+        point_instance(inst, {"VD": set()})
+
+#-----------------------------------------------------------------------------------------
+# Feedback
+#-----------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    import sys
+
+    inst = scenario(1)
+    write_table(sweep(inst, grid(N=[1, 2], E=[5, 15, 30], WT_max=[5, 20]), jobs=2, max_time_in_seconds=20),
+                sys.stdout)
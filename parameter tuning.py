@@ -0,0 +1,71 @@
+import random
+
+from ortools.sat.python import cp_model
+
+import tune
+from instance import random_instance
+from optimisetester import apply_params, build_model, load_profile, solve
+
+#-----------------------------------------------------------------------------------------
+# Parameter tuning: configuration search, scoring and profile round trip
+#-----------------------------------------------------------------------------------------
+
+SMALL_SPACE = {
+    "num_search_workers": [1, 2],
+    "search_branching": ["AUTOMATIC_SEARCH", "FIXED_SEARCH"],
+    "cp_model_presolve": [True, False],
+}
+
+def run_case(strategy, tmp_path):
+    instances = tune.benchmark_instances(2, 4, N=1, seed=0)
+    ranked = tune.tune(instances, strategy, configs=4, time_limit=5, space=SMALL_SPACE)
+    path = tmp_path / "profile.json"
+    tune.write_profile(path, ranked, strategy=strategy)
+    return ranked, path
+
+#-----------------------------------------------------------------------------------------
+# Tests
+#-----------------------------------------------------------------------------------------
+def test_apply_params_enum_and_bool():
+    solver = cp_model.CpSolver()
+    apply_params(solver, {"search_branching": "FIXED_SEARCH", "cp_model_presolve": False,
+                          "linearization_level": 2})
+    assert solver.parameters.search_branching.name == "FIXED_SEARCH"
+    assert solver.parameters.cp_model_presolve is False
+    assert solver.parameters.linearization_level == 2
+
+def test_grid_covers_space():
+    assert len(tune.grid_configs(SMALL_SPACE)) == 8
+
+def test_random_configs_distinct():
+    configs = tune.random_configs(20, random.Random(0), SMALL_SPACE)
+    assert len(configs) == 8
+    assert len({tuple(c.values()) for c in configs}) == 8
+
+def test_pinned_configs_fit_the_cores():
+    configs = [{"num_search_workers": 1}, {"num_search_workers": 8}, {"search_branching": "FIXED_SEARCH"}]
+    pinned, jobs = tune.pinned_configs(configs, 3, cores=8)
+    assert jobs == 3 and [c["num_search_workers"] for c in pinned] == [1, 2, 2]
+    assert pinned[2]["search_branching"] == "FIXED_SEARCH" and "num_search_workers" not in configs[2]
+    pinned, jobs = tune.pinned_configs(configs, 16, cores=4)
+    assert jobs == 4 and all(c["num_search_workers"] == 1 for c in pinned)
+
+def test_tune_grid_ranks_and_writes_profile(tmp_path):
+    ranked, path = run_case("grid", tmp_path)
+    scores = [score for score, _ in ranked]
+    assert len(ranked) == 8 and scores == sorted(scores)
+    assert load_profile(path) == ranked[0][1]
+
+def test_halving_profile_solves(tmp_path):
+    ranked, path = run_case("halving", tmp_path)
+    model, _ = build_model(random_instance(random.Random(5), 4, N=1))
+    solver, status = solve(model, params=load_profile(path))
+    assert status == cp_model.OPTIMAL
+
+#-----------------------------------------------------------------------------------------
+# Feedback
+#-----------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    instances = tune.benchmark_instances(2, 4, N=1, seed=0)
+    for score, params in tune.tune(instances, "grid", time_limit=5, space=SMALL_SPACE):
+        print(f"{score:.3f}s {params}")
@@ -0,0 +1,176 @@
+import argparse
+import threading
+import time
+
+from ortools.sat.python import cp_model
+
+from instance import default_instance
+from optimisetester import apply_params, build_model, print_solution_min, time_matrices
+
+# ---------------- Formulation Portfolio ----------------
+# Builds several formulation variants of one instance and races them in
+# threads, each with its share of the search workers. The best incumbent found
+# by any variant is shared as a solution hint when variants are restarted, and
+# the race ends as soon as the shared gap reaches the target.
+
+# name -> build_model keyword arguments. Every variant has the same optimum:
+# delay per tandem or per area, big-M or enforced rows for (41,42) and (54),
+# MTZ rows or AddCircuit against subtours, and dense or pruned (precheck)
+# arcs and sorties. sortie_intervals and an arcs mask restrict the model, so
+# their optimum can be higher and they are not raced.
+VARIANTS = {
+    "per_tandem_delay": {},
+    "compact_delay": {"compact_delay": True},
+    "enforced": {"enforce": True},
+    "circuit": {"circuit": True},
+    "pruned": {"prune": True},
+}
+
+# Variable families whose keys mean the same thing in every variant
+SHARED_FAMILIES = ("x", "y", "u", "y_drone", "P", "a", "a_prime")
+
+
+class _Race:
+    """Incumbent, bound and stop flag shared by the racing variants."""
+
+    def __init__(self, target_gap):
+        self.lock = threading.Lock()
+        self.target_gap = target_gap
+        self.objective = None
+        self.bound = None
+        self.hint = None
+        self.source = None
+        self.solvers = []
+        self.done = threading.Event()
+
+    def gap_reached(self):
+        if self.objective is None or self.bound is None:
+            return False
+        return self.objective - self.bound <= self.target_gap * max(1.0, abs(self.objective))
+
+    def update(self, name, objective, bound, values=None):
+        with self.lock:
+            if values is not None and (self.objective is None or objective < self.objective):
+                self.objective, self.hint, self.source = objective, values, name
+            if self.bound is None or bound > self.bound:
+                self.bound = bound
+            if self.gap_reached() and not self.done.is_set():
+                self.done.set()
+                for solver in self.solvers:
+                    solver.StopSearch()
+
+
+class _Incumbents(cp_model.CpSolverSolutionCallback):
+    def __init__(self, race, name, var):
+        super().__init__()
+        self.race, self.name, self.var = race, name, var
+
+    def on_solution_callback(self):
+        objective = self.ObjectiveValue()
+        values = None
+        if self.race.objective is None or objective < self.race.objective:
+            values = {(f, key): self.Value(v) for f in SHARED_FAMILIES
+                      for key, v in self.var[f].items()}
+        self.race.update(self.name, objective, self.BestObjectiveBound(), values)
+
+
+def _run_variant(race, entry, workers, time_limit, params):
+    model, var = entry["model"], entry["var"]
+    if race.hint is not None:
+        model.ClearHints()
+        for (f, key), value in race.hint.items():
+            if f in var and key in var[f]:
+                model.AddHint(var[f][key], value)
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    solver.parameters.num_search_workers = workers
+    solver.parameters.relative_gap_limit = race.target_gap
+    if params:
+        apply_params(solver, params)
+    with race.lock:
+        if race.done.is_set():
+            return
+        race.solvers.append(solver)
+    start = time.time()
+    status = solver.Solve(model, _Incumbents(race, entry["name"], var))
+    entry.update(solver=solver, status=status, wall_time=entry.get("wall_time", 0) + time.time() - start)
+    if status == cp_model.OPTIMAL:
+        race.update(entry["name"], solver.ObjectiveValue(), solver.ObjectiveValue())
+    elif status == cp_model.FEASIBLE:
+        race.update(entry["name"], solver.ObjectiveValue(), solver.BestObjectiveBound())
+    elif status == cp_model.INFEASIBLE:
+        race.done.set()
+
+
+def race(inst, variants=None, total_workers=8, time_limit=30, target_gap=0.0,
+         restart_interval=None, params=None):
+    """Solve `inst` with every variant concurrently and return the winner.
+
+    `variants` maps names to build_model options (default: VARIANTS). Each
+    variant gets total_workers // len(variants) workers (at least one). With
+    restart_interval, unfinished variants are stopped every that many seconds
+    and restarted from the best shared incumbent.
+
+    Returns a dict with the winning variant's name, model, var, solver and
+    status, plus the shared objective/bound and per-variant wall times.
+    """
+    variants = VARIANTS if variants is None else variants
+    t, t_prime = time_matrices(inst)
+    entries = []
+    for name, options in variants.items():
+        model, var = build_model(inst, t, t_prime, **options)
+        entries.append({"name": name, "model": model, "var": var})
+    workers = max(1, total_workers // len(entries))
+
+    shared = _Race(target_gap)
+    deadline = time.time() + time_limit
+    while not shared.done.is_set():
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            break
+        slice_time = min(restart_interval or remaining, remaining)
+        shared.solvers = []
+        threads = [threading.Thread(target=_run_variant, args=(shared, e, workers, slice_time, params))
+                   for e in entries]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+
+    def rank(e):
+        status = e.get("status", cp_model.UNKNOWN)
+        if status == cp_model.OPTIMAL:
+            return (0, e["wall_time"])
+        if status == cp_model.INFEASIBLE:
+            return (1, e["wall_time"])
+        if status == cp_model.FEASIBLE:
+            return (2, e["solver"].ObjectiveValue())
+        return (3, 0)
+
+    winner = min(entries, key=rank)
+    return {
+        "variant": winner["name"],
+        "model": winner["model"],
+        "var": winner["var"],
+        "solver": winner.get("solver"),
+        "status": winner.get("status", cp_model.UNKNOWN),
+        "objective": shared.objective,
+        "bound": shared.bound,
+        "incumbent_from": shared.source,
+        "wall_times": {e["name"]: e.get("wall_time", 0.0) for e in entries},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Race formulation variants on the default instance.")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--time-limit", type=float, default=30)
+    parser.add_argument("--target-gap", type=float, default=0.0)
+    parser.add_argument("--restart-interval", type=float, default=None)
+    args = parser.parse_args()
+
+    inst = default_instance()
+    result = race(inst, total_workers=args.workers, time_limit=args.time_limit,
+                  target_gap=args.target_gap, restart_interval=args.restart_interval)
+    print("Winner:", result["variant"], result["wall_times"])
+    print_solution_min(result["solver"], result["status"], result["var"], inst)
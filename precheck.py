@@ -0,0 +1,222 @@
+import numpy as np
+
+from optimisetester import time_matrices
+
+# ---------------- Feasibility and Bound Pre-check ----------------
+# Necessary conditions read straight off w, D, t and t_prime with array
+# operations, before anything is built or solved:
+#
+#   - rows every solution must satisfy, whichever arcs and sorties it uses:
+#     the T-relaxed rows of (54)-(56) and (61) still bound the arrival times,
+#     so some travel and flight times rule the scenario out entirely;
+#   - arcs and sorties no solution can use: truck arcs forbidden by (40),
+#     arcs or sorties that cannot end within the horizon, sorties beyond the
+#     endurance E, and weights above WT_max where (45) counts them;
+#   - the affected areas left without any usable arc or sortie (guaranteed
+#     unserved) and the ones that would be late whatever serves them;
+#   - a lower bound on the objective: every area pays its unserved penalty
+#     unless its cheapest usable arc or sortie saves more, and the capacity
+#     rows (45) cap how many areas can be served at all.
+#
+# Times are bounded below by a[k, i] >= lo[i], the earliest arrival the
+# relaxed (54) rows allow. The bound assumes nothing about compact_delay and
+# holds for both delay formulations.
+#
+# Only the (45) exemption of sorties launched at node i == k depends on the
+# tandem, so the sortie masks are (n, n, n) arrays, the costs and arrivals
+# (n, n) arrays, and the check takes O(n³) memory whatever N. The (N, n, n, n)
+# mask of useless y_drone is built by useless_mask, for pruning only.
+# build_model(prune=True) does not declare the useless variables at all;
+# prune() fixes them to zero in a model that is already built (the proto
+# backend).
+
+
+def _node_array(values, n, default=0):
+    out = np.full(n, default, dtype=float)
+    for i, value in values.items():
+        out[i] = value
+    return out
+
+
+def earliest_arrivals(inst, t):
+    """lo[i] <= a[k, i] in every solution: (54) holds T-relaxed on unused arcs."""
+    lo = np.maximum(0, (np.asarray(t) - inst.T).max(axis=0, initial=0, where=~np.eye(inst.num_nodes, dtype=bool)))
+    lo[inst.depot] = 0
+    return lo
+
+
+def infeasible_reasons(inst, t, t_prime, lo):
+    """Rows no assignment satisfies, as readable reasons (empty when none is found)."""
+    n, T, horizon = inst.num_nodes, inst.T, inst.horizon
+    t, t_prime = np.asarray(t), np.asarray(t_prime)
+    off = ~np.eye(n, dtype=bool)
+    reasons = []
+    if T < 0:
+        reasons.append("(53) depot return a[k, 0] = 0 exceeds T")
+    late = np.flatnonzero(lo[1:] > horizon) + 1
+    if late.size:
+        reasons.append(f"(54) nodes {late.tolist()} arrive after the horizon even on unused arcs")
+    cycle = (t[1:, 1:] + t[1:, 1:].T > 2 * T) & off[1:, 1:]
+    if cycle.any():
+        i, j = np.argwhere(cycle)[0] + 1
+        reasons.append(f"(54) t[{i}][{j}] + t[{j}][{i}] exceeds 2T")
+    if n >= 3:
+        # (55, 56) with no flight: a'[j] >= a[i] + t'[i][j] - T, a[l] >= a'[j] + t'[j][l] - T
+        launch = np.flatnonzero(((lo[:, None] + t_prime - T > horizon) & off)[:, 1:].any(axis=0)) + 1
+        if launch.size:
+            reasons.append(f"(55) drone arrivals at {launch.tolist()} exceed the horizon even without a flight")
+        # (61) with no flight: t'[i][j] + t'[j][l] - T <= E for every proper (i, j, l)
+        flight = t_prime[:, :, None] + t_prime[None, :, :]
+        proper = off[:, :, None] & off[None, :, :] & off[:, None, :]
+        proper[:, 0, :] = proper[:, :, 0] = False
+        if (flight[proper] - T > inst.E).any():
+            i, j, l = np.argwhere(proper & (flight - T > inst.E))[0]
+            reasons.append(f"(61) sortie ({i}, {j}, {l}) exceeds E + T even when not flown")
+    return reasons
+
+
+def useless_arcs(inst, t, lo):
+    """(n, n) mask of truck arcs x[k, i, j] no solution uses (any k)."""
+    n, horizon = inst.num_nodes, inst.horizon
+    nodes = np.arange(n)
+    in_vt = np.isin(nodes, sorted(inst.VT))
+    w = np.asarray(inst.w)
+    useless = in_vt[:, None] & in_vt[None, :]                          # (40)
+    useless[:, 1:] |= (lo[:, None] + np.asarray(t) > horizon)[:, 1:]   # (54) past the horizon
+    useless[1:, 1:] |= (w > inst.WT_max)[None, 1:]                     # (45) counts w[j] from i in C
+    return useless
+
+
+def useless_sorties(inst, t_prime, lo):
+    """(n, n, n) mask of sorties (i, j, l) no tandem flies, leaving out the
+    weight limit (45), which depends on the tandem (see heavy_areas)."""
+    n, horizon = inst.num_nodes, inst.horizon
+    t_prime = np.asarray(t_prime)
+    flight = t_prime[:, :, None] + t_prime[None, :, :]
+    useless = ~np.isin(np.arange(n), sorted(inst.VD))[None, :, None]   # (46)
+    useless = useless | (flight > inst.E)                              # (61)
+    useless |= lo[:, None, None] + flight > horizon                    # (55, 56) past the horizon
+    return useless
+
+
+def heavy_areas(inst):
+    """(n,) mask of areas j whose weight alone exceeds WT_max; (45) counts
+    w[j] of every sortie except those tandem k launches at node i == k."""
+    return np.asarray(inst.w) > inst.WT_max
+
+
+def useless_mask(report, N):
+    """(N, n, n, n) mask of the y_drone[k, i, j, l] no solution flies."""
+    useless, heavy = report["useless"]["y_drone"], report["useless"]["heavy"]
+    n = len(heavy)
+    tandem_launch = np.arange(N)[:, None] == np.arange(n)[None, :]
+    return useless[None] | (heavy[None, None, :, None] & ~tandem_launch[:, :, None, None])
+
+
+def precheck(inst, t=None, t_prime=None):
+    """Necessary conditions and a lower bound for `inst`, without solving.
+
+    Returns a dict with "feasible" and the "reasons" against it, "unserved"
+    (affected areas no solution can serve), "late" ({node: minutes} for areas
+    late however they are served), "min_unserved" (fewest areas any solution
+    leaves unserved), "lower_bound" on the objective, the "useless" masks of
+    x (n, n, any tandem) and y_drone (n, n, n, any tandem) with the "heavy"
+    areas (see useless_mask), and "removed" counts of the variables they
+    cover. Assumes non-negative weights (validate_instance).
+    """
+    if t is None or t_prime is None:
+        t, t_prime = time_matrices(inst)
+    t, t_prime = np.asarray(t), np.asarray(t_prime)
+    n, N = inst.num_nodes, inst.N
+    off = ~np.eye(n, dtype=bool)
+    customers = np.arange(n) >= 1
+    lo = earliest_arrivals(inst, t)
+    D = _node_array(inst.D, n)
+    alpha, beta = _node_array(inst.alpha, n), _node_array(inst.beta, n)
+    credit = np.where(customers, beta, 0)           # beta[i] credited for leaving i (objective)
+    late_cost = np.maximum(alpha, 0)
+
+    usable = off & ~useless_arcs(inst, t, lo)
+    arcs = usable.copy()
+    arcs[:, 0] = False                              # arcs into the depot serve nothing
+    arrival = np.maximum(lo[:, None] + t, lo[None, :])
+    truck_arrival = np.where(arcs, arrival, np.inf)
+    truck_cost = np.where(arcs, inst.ct * t - credit[:, None]
+                          + late_cost[None, :] * np.maximum(0, arrival - D[None, :]), np.inf)
+
+    proper = off[:, :, None] & off[None, :, :] & off[:, None, :]
+    proper[:, 0, :] = proper[:, :, 0] = False
+    useless = useless_sorties(inst, t_prime, lo)
+    heavy = heavy_areas(inst)
+    # Flown by some tandem: heavy areas only from a launch at i == k < N
+    exempt_launch = np.arange(n) < N
+    sorties = proper & ~useless & (~heavy[None, :, None] | exempt_launch[:, None, None])
+    # Only the return leg j -> l depends on l: reduce it first, so the costs
+    # and arrivals are (i, j) arrays and one (n, n, n) float array is built
+    if inst.cd >= 0:
+        back = np.where(sorties, t_prime[None, :, :], np.inf).min(axis=2, initial=np.inf)
+    else:
+        back = np.where(sorties, t_prime[None, :, :], -np.inf).max(axis=2, initial=-np.inf)
+    flies = sorties.any(axis=2)
+    drone_arrival = lo[:, None] + t_prime
+    drone_cost = np.where(flies, inst.cd * (t_prime + np.where(flies, back, 0)) - credit[:, None]
+                          + late_cost[None, :] * np.maximum(0, drone_arrival - D[None, :]), np.inf)
+
+    servable = customers & (arcs.any(axis=0) | flies.any(axis=0))
+    earliest = np.minimum(truck_arrival.min(axis=0, initial=np.inf),
+                          np.where(flies, drone_arrival, np.inf).min(axis=0, initial=np.inf))
+    late = servable & (earliest > D)
+    best = np.minimum(truck_cost.min(axis=0, initial=np.inf), drone_cost.min(axis=0, initial=np.inf))
+    saving = np.where(servable, np.maximum(0, -best), 0)
+
+    # (45) per tandem: the first arc out of the depot (37) and one sortie
+    # launched at node i == k (47) are not weighed, everything else is
+    w = np.asarray(inst.w, dtype=float)
+    weights = np.sort(w[servable])[::-1]
+    exempt, rest = weights[:2 * N], np.sort(weights[2 * N:])
+    fits = int(np.count_nonzero(np.cumsum(rest) <= inst.WT_max * N))
+    min_unserved = int(servable.sum()) - len(exempt) - fits
+    forfeited = np.sort(saving[servable])[:min_unserved].sum()
+
+    # Negative delay costs pay at most horizon per delay variable
+    rebate = np.minimum(alpha, 0)[customers].sum() * inst.horizon * N
+    lower_bound = beta[customers].sum() - saving.sum() + forfeited + rebate
+    # Useless for every tandem, less the heavy-area sorties tandem k launches at i == k
+    kept = proper & ~useless
+    exempt = sum(int((kept[k] & heavy[:, None]).sum()) for k in range(min(N, n)))
+    removed_sorties = N * int((proper & (useless | heavy[None, :, None])).sum()) - exempt
+    reasons = infeasible_reasons(inst, t, t_prime, lo)
+    return {
+        "feasible": not reasons,
+        "reasons": reasons,
+        "unserved": np.flatnonzero(customers & ~servable).tolist(),
+        "late": {int(j): float(earliest[j] - D[j]) for j in np.flatnonzero(late)},
+        "min_unserved": int(customers.sum() - servable.sum()) + min_unserved,
+        "lower_bound": float(lower_bound),
+        "useless": {"x": ~usable, "y_drone": useless, "heavy": heavy},
+        "removed": {"x": int(N * (off & ~usable).sum()), "y_drone": removed_sorties},
+    }
+
+
+def prune(model, var, report):
+    """Fix the variables of report["useless"] to zero in their domains."""
+    variables = model.Proto().variables
+    x, y_drone = var["x"].index, var["y_drone"].index
+    for index in (x[np.broadcast_to(report["useless"]["x"], x.shape) & (x >= 0)],
+                  y_drone[useless_mask(report, len(y_drone)) & (y_drone >= 0)]):
+        for v in index.tolist():
+            variables[v].domain[1] = 0
+    return model
+
+
+if __name__ == "__main__":
+    import random
+
+    from instance import default_instance, random_instance
+
+    for label, inst in [("default", default_instance()),
+                        ("random 40", random_instance(random.Random(1), 40, N=3, grid=30, horizon=60))]:
+        report = precheck(inst)
+        print(f"{label}: feasible={report['feasible']} lower bound {report['lower_bound']:.1f}, "
+              f"unserved {report['unserved']}, at least {report['min_unserved']} unserved, "
+              f"late {report['late']}, removed {report['removed']}")
@@ -0,0 +1,95 @@
+import random
+import time
+
+from ortools.sat.python import cp_model
+
+import fuzz
+import optimisetester
+import protobuild
+from instance import default_instance, random_instance
+
+#-----------------------------------------------------------------------------------------
+# Direct proto builder: bulk-written model against the cp_model wrapper build
+#-----------------------------------------------------------------------------------------
+
+def run_case(inst, compact_delay=False, names=True):
+    wrapper_rows, proto_rows = {}, {}
+    start = time.time()
+    wrapper, _ = optimisetester.build_model(inst, compact_delay=compact_delay, rows=wrapper_rows)
+    wrapper_time = time.time() - start
+    start = time.time()
+    direct, var = protobuild.build_model(inst, compact_delay=compact_delay, rows=proto_rows, names=names)
+    proto_time = time.time() - start
+    return wrapper, direct, var, wrapper_rows, proto_rows, wrapper_time, proto_time
+
+#-----------------------------------------------------------------------------------------
+# Tests
+#-----------------------------------------------------------------------------------------
+def test_proto_builder_identical_model():
+    cases = [default_instance()] + [random_instance(random.Random(seed), 4 + seed, N=1 + seed % 3)
+                                    for seed in range(4)]
+    for n, inst in enumerate(cases):
+        wrapper, direct, _, wrapper_rows, proto_rows, _, _ = run_case(inst, compact_delay=n % 2 == 1)
+        assert wrapper_rows == proto_rows
+        assert str(wrapper.Proto()) == str(direct.Proto())
+
+def test_proto_builder_integer_objective():
+    inst = random_instance(random.Random(9), 5, N=2)
+    inst.alpha = {i: 3 for i in inst.C}
+    inst.beta = {i: 40 for i in inst.C}
+    wrapper, direct, _, _, _, _, _ = run_case(inst)
+    assert direct.Proto().has_objective() and not direct.Proto().has_floating_point_objective()
+    assert str(wrapper.Proto()) == str(direct.Proto())
+
+def test_proto_builder_without_names():
+    _, direct, var, _, _, _, _ = run_case(default_instance(), names=False)
+    assert all(v.name == "" for v in direct.Proto().variables)
+    solver, status = optimisetester.solve(direct, max_time_in_seconds=20)
+    assert status == cp_model.OPTIMAL and solver.ObjectiveValue() == 433
+    assert optimisetester.solution_plan(solver, var, default_instance())["objective"] == 433
+
+def test_proto_builder_same_solutions():
+    rng = random.Random(4)
+    for _ in range(3):
+        inst = random_instance(rng, 6, N=2)
+        objectives = []
+        for build in (optimisetester.build_model, protobuild.build_model):
+            model, _ = build(inst)
+            solver, status = optimisetester.solve(model, max_time_in_seconds=20)
+            assert status == cp_model.OPTIMAL
+            objectives.append(solver.ObjectiveValue())
+        assert objectives[0] == objectives[1]
+
+def test_proto_builder_fuzz():
+    stats, found = fuzz.run(instances=10, assignments=20, seed=5, builder=protobuild.build_model)
+    assert stats["feasible"] > 0
+    assert found == []
+
+def test_proto_builder_parallel_tandems():
+    for inst, compact in ((random_instance(random.Random(3), 6, N=4), False),
+                          (random_instance(random.Random(6), 5, N=3), True)):
+        serial_rows, parallel_rows = {}, {}
+        serial, _ = protobuild.build_model(inst, compact_delay=compact, rows=serial_rows)
+        parallel, _ = protobuild.build_model(inst, compact_delay=compact, rows=parallel_rows, workers=2)
+        assert serial_rows == parallel_rows
+        for name, rows in serial_rows.items():
+            assert sorted(str(serial.Proto().constraints[r]) for r in rows) == \
+                sorted(str(parallel.Proto().constraints[r]) for r in rows)
+        objectives = [optimisetester.solve(m, max_time_in_seconds=20)[0].ObjectiveValue()
+                      for m in (serial, parallel)]
+        assert objectives[0] == objectives[1]
+
+#-----------------------------------------------------------------------------------------
+# Feedback
+#-----------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    for n in (10, 15, 20, 25):
+        inst = random_instance(random.Random(0), n, N=2)
+        *_, wrapper_time, proto_time = run_case(inst, names=False)
+        print(f"n={n}: wrapper {wrapper_time:.2f}s, proto {proto_time:.2f}s "
+              f"({wrapper_time / proto_time:.1f}x)")
+    inst = random_instance(random.Random(0), 15, N=8)
+    for workers in (1, 2, 4, 8):
+        start = time.time()
+        protobuild.build_model(inst, names=False, workers=workers)
+        print(f"N=8, n=15, {workers} build workers: {time.time() - start:.2f}s")
@@ -0,0 +1,547 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+
+import numpy as np
+
+from ortools.sat.python import cp_model
+
+from optimisetester import time_matrices
+from sharedmat import SharedMatrices, attach
+from varstore import VarArray, distinct, masked
+
+# ---------------- Direct Proto Builder ----------------
+# Second backend for build_model that never goes through cp_model's
+# expression objects. Each family is laid out as NumPy arrays of variable
+# indices and coefficients, one row per constraint, and written into the
+# CpModelProto in bulk. Terms are sorted and merged the way the wrapper does
+# it, so with names=True the proto is identical to optimisetester.build_model's
+# (same variables, rows, row order and objective). The one exception is a row
+# without terms, which only occurs with fewer than three affected areas: the
+# wrapper turns `0 <= 1` into a constant-true literal, here it stays an empty
+# linear row.
+#
+# A row is given as vars (..., W) with -1 padding, coeffs broadcastable to
+# vars, and lo / hi bounds broadcastable to vars.shape[:-1].
+#
+# With workers > 1 the rows of each tandem are laid out in worker processes
+# and only written into the proto by the parent, see build_model.
+
+INT_MIN = int(np.iinfo(np.int64).min)
+INT_MAX = int(np.iinfo(np.int64).max)
+
+
+class Fragment(list):
+    """Rows laid out for a proto that lives in another process; emit() appends to it."""
+
+
+def emit(proto, vars, coeffs, lo, hi):
+    """Append one linear constraint per row of `vars` (or lay them out into a Fragment)."""
+    rows = layout(vars, coeffs, lo, hi)
+    if isinstance(proto, Fragment):
+        proto.append(rows)
+    else:
+        write(proto, rows)
+
+
+def layout(vars, coeffs, lo, hi):
+    """Sorted, merged terms of the rows as (vars, coeffs, ends, lo, hi) arrays."""
+    vars = np.asarray(vars)
+    width = vars.shape[-1]
+    coeffs = np.broadcast_to(coeffs, vars.shape).reshape(-1, width).astype(np.int64)
+    lo = np.broadcast_to(lo, vars.shape[:-1]).ravel().astype(np.int64)
+    hi = np.broadcast_to(hi, vars.shape[:-1]).ravel().astype(np.int64)
+    vars = vars.reshape(-1, width).astype(np.int64)
+
+    # Sort each row by variable; padding and zero coefficients go last
+    vars = np.where((vars < 0) | (coeffs == 0), INT_MAX, vars)
+    order = np.argsort(vars, axis=1, kind="stable")
+    vars = np.take_along_axis(vars, order, axis=1)
+    coeffs = np.take_along_axis(coeffs, order, axis=1)
+    present = vars != INT_MAX
+    if (present[:, 1:] & (vars[:, 1:] == vars[:, :-1])).any():
+        # Repeated variables in a row: add up their coefficients
+        row = np.repeat(np.arange(len(vars)), width)[present.ravel()]
+        row, v, c = _merge(row, vars[present], coeffs[present])
+        counts = np.bincount(row, minlength=len(vars))
+    else:
+        v, c = vars[present], coeffs[present]
+        counts = present.sum(axis=1)
+    return v, c, np.cumsum(counts), lo, hi
+
+
+def write(proto, rows):
+    """Append the rows of layout() to proto.constraints."""
+    v, c, ends, lo, hi = rows
+    v, c = memoryview(np.ascontiguousarray(v)), memoryview(np.ascontiguousarray(c))
+    add = proto.constraints.add
+    start = 0
+    for end, low, high in zip(ends.tolist(), lo.tolist(), hi.tolist()):
+        linear = add().linear
+        linear.vars.extend(v[start:end])
+        linear.coeffs.extend(c[start:end])
+        linear.domain.extend((low, high))
+        start = end
+
+
+def _merge(row, v, c):
+    # Sort terms by (row, variable) and add up repeated variables
+    order = np.lexsort((v, row))
+    row, v, c = row[order], v[order], c[order]
+    if len(v) == 0:
+        return row, v, c
+    first = np.flatnonzero(np.r_[True, (row[1:] != row[:-1]) | (v[1:] != v[:-1])])
+    row, v, c = row[first], v[first], np.add.reduceat(c, first)
+    keep = c != 0
+    return row[keep], v[keep], c[keep]
+
+
+def terms(*groups):
+    """Concatenate (vars, coeff) groups along the last axis into one row block."""
+    prefix = np.broadcast_shapes(*[np.shape(idx)[:-1] for idx, _ in groups])
+    vars, coeffs = [], []
+    for idx, coeff in groups:
+        shape = prefix + np.shape(idx)[-1:]
+        vars.append(np.broadcast_to(idx, shape))
+        coeffs.append(np.broadcast_to(coeff, shape))
+    return np.concatenate(vars, axis=-1), np.concatenate(coeffs, axis=-1)
+
+
+# ---------------- Variables ----------------
+class _Declare:
+    """Hands out consecutive proto indices in the order the wrapper creates variables."""
+
+    def __init__(self, names=True):
+        self.count = 0
+        self.bounds = []
+        self.names = [] if names else None
+
+    def __call__(self, keys, *families):
+        # families: (VarArray, name prefix, lb, ub), created interleaved per key
+        keys = np.asarray(keys).reshape(len(keys), -1)
+        ids = self.count + np.arange(len(keys) * len(families)).reshape(len(keys), len(families))
+        for f, (family, _, _, _) in enumerate(families):
+            family.index[tuple(keys.T)] = ids[:, f]
+        self.count += ids.size
+        bounds = np.array([(lb, ub) for _, _, lb, ub in families])
+        self.bounds.append(np.tile(bounds, (len(keys), 1)))
+        if self.names is None:
+            return
+        for key in keys.tolist():
+            suffix = "_".join(map(str, key))
+            self.names.extend(f"{prefix}_{suffix}" for _, prefix, _, _ in families)
+
+    def write(self, proto):
+        add = proto.variables.add
+        if self.names is not None:
+            for (lb, ub), name in zip(np.concatenate(self.bounds).tolist(), self.names):
+                v = add()
+                v.name = name
+                v.domain.extend((lb, ub))
+        else:
+            for lb, ub in np.concatenate(self.bounds).tolist():
+                add().domain.extend((lb, ub))
+
+
+def add_variables(model, inst, compact_delay=False, names=True):
+    """Same families, indices and names as optimisetester.add_variables, written in bulk."""
+    var, declare = _declare_variables(model, inst, compact_delay, names)
+    declare.write(model.Proto())
+    return var
+
+
+def _declare_variables(model, inst, compact_delay, names):
+    N, n, horizon = inst.N, inst.num_nodes, inst.horizon
+    x = VarArray(model, (N, n, n))
+    y = VarArray(model, (N, n))
+    u = VarArray(model, (N, n))
+    y_drone = VarArray(model, (N, n, n, n))
+    P = VarArray(model, (N, n, n))
+    a = VarArray(model, (N, n))
+    a_prime = VarArray(model, (N, n))
+    delay = VarArray(model, (n,) if compact_delay else (N, n))
+
+    declare = _Declare(names)
+    arcs = ~np.eye(n, dtype=bool)
+    for k in inst.K:
+        declare(np.c_[np.full(n * (n - 1), k), np.argwhere(arcs)], (x, "x", 0, 1))
+        declare(np.c_[np.full(n - 1, k), np.arange(1, n)], (y, "y", 0, 1), (u, "u", 0, n - 1))
+
+    sorties = np.ones((N, n, n, n), dtype=bool)
+    sorties[:, :, 0, :] = sorties[:, :, :, 0] = False      # j in C, l in VR
+    declare(np.argwhere(sorties), (y_drone, "y_drone", 0, 1))
+    precedes = np.broadcast_to(arcs & (np.arange(n) > 0), (N, n, n))     # i in VL, j in C, i != j
+    declare(np.argwhere(precedes), (P, "P", 0, 1))
+    declare(np.argwhere(np.ones((N, n), dtype=bool)), (a, "a", 0, horizon), (a_prime, "a_prime", 0, horizon))
+    if compact_delay:
+        declare(np.arange(1, n), (delay, "delay", 0, horizon))
+    else:
+        declare(np.argwhere(np.ones((N, n - 1), dtype=bool)) + [0, 1], (delay, "delay", 0, horizon))
+    return dict(x=x, y=y, u=u, y_drone=y_drone, P=P, a=a, a_prime=a_prime, delay=delay), declare
+
+
+# ---------------- Constraints ----------------
+# Same families and row order as optimisetester.FAMILIES; each takes the
+# proto instead of the model.
+
+def _pairs(rows, cols, keep=lambda i, j: i != j):
+    """(i, j) over rows x cols in nested order, filtered by keep."""
+    i, j = np.meshgrid(np.asarray(rows, dtype=int), np.asarray(cols, dtype=int), indexing="ij")
+    mask = keep(i, j)
+    return i[mask], j[mask]
+
+
+def _sortie_rows(inst, var):
+    """Index arrays of the proper sorties and of the other y_drone variables."""
+    n = inst.num_nodes
+    index = var["y_drone"].index
+    proper = distinct(n, 3)
+    serves_vd = np.isin(np.arange(n), sorted(inst.VD))[None, :, None]
+    return masked(index, proper), index[(index >= 0) & ~(proper & serves_vd)]
+
+
+def order_links(proto, inst, t, t_prime, var):
+    n = inst.num_nodes
+    y, u = var["y"].index[:, 1:, None], var["u"].index[:, 1:, None]
+    pair = terms((u, 1), (y, 1))[0][:, :, None, :]
+    emit(proto, np.broadcast_to(pair, pair.shape[:2] + (2, 2)), [[1, -1], [1, -(n - 1)]],
+         [0, INT_MIN], [INT_MAX, 0])
+
+
+def sortie_domain(proto, inst, t, t_prime, var):
+    improper = _sortie_rows(inst, var)[1]
+    emit(proto, improper[:, None], 1, 0, 0)
+
+
+def constraint_36(proto, inst, t, t_prime, var):
+    N, n = inst.N, inst.num_nodes
+    X, sorties = var["x"].index, _sortie_rows(inst, var)[0]
+    truck = np.moveaxis(X[:, :, 1:], 2, 0).reshape(n - 1, -1)
+    drone = np.moveaxis(sorties[:, :, 1:, :], 2, 0).reshape(n - 1, -1)
+    emit(proto, np.concatenate([truck, drone], axis=1), 1, INT_MIN, 1)
+
+
+def constraint_37_38(proto, inst, t, t_prime, var):
+    X = var["x"].index
+    emit(proto, np.stack([X[:, 0, 1:], X[:, 1:, 0]], axis=1), 1, INT_MIN, 1)
+
+
+def constraint_39(proto, inst, t, t_prime, var):
+    X = var["x"].index
+    incoming = np.swapaxes(X[:, :, 1:], 1, 2)           # [k, j, i]
+    outgoing = X[:, 1:, 1:]                             # [k, j, l]
+    vars, coeffs = terms((incoming, 1), (outgoing, -1))
+    emit(proto, vars, coeffs, 0, 0)
+
+
+def constraint_40(proto, inst, t, t_prime, var):
+    X = var["x"].index
+    i, j = _pairs(list(inst.VT), list(inst.VT))
+    emit(proto, X[:, i, j][:, :, None], 1, 0, 0)
+
+
+def constraint_41_42(proto, inst, t, t_prime, var):
+    n, M = inst.num_nodes, len(inst.C)
+    X, U = var["x"].index, var["u"].index
+    i, j = _pairs(range(1, n), range(1, n))
+    vars = np.stack([U[:, i], U[:, j], X[:, i, j]], axis=-1)
+    emit(proto, vars, [1, -1, M], INT_MIN, M - 1)
+
+    vars, coeffs = terms((U[:, 1:, None], 1), (np.swapaxes(X[:, :, 1:], 1, 2), -M))
+    emit(proto, vars, coeffs, INT_MIN, 0)
+
+
+def constraint_43_44(proto, inst, t, t_prime, var):
+    n, M = inst.num_nodes, len(inst.C)
+    U, P = var["u"].index, var["P"].index
+    i, j = _pairs(range(1, n), range(1, n))
+    vars = np.stack([U[:, j], U[:, i], P[:, i, j]], axis=-1)[:, :, None, :]
+    emit(proto, np.broadcast_to(vars, vars.shape[:2] + (2, 3)), [1, -1, -M],
+         [INT_MIN, 1 - M], [0, INT_MAX])
+
+
+def constraint_45(proto, inst, t, t_prime, var):
+    capacity(proto, inst, var, inst.K)
+
+
+def capacity(proto, inst, var, tandems):
+    """Rows of (45) for `tandems`, stored in that order along the tandem axis of var."""
+    n, w = inst.num_nodes, np.asarray(inst.w)
+    X, sorties = var["x"].index, _sortie_rows(inst, var)[0]
+    serves_vd = np.isin(np.arange(n), sorted(inst.VD))
+    for row, k in enumerate(tandems):
+        # the drone term skips launch node i == k, as in optimisetester
+        launch_ok = (np.arange(n) != k)[:, None, None] & serves_vd[None, :, None]
+        drone = masked(sorties[row], launch_ok)
+        vars, coeffs = terms((X[row, 1:, 1:].ravel(), np.tile(w[1:], n - 1)),
+                             (drone.ravel(), np.broadcast_to(w[None, :, None], drone.shape).ravel()))
+        emit(proto, vars[None], coeffs[None], INT_MIN, inst.WT_max)
+
+
+def constraint_46(proto, inst, t, t_prime, var):
+    sortie_domain(proto, inst, t, t_prime, var)
+
+
+def constraint_47_48(proto, inst, t, t_prime, var):
+    N, n = inst.N, inst.num_nodes
+    sorties = _sortie_rows(inst, var)[0]
+    emit(proto, sorties.reshape(N, n, -1), 1, INT_MIN, 1)
+    emit(proto, np.moveaxis(sorties[:, :, :, 1:], 3, 1).reshape(N, n - 1, -1), 1, INT_MIN, 1)
+
+
+def constraint_49(proto, inst, t, t_prime, var):
+    n = inst.num_nodes
+    X, Y = var["x"].index, var["y_drone"].index
+    stops = np.array(sorted(inst.VT.union({inst.depot})), dtype=int)
+    i, j, l = [g.ravel() for g in np.meshgrid(stops, np.array(list(inst.VD), dtype=int),
+                                               np.arange(1, n), indexing="ij")]
+    keep = (i != l) & (i != j) & (j != l)
+    i, j, l = i[keep], j[keep], l[keep]
+    for k in inst.K:
+        vars, coeffs = terms((Y[k, i, j, l][:, None], 2),
+                             (X[k][i[:, None], stops[None, :]], -1),
+                             (X[k][stops[None, :], l[:, None]], -1))
+        emit(proto, vars, coeffs, INT_MIN, 0)
+
+
+def constraint_50(proto, inst, t, t_prime, var):
+    n = inst.num_nodes
+    X, Y = var["x"].index, var["y_drone"].index
+    j, l = _pairs(range(1, n), range(1, n))
+    others = np.arange(n)[None, :] != j[:, None]
+    for k in inst.K:
+        vars, coeffs = terms((Y[k, 0, j, l][:, None], 1), (masked(X[k][:, l].T, others), -1))
+        emit(proto, vars, coeffs, INT_MIN, 0)
+
+
+def constraint_51_52(proto, inst, t, t_prime, var):
+    A, A_prime = var["a"].index, var["a_prime"].index
+    emit(proto, np.stack([A[:, :1], A_prime[:, :1]], axis=1), 1, 0, 0)
+
+
+def constraint_53(proto, inst, t, t_prime, var):
+    emit(proto, var["a"].index[:, :1], 1, INT_MIN, inst.T)
+
+
+def constraint_54(proto, inst, t, t_prime, var):
+    n, T = inst.num_nodes, inst.T
+    X, A = var["x"].index, var["a"].index
+    i, j = _pairs(range(n), range(1, n))
+    vars = np.stack([A[:, i], A[:, j], X[:, i, j]], axis=-1)
+    emit(proto, vars, [1, -1, T], INT_MIN, T - np.asarray(t)[i, j])
+
+
+def constraint_55_56(proto, inst, t, t_prime, var):
+    N, n, T = inst.N, inst.num_nodes, inst.T
+    A, A_prime = var["a"].index, var["a_prime"].index
+    sorties, t_prime = _sortie_rows(inst, var)[0], np.asarray(t_prime)
+
+    # (55) rows (k, i, j) over the flights i -> j
+    flights = sorties[:, :, 1:, :]
+    vars, coeffs = terms((np.broadcast_to(A[:, :, None, None], (N, n, n - 1, 1)), 1),
+                         (np.broadcast_to(A_prime[:, None, 1:, None], (N, n, n - 1, 1)), -1),
+                         (flights, T))
+    has = (flights >= 0).any(axis=-1)
+    hi = np.broadcast_to(T - t_prime[:, 1:], has.shape)
+    emit(proto, vars[has], coeffs[has], INT_MIN, hi[has])
+
+    # (56) rows (k, j, l) over the flights j -> l
+    flights = np.moveaxis(sorties[:, :, 1:, 1:], 1, 3)
+    vars, coeffs = terms((np.broadcast_to(A_prime[:, 1:, None, None], (N, n - 1, n - 1, 1)), 1),
+                         (np.broadcast_to(A[:, None, 1:, None], (N, n - 1, n - 1, 1)), -1),
+                         (flights, T))
+    has = (flights >= 0).any(axis=-1)
+    hi = np.broadcast_to(T - t_prime[1:, 1:], has.shape)
+    emit(proto, vars[has], coeffs[has], INT_MIN, hi[has])
+
+
+def constraint_57_60(proto, inst, t, t_prime, var):
+    N, n, T = inst.N, inst.num_nodes, inst.T
+    A, A_prime = var["a"].index, var["a_prime"].index
+    sorties = _sortie_rows(inst, var)[0]
+
+    def sync(nodes, group):
+        # rows 57/58 (or 59/60) per (k, node): a' - a -/+ T * sum(group) within [-T, T]
+        has = (group >= 0).any(axis=-1)
+        vars = terms((A_prime[:, nodes, None], 1), (A[:, nodes, None], -1), (group, 1))[0]
+        vars = np.broadcast_to(vars[:, :, None, :], vars.shape[:2] + (2,) + vars.shape[2:])
+        coeffs = np.ones((2, vars.shape[-1]), dtype=np.int64)
+        coeffs[:, 1] = -1
+        coeffs[0, 2:], coeffs[1, 2:] = -T, T
+        emit(proto, vars[has], coeffs, [-T, INT_MIN], [INT_MAX, T])
+
+    sync(np.arange(n), sorties.reshape(N, n, -1))
+    sync(np.arange(1, n), np.moveaxis(sorties[:, :, :, 1:], 3, 1).reshape(N, n - 1, -1))
+
+
+def constraint_61(proto, inst, t, t_prime, var):
+    T, E = inst.T, inst.E
+    sorties, t_prime = _sortie_rows(inst, var)[0], np.asarray(t_prime)
+    k, i, j, l = np.argwhere(sorties >= 0).T
+    emit(proto, sorties[k, i, j, l][:, None], T, INT_MIN, E - t_prime[i, j] - t_prime[j, l] + T)
+
+
+def constraint_62(proto, inst, t, t_prime, var):
+    n, T = inst.num_nodes, inst.T
+    P, A_prime = var["P"].index, var["a_prime"].index
+    sorties = _sortie_rows(inst, var)[0]
+    # One block of rows (l, b) per launch node i, to bound the array sizes
+    for k in inst.K:
+        launched = sorties[k].reshape(n, -1)        # Σ_q Σ_m y_{b q m}^k, per b
+        for i in range(n):
+            l, b = _pairs(range(1, n), range(1, n), lambda l, b: (l != b) & (l != i) & (b != i))
+            vars, coeffs = terms((A_prime[k, l][:, None], 1), (A_prime[k, b][:, None], -1),
+                                 (sorties[k, i, :, l], T), (launched[b], T), (P[k, l, b][:, None], T))
+            emit(proto, vars, coeffs, INT_MIN, 3 * T)
+
+
+def constraint_63(proto, inst, t, t_prime, var):
+    N, n, T = inst.N, inst.num_nodes, inst.T
+    X, A, A_prime, delay = var["x"].index, var["a"].index, var["a_prime"].index, var["delay"].index
+    D = np.array([inst.D[i] for i in range(1, n)])
+    if delay.ndim == 1:
+        # rows (k, i, truck/drone); drone rows only for i in VD
+        sorties = _sortie_rows(inst, var)[0]
+        visits = np.full((N, n - 1, 2, max(n, n * n)), -1, dtype=np.int32)
+        visits[:, :, 0, :n] = np.swapaxes(X[:, :, 1:], 1, 2)
+        visits[:, :, 1, :] = np.moveaxis(sorties[:, :, 1:, :], 2, 1).reshape(N, n - 1, -1)
+        arrival = np.stack([A[:, 1:], A_prime[:, 1:]], axis=-1)[..., None]
+        vars, coeffs = terms((np.broadcast_to(delay[1:, None, None], (N, n - 1, 2, 1)), 1),
+                             (arrival, -1), (visits, -T))
+        has = np.broadcast_to(np.array([[True, i in inst.VD] for i in range(1, n)]), (N, n - 1, 2))
+        emit(proto, vars[has], coeffs[has], np.broadcast_to(-D[:, None] - T, has.shape)[has], INT_MAX)
+    else:
+        arrival = np.stack([A[:, 1:], A_prime[:, 1:]], axis=-1)[..., None]
+        vars, coeffs = terms((delay[:, 1:, None, None], 1), (arrival, -1))
+        emit(proto, vars, coeffs, -D[None, :, None], INT_MAX)
+
+
+FAMILIES = {
+    "u": order_links,
+    "y_drone": sortie_domain,
+    "36": constraint_36,
+    "37,38": constraint_37_38,
+    "39": constraint_39,
+    "40": constraint_40,
+    "41,42": constraint_41_42,
+    "43,44": constraint_43_44,
+    "45": constraint_45,
+    "46": constraint_46,
+    "47,48": constraint_47_48,
+    "49": constraint_49,
+    "50": constraint_50,
+    "51,52": constraint_51_52,
+    "53": constraint_53,
+    "54": constraint_54,
+    "55,56": constraint_55_56,
+    "57,60": constraint_57_60,
+    "61": constraint_61,
+    "62": constraint_62,
+    "63": constraint_63,
+}
+
+
+# ---------------- Objective Function ----------------
+def objective(proto, inst, t, t_prime, var):
+    """Write the objective of optimisetester.objective straight into the proto."""
+    n, ct, cd = inst.num_nodes, inst.ct, inst.cd
+    X, delay = var["x"].index, var["delay"].index
+    sorties, t, t_prime = _sortie_rows(inst, var)[0], np.asarray(t), np.asarray(t_prime)
+    floating = any(isinstance(v, float)
+                   for v in (ct, cd, *inst.alpha.values(), *inst.beta.values()))
+    dtype = np.float64 if floating else np.int64
+    alpha = np.zeros(n, dtype=dtype)
+    beta = np.zeros(n, dtype=dtype)
+    for i in inst.C:
+        alpha[i], beta[i] = inst.alpha[i], inst.beta[i]
+
+    # Truck and drone costs, minus the service credit of the launch/departure node
+    served = np.arange(n) > 0
+    truck = (t * ct)[None] - np.where(served[None, :, None] & served[None, None, :], beta[None, :, None], 0)
+    flight = (t_prime[:, :, None] + t_prime[None, :, :]) * cd
+    drone = flight[None] - beta[None, :, None, None]
+    delay_coeffs = alpha[1:] if delay.ndim == 1 else np.broadcast_to(alpha[None, 1:], delay[:, 1:].shape)
+
+    vars = np.concatenate([X[X >= 0], sorties[sorties >= 0], delay[..., 1:].ravel()])
+    coeffs = np.concatenate([np.broadcast_to(truck, X.shape)[X >= 0],
+                             np.broadcast_to(drone, sorties.shape)[sorties >= 0],
+                             np.ravel(delay_coeffs)]).astype(dtype)
+    _, v, c = _merge(np.zeros(len(vars), dtype=np.int64), vars, coeffs)
+    target = proto.floating_point_objective if floating else proto.objective
+    target.vars.extend(v.tolist())
+    target.coeffs.extend(c.tolist())
+    target.offset = beta.sum().item()
+    if not floating:
+        target.scaling_factor = 1
+
+
+# Families whose rows mix tandems; everything else is built per tandem
+CROSS_TANDEM = ("36",)
+
+
+def build_model(inst, t=None, t_prime=None, compact_delay=False, rows=None, names=True, workers=1):
+    """Drop-in for optimisetester.build_model that writes the proto in bulk.
+
+    names=False leaves the variables unnamed, which saves most of the
+    variable-writing time; the model is otherwise the same.
+
+    With workers > 1 the rows of each tandem are laid out in a pool of up
+    to min(workers, N) processes while the parent writes the variables, then
+    merged into the proto family by family, tandem by tandem; the parent adds
+    the CROSS_TANDEM families and the objective itself. The default
+    (workers=1) is the serial build. The model is the same, but within a
+    family that is written in several blocks (41,42 / 47,48 / 55,56 / 57,60)
+    rows come tandem-major instead of block-major.
+    """
+    if t is None or t_prime is None:
+        t, t_prime = time_matrices(inst)
+    if workers <= 1 or inst.N <= 1:
+        return _build(inst, t, t_prime, compact_delay, rows, names)
+    with SharedMatrices(t, t_prime) as shared, ProcessPoolExecutor(min(workers, inst.N)) as pool:
+        # Submitted first, so the layout overlaps the variable write below
+        futures = [pool.submit(tandem_fragments, inst, shared.handle, compact_delay, k) for k in inst.K]
+        return _build(inst, t, t_prime, compact_delay, rows, names, futures)
+
+
+def _build(inst, t, t_prime, compact_delay, rows, names, futures=None):
+    model = cp_model.CpModel()
+    var = add_variables(model, inst, compact_delay, names)
+    proto = model.Proto()
+    fragments = None if futures is None else [future.result() for future in futures]
+    for name, add in FAMILIES.items():
+        start = len(proto.constraints)
+        if fragments is None or name in CROSS_TANDEM:
+            add(proto, inst, t, t_prime, var)
+        else:
+            for tandem in fragments:
+                for block in tandem[name]:
+                    write(proto, block)
+        if rows is not None:
+            rows[name] = list(range(start, len(proto.constraints)))
+    objective(proto, inst, t, t_prime, var)
+    return model, var
+
+
+def tandem_fragments(inst, matrices, compact_delay, k):
+    """Laid-out rows of every per-tandem family for tandem k, keyed by family.
+
+    matrices is (t, t_prime) or a sharedmat.MatrixHandle to them.
+    """
+    t, t_prime = attach(matrices)
+    full, _ = _declare_variables(None, inst, compact_delay, names=False)
+    var = {}
+    for name, family in full.items():
+        view = VarArray(None, family.index.shape)
+        view.index = family.index if name == "delay" and compact_delay else family.index[k:k + 1]
+        var[name] = view
+    single = replace(inst, N=1)
+    fragments = {}
+    for name, add in FAMILIES.items():
+        if name in CROSS_TANDEM:
+            continue
+        fragment = Fragment()
+        if name == "45":
+            capacity(fragment, single, var, [k])
+        else:
+            add(fragment, single, t, t_prime, var)
+        fragments[name] = fragment
+    return fragments
@@ -0,0 +1,92 @@
+import os
+import pickle
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+import tune
+from instance import random_instance
+from optimisetester import build_model, solve, time_matrices
+from sharedmat import MatrixHandle, SharedMatrices, attach
+
+#-----------------------------------------------------------------------------------------
+# Shared travel matrices: published once, mapped read-only by every worker
+#-----------------------------------------------------------------------------------------
+
+def row_sums(matrices):
+    t, t_prime = attach(matrices)
+    return int(t.sum()), int(t_prime.sum()), os.getpid()
+
+def solve_case(inst, matrices=None):
+    """Status and objective of time_to_target's solve, on `matrices` or fresh ones."""
+    t, t_prime = attach(matrices) if matrices is not None else time_matrices(inst)
+    solver, status = solve(build_model(inst, t, t_prime)[0], max_time_in_seconds=10, num_search_workers=1)
+    return solver.StatusName(status), solver.ObjectiveValue()
+
+def run_case(inst, tasks=8, workers=2, shared=True):
+    t, t_prime = time_matrices(inst)
+    start = time.time()
+    with SharedMatrices(t, t_prime) as published, ProcessPoolExecutor(workers) as pool:
+        matrices = published.handle if shared else (t, t_prime)
+        results = list(pool.map(row_sums, [matrices] * tasks))
+    return results, (int(t.sum()), int(t_prime.sum())), time.time() - start
+
+#-----------------------------------------------------------------------------------------
+# Tests
+#-----------------------------------------------------------------------------------------
+def test_attach_round_trip():
+    t, t_prime = time_matrices(random_instance(random.Random(1), 9))
+    with SharedMatrices(t, t_prime) as shared:
+        mapped_t, mapped_t_prime = attach(shared.handle)
+        assert np.array_equal(mapped_t, t) and np.array_equal(mapped_t_prime, t_prime)
+        assert attach(shared.handle)[0] is mapped_t
+        assert not mapped_t.flags.writeable
+    assert attach((t, t_prime)) == (t, t_prime)
+
+def test_handle_is_small():
+    t, t_prime = time_matrices(random_instance(random.Random(2), 60))
+    with SharedMatrices(t, t_prime) as shared:
+        assert len(pickle.dumps(shared.handle)) < 200 < len(pickle.dumps((t, t_prime)))
+        assert pickle.loads(pickle.dumps(shared.handle)) == shared.handle
+
+def test_workers_read_shared_matrices():
+    results, expected, _ = run_case(random_instance(random.Random(3), 12))
+    assert all(result[:2] == expected for result in results)
+
+def test_close_removes_files():
+    t, t_prime = time_matrices(random_instance(random.Random(4), 5))
+    shared = SharedMatrices(t, t_prime)
+    directory = shared.handle.directory
+    assert sorted(os.listdir(directory)) == ["t.npy", "t_prime.npy"]
+    shared.close()
+    assert not os.path.exists(directory)
+    with pytest.raises(FileNotFoundError):
+        attach(MatrixHandle(directory))
+
+def test_tune_evaluate_parallel_matches_serial():
+    instances = tune.benchmark_instances(2, 4, N=1, seed=3)
+    configs = [{"num_search_workers": 1}]
+    serial = tune.evaluate(configs, instances, 0.0, 10.0, jobs=1)
+    parallel = tune.evaluate(configs, instances, 0.0, 10.0, jobs=2)
+    assert [score < 20.0 for score in parallel] == [score < 20.0 for score in serial]
+    shared = [SharedMatrices(*time_matrices(inst)) for inst in instances]
+    try:
+        with ProcessPoolExecutor(2) as pool:
+            mapped = list(pool.map(solve_case, instances, [m.handle for m in shared]))
+    finally:
+        for matrices in shared:
+            matrices.close()
+    assert mapped == [solve_case(inst) for inst in instances]
+
+#-----------------------------------------------------------------------------------------
+# Feedback
+#-----------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    for n in (200, 1000, 2000):
+        inst = random_instance(random.Random(0), n, grid=100)
+        for shared in (False, True):
+            _, _, elapsed = run_case(inst, tasks=64, workers=4, shared=shared)
+            print(f"n={n}, {'handle' if shared else 'pickled arrays'}: 64 tasks in {elapsed:.2f}s")
@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+
+import numpy as np
+
+# ---------------- Shared Travel Matrices ----------------
+# Worker processes need t and t_prime, and pickling both n x n arrays into
+# every task copies them once per task. SharedMatrices writes them once as
+# .npy files (in /dev/shm where it exists, so they never touch a disk) and
+# workers get a MatrixHandle, which pickles as a short path. attach() maps the
+# files read-only, once per process, so every worker reads the same physical
+# pages:
+#
+#   with SharedMatrices(t, t_prime) as shared:
+#       pool.map(work, [shared.handle] * tasks)      # work: t, t_prime = attach(handle)
+
+NAMES = ("t", "t_prime")
+
+
+@dataclass(frozen=True)
+class MatrixHandle:
+    """Picklable reference to matrices published by SharedMatrices."""
+    directory: str
+
+
+class SharedMatrices:
+    """t and t_prime published as memory-mapped files until close()."""
+
+    def __init__(self, t, t_prime, directory=None):
+        if directory is None and os.path.isdir("/dev/shm"):
+            directory = "/dev/shm"
+        self.handle = MatrixHandle(tempfile.mkdtemp(prefix="tandem-matrices-", dir=directory))
+        for name, matrix in zip(NAMES, (t, t_prime)):
+            np.save(os.path.join(self.handle.directory, f"{name}.npy"), np.ascontiguousarray(matrix))
+
+    def close(self):
+        # Workers that already mapped the files keep their pages until they exit
+        shutil.rmtree(self.handle.directory, ignore_errors=True)
+        _attached.pop(self.handle, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_attached = {}      # handle -> (t, t_prime) mapped in this process
+
+
+def attach(matrices):
+    """(t, t_prime) for a MatrixHandle, mapped read-only on first use in this
+    process; a (t, t_prime) pair is returned unchanged."""
+    if not isinstance(matrices, MatrixHandle):
+        return matrices
+    if matrices not in _attached:
+        _attached[matrices] = tuple(np.load(os.path.join(matrices.directory, f"{name}.npy"), mmap_mode="r")
+                                    for name in NAMES)
+    return _attached[matrices]
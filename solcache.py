@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from instance import instance_to_dict
+
+# ---------------- Solution Cache ----------------
+# Plans of finished solves on disk, one JSON file per request key. The key
+# hashes the canonical form of the instance (sets sorted, node-keyed dicts in
+# node order, floats rounded and integral floats written as ints) together
+# with the model options and the solver parameters that change what a status
+# means (everything except the time limit and worker count). Nodes are not
+# renumbered: (45) ties node indices to tandem indices, so a relabelled
+# instance is a different model.
+#
+# An OPTIMAL or INFEASIBLE entry answers the request outright; a FEASIBLE one
+# only gives a solution hint for a fresh solve, whose result replaces it if
+# better. Entries expire after `ttl` seconds, and the least recently used ones
+# are evicted beyond `max_entries` files or `max_bytes` on disk.
+
+DIGITS = 9                       # significant digits kept of float data
+IGNORED_PARAMS = ("max_time_in_seconds", "num_search_workers", "num_workers", "log_search_progress")
+DEFINITIVE = ("OPTIMAL", "INFEASIBLE")
+
+
+def canonical(value):
+    """JSON-ready copy of `value` with floats rounded and containers ordered."""
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, float):
+        value = float(f"{value:.{DIGITS}g}")
+        return int(value) if value.is_integer() else value
+    if isinstance(value, int):
+        return value
+    if isinstance(value, dict):
+        return {str(k): canonical(value[k]) for k in sorted(value, key=lambda k: (str(type(k)), k))}
+    if isinstance(value, (set, frozenset)):
+        return [canonical(v) for v in sorted(value)]
+    return [canonical(v) for v in value]
+
+
+def request_key(inst, params=None, compact_delay=False):
+    """Hex digest identifying a solve request up to time limit and workers."""
+    params = {name: value for name, value in (params or {}).items() if name not in IGNORED_PARAMS}
+    body = {"instance": canonical(instance_to_dict(inst)), "params": canonical(params),
+            "compact_delay": bool(compact_delay)}
+    return hashlib.sha256(json.dumps(body, sort_keys=True).encode()).hexdigest()
+
+
+def solution_values(solver, var):
+    """Nonzero values of the solver's solution as [[family, key, value], ...]."""
+    values = []
+    for f, family in var.items():
+        for key, v in family.items():
+            value = solver.Value(v)
+            if value:
+                values.append([f, list(key) if isinstance(key, tuple) else [key], value])
+    return values
+
+
+def add_hint(model, var, entry):
+    """Hint every variable of `model` with the cached solution (0 where absent)."""
+    stored = {(f, tuple(key)): value for f, key, value in entry["values"]}
+    model.ClearHints()
+    for f, family in var.items():
+        for key, v in family.items():
+            model.AddHint(v, stored.get((f, key if isinstance(key, tuple) else (key,)), 0))
+
+
+class SolutionCache:
+    """On-disk store of solve results keyed by request_key()."""
+
+    def __init__(self, directory, max_entries=256, max_bytes=64 << 20, ttl=7 * 24 * 3600):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        """The entry stored under `key`, or None when missing or expired."""
+        path = self._path(key)
+        with self.lock:
+            try:
+                with open(path) as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                return None
+            if time.time() - entry["created"] > self.ttl:
+                self._remove(path)
+                return None
+            os.utime(path)              # mtime orders the LRU eviction
+        return entry
+
+    def put(self, key, entry):
+        """Store `entry` unless the cache already holds a better one for `key`."""
+        current = self.get(key)
+        if current is not None and not _better(entry, current):
+            return False
+        entry = dict(entry, key=key, created=time.time())
+        with self.lock:
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp, self._path(key))
+            self._evict()
+        return True
+
+    def __len__(self):
+        return len(self._entries())
+
+    def _entries(self):
+        """(mtime, size, path) of every entry, least recently used first."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def _evict(self):
+        entries = self._entries()
+        now, total = time.time(), sum(size for _, size, _ in entries)
+        for n, (mtime, size, path) in enumerate(entries):
+            if len(entries) - n <= self.max_entries and total <= self.max_bytes and now - mtime <= self.ttl:
+                break
+            self._remove(path)
+            total -= size
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _better(entry, current):
+    if current["status"] in DEFINITIVE:
+        return False
+    if entry["status"] in DEFINITIVE:
+        return True
+    return entry.get("objective") is not None and \
+        (current.get("objective") is None or entry["objective"] < current["objective"])
@@ -0,0 +1,122 @@
+import os
+import random
+import time
+from dataclasses import replace
+
+from ortools.sat.python import cp_model
+
+import daemon
+from instance import default_instance, instance_to_dict, random_instance
+from optimisetester import build_model, solve
+from solcache import SolutionCache, add_hint, request_key, solution_values
+
+#-----------------------------------------------------------------------------------------
+# Solution cache: canonical request keys, on-disk entries, eviction and reuse
+#-----------------------------------------------------------------------------------------
+
+def entry(status="OPTIMAL", objective=1.0, values=()):
+    return {"status": status, "objective": objective, "bound": objective, "plan": {}, "values": list(values)}
+
+def run_case(url, body):
+    job_id = daemon.request(f"{url}/jobs", "POST", body)["id"]
+    return daemon.wait(url, job_id, timeout=60)
+
+#-----------------------------------------------------------------------------------------
+# Tests
+#-----------------------------------------------------------------------------------------
+def test_request_key_canonical():
+    inst = default_instance()
+    same = replace(inst, VT=set(sorted(inst.VT, reverse=True)), D=dict(reversed(list(inst.D.items()))),
+                   alpha={i: a + 1e-12 for i, a in inst.alpha.items()}, ct=float(inst.ct))
+    assert request_key(inst) == request_key(same)
+    assert request_key(inst, {"max_time_in_seconds": 5}) == request_key(inst, {"max_time_in_seconds": 50})
+    assert request_key(inst) != request_key(replace(inst, E=inst.E + 1))
+    assert request_key(inst) != request_key(inst, compact_delay=True)
+    assert request_key(inst) != request_key(inst, {"relative_gap_limit": 0.1})
+    swapped = replace(inst, V=[inst.V[0], inst.V[2], inst.V[1]] + inst.V[3:])
+    assert request_key(inst) != request_key(swapped)
+
+def test_cache_keeps_best_entry(tmp_path):
+    cache = SolutionCache(str(tmp_path))
+    assert cache.get("k") is None
+    assert cache.put("k", entry("FEASIBLE", 10.0))
+    assert not cache.put("k", entry("FEASIBLE", 12.0))
+    assert cache.put("k", entry("FEASIBLE", 8.0)) and cache.get("k")["objective"] == 8.0
+    assert cache.put("k", entry("OPTIMAL", 7.0))
+    assert not cache.put("k", entry("FEASIBLE", 5.0)) and cache.get("k")["status"] == "OPTIMAL"
+
+def test_cache_eviction_and_ttl(tmp_path):
+    cache = SolutionCache(str(tmp_path), max_entries=3)
+    now = time.time()
+    for n in range(3):
+        cache.put(f"k{n}", entry())
+        os.utime(tmp_path / f"k{n}.json", (now - 100 + n, now - 100 + n))
+    cache.get("k0")                                  # k0 becomes most recently used
+    cache.put("k3", entry())
+    assert len(cache) == 3 and cache.get("k1") is None and cache.get("k0") is not None
+
+    small = SolutionCache(str(tmp_path / "small"), max_bytes=1)
+    small.put("a", entry())
+    assert len(small) == 0
+
+    expiring = SolutionCache(str(tmp_path / "ttl"), ttl=0.05)
+    expiring.put("a", entry())
+    assert expiring.get("a") is not None
+    time.sleep(0.1)
+    assert expiring.get("a") is None and len(expiring) == 0
+
+def test_hint_from_cached_values():
+    inst = random_instance(random.Random(4), 6, N=2)
+    model, var = build_model(inst)
+    solver, status = solve(model, max_time_in_seconds=20)
+    assert status == cp_model.OPTIMAL
+    cached = entry("FEASIBLE", solver.ObjectiveValue(), solution_values(solver, var))
+    fresh, fresh_var = build_model(inst)
+    add_hint(fresh, fresh_var, cached)
+    assert len(fresh.Proto().solution_hint.vars) == len(fresh.Proto().variables)
+    check = cp_model.CpSolver()
+    check.parameters.fix_variables_to_their_hinted_value = True
+    check.parameters.num_search_workers = 1
+    assert check.Solve(fresh) == cp_model.OPTIMAL
+    assert check.ObjectiveValue() == solver.ObjectiveValue()
+
+def test_daemon_answers_from_solution_cache(tmp_path):
+    server, service = daemon.serve(port=0, workers=1, search_workers=2, solution_cache=str(tmp_path))
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        body = {"instance": instance_to_dict(default_instance()), "time_limit": 20}
+        first = run_case(url, body)
+        assert first["result"]["cached_solution"] == "miss" and first["result"]["objective"] == 433.0
+        again = run_case(url, dict(body, time_limit=5))
+        assert again["result"]["cached_solution"] == "hit"
+        assert again["result"]["plan"] == first["result"]["plan"]
+        assert daemon.request(f"{url}/health")["cached_solutions"] == 1
+
+        slow = {"instance": instance_to_dict(random_instance(random.Random(3), 10, N=3, grid=25, horizon=120)),
+                "time_limit": 0.5}
+        partial = run_case(url, slow)
+        assert partial["result"]["cached_solution"] == "miss"
+        if partial["result"]["status"] == "FEASIBLE":
+            assert run_case(url, slow)["result"]["cached_solution"] == "hint"
+        # Hints go on a per-job copy, never on the shared cached models
+        assert not any(model.Proto().has_solution_hint() for model, _ in service.models.items.values())
+    finally:
+        service.stop()
+        server.shutdown()
+
+#-----------------------------------------------------------------------------------------
+# Feedback
+#-----------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    import tempfile
+
+    server, service = daemon.serve(port=0, workers=1, search_workers=8, solution_cache=tempfile.mkdtemp())
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    body = {"instance": instance_to_dict(random_instance(random.Random(1), 9, N=2)), "time_limit": 60}
+    for attempt in range(3):
+        start = time.time()
+        result = run_case(url, body)["result"]
+        print(f"request {attempt}: {result['status']} {result.get('objective')} "
+              f"({result['cached_solution']}) in {time.time() - start:.3f}s")
+    service.stop()
+    server.shutdown()
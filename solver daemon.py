@@ -0,0 +1,96 @@
+import random
+import time
+
+import pytest
+
+import daemon
+from instance import default_instance, instance_to_dict, random_instance, save_instance
+
+#-----------------------------------------------------------------------------------------
+# Solver daemon: job submission, caching, priorities and cancellation over HTTP
+#-----------------------------------------------------------------------------------------
+
+@pytest.fixture
+def url():
+    server, service = daemon.serve(port=0, workers=1, search_workers=2)
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    service.stop()
+    server.shutdown()
+
+def slow_instance():
+    return instance_to_dict(random_instance(random.Random(3), 10, N=3, grid=25, horizon=120))
+
+def run_case(url, body):
+    job_id = daemon.request(f"{url}/jobs", "POST", body)["id"]
+    return daemon.wait(url, job_id, timeout=60)
+
+#-----------------------------------------------------------------------------------------
+# Tests
+#-----------------------------------------------------------------------------------------
+def test_daemon_solves_and_caches_model(url):
+    body = {"instance": instance_to_dict(default_instance()), "time_limit": 20}
+    first = run_case(url, body)
+    assert first["state"] == "done"
+    assert first["result"]["status"] == "OPTIMAL" and first["result"]["objective"] == 433.0
+    assert first["result"]["cached_model"] is False
+    second = run_case(url, body)
+    assert second["result"]["cached_model"] is True
+    assert daemon.request(f"{url}/health")["cached_models"] == 1
+
+def test_daemon_instance_file(url, tmp_path):
+    path = tmp_path / "instance.json"
+    save_instance(random_instance(random.Random(1), 4), path)
+    job = run_case(url, {"instance_file": str(path), "time_limit": 10})
+    assert job["result"]["status"] == "OPTIMAL"
+    assert {"truck", "drone", "unserved"} <= set(job["result"]["plan"])
+
+def test_daemon_priority_and_cancel(url):
+    busy = daemon.request(f"{url}/jobs", "POST", {"instance": slow_instance(), "time_limit": 60})["id"]
+    small = {"instance": instance_to_dict(random_instance(random.Random(2), 4)), "time_limit": 10}
+    low = daemon.request(f"{url}/jobs", "POST", dict(small, priority=0))["id"]
+    high = daemon.request(f"{url}/jobs", "POST", dict(small, priority=5))["id"]
+    time.sleep(0.5)
+    assert daemon.request(f"{url}/jobs/{busy}")["state"] == "running"
+    assert daemon.request(f"{url}/jobs/{low}", "DELETE")["state"] == "cancelled"
+    daemon.request(f"{url}/jobs/{busy}", "DELETE")
+    assert daemon.wait(url, busy, timeout=30)["state"] == "cancelled"
+    assert daemon.wait(url, high, timeout=30)["state"] == "done"
+    assert daemon.request(f"{url}/jobs/{low}")["state"] == "cancelled"
+
+def test_daemon_evicts_finished_jobs():
+    server, service = daemon.serve(port=0, workers=1, search_workers=2, max_jobs=2)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        small = {"instance": instance_to_dict(random_instance(random.Random(2), 4)), "time_limit": 10}
+        ids = [run_case(url, small)["id"] for _ in range(3)]
+        assert ids == ["job-0", "job-1", "job-2"]
+        assert [job["id"] for job in daemon.request(f"{url}/jobs")] == ids[1:]
+        with pytest.raises(daemon.urllib.error.HTTPError) as e:
+            daemon.request(f"{url}/jobs/{ids[0]}")
+        assert e.value.code == 404
+        service.job_ttl = 0
+        assert daemon.request(f"{url}/jobs", "POST", small)["id"] == "job-3"
+        assert [job["id"] for job in daemon.request(f"{url}/jobs")] == ["job-3"]
+    finally:
+        service.stop()
+        server.shutdown()
+
+def test_daemon_rejects_bad_request(url):
+    with pytest.raises(daemon.urllib.error.HTTPError) as e:
+        daemon.request(f"{url}/jobs", "POST", {"instance": {"V": [[0, 0]]}})
+    assert e.value.code == 400
+
+#-----------------------------------------------------------------------------------------
+# Feedback
+#-----------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    server, service = daemon.serve(port=0, workers=1)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    for label in ("cold", "warm"):
+        start = time.time()
+        job = run_case(url, {"instance": instance_to_dict(default_instance())})
+        result = job["result"]
+        print(f"{label}: {result['status']} objective={result['objective']} build={result['build_time']:.3f}s "
+              f"round trip={time.time() - start:.2f}s")
+    service.stop()
+    server.shutdown()
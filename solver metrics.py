@@ -0,0 +1,115 @@
+import json
+import random
+
+from ortools.sat.python import cp_model
+
+import cli
+import daemon
+from instance import default_instance, instance_to_dict, random_instance
+from optimisetester import build_model, solve
+from solverlog import RESPONSE_FIELDS, SearchLog, number, parse_log, solve_metrics
+
+#-----------------------------------------------------------------------------------------
+# Solver metrics: captured search logs, parsed progress and per-job metrics
+#-----------------------------------------------------------------------------------------
+
+def run_case(inst, max_time_in_seconds=20, num_search_workers=8):
+    model, var = build_model(inst)
+    log = SearchLog()
+    solver, status = solve(model, max_time_in_seconds, num_search_workers, log=log)
+    return solver, status, model, log
+
+def run_job(url, body):
+    job_id = daemon.request(f"{url}/jobs", "POST", body)["id"]
+    return daemon.wait(url, job_id, timeout=60)
+
+#-----------------------------------------------------------------------------------------
+# Tests
+#-----------------------------------------------------------------------------------------
+def test_number():
+    assert number("1'068") == 1068 and number("0.21s") == 0.21 and number("inf") == float("inf")
+    assert number("12.5%") == "12.5%" and number("fj_restart") == "fj_restart"
+
+def test_parse_captured_log(capfd):
+    solver, status, model, log = run_case(default_instance())
+    assert status == cp_model.OPTIMAL
+    assert "CpSolverResponse" not in capfd.readouterr().out
+    metrics = log.metrics()
+    assert metrics["model"]["variables"] == len(model.Proto().variables)
+    assert metrics["presolved_model"]["variables"] <= metrics["model"]["variables"]
+    assert metrics["presolve_rules"] and metrics["presolve_time"] >= 0
+    objectives = [s["objective"] for s in metrics["solutions"]]
+    assert objectives == sorted(objectives, reverse=True) and objectives[-1] == solver.ObjectiveValue()
+    assert all("(" not in s["worker"] for s in metrics["solutions"])
+    assert metrics["first_solution_time"] <= metrics["done"]["time"]
+    assert "Search stats" in metrics["tables"] and "Solutions" in metrics["tables"]
+
+def test_parse_log_lines():
+    lines = ["Starting presolve at 0.00s", "#Variables: 1'200 (#bools: 10)", "#kLinear2: 35",
+             "  - rule 'linear: remove zero terms' was applied 4 times.",
+             "Presolved optimization model '': (model_fingerprint: 0x1)", "#Variables: 900",
+             "Starting search at 0.25s with 8 workers.",
+             "#1       0.30s best:120   next:[10,119]   fj_restart(batch:1 lin{mem:0})",
+             "#Bound   0.40s best:120   next:[40,119]   max_lp",
+             "#2       0.50s best:90    next:[40,89]    quick_restart",
+             "#Done    0.90s core", "",
+             "Search stats   Bools  Conflicts",
+             "  'core':          10         25",
+             "  'max_lp':        12         40", ""]
+    metrics = parse_log(lines)
+    assert metrics["model"] == {"variables": 1200, "constraints": {"Linear2": 35}}
+    assert metrics["presolved_model"] == {"variables": 900}
+    assert metrics["presolve_rules"] == {"linear: remove zero terms": 4}
+    assert metrics["workers"] == 8 and metrics["presolve_time"] == 0.25
+    assert metrics["solutions"] == [{"time": 0.3, "objective": 120, "worker": "fj_restart"},
+                                    {"time": 0.5, "objective": 90, "worker": "quick_restart"}]
+    assert metrics["bounds"] == [{"time": 0.4, "bound": 40, "worker": "max_lp"}]
+    assert metrics["done"] == {"time": 0.9, "worker": "core"}
+    assert metrics["tables"]["Search stats"]["max_lp"] == {"Bools": 12, "Conflicts": 40}
+
+def test_response_metrics():
+    solver, status, model, log = run_case(random_instance(random.Random(2), 7, N=2), num_search_workers=2)
+    metrics = solve_metrics(solver, model, log)
+    assert set(metrics["response"]) == set(RESPONSE_FIELDS)
+    assert metrics["response"]["wall_time"] == solver.WallTime()
+    assert metrics["response"]["num_branches"] == solver.NumBranches()
+    assert metrics["model_size"]["variables"] == len(model.Proto().variables)
+    json.dumps(metrics)
+
+def test_daemon_metrics_and_log(tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    server, service = daemon.serve(port=0, workers=1, search_workers=2, metrics_log=str(path))
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        body = {"instance": instance_to_dict(default_instance()), "time_limit": 20}
+        with_metrics = run_job(url, dict(body, metrics=True))["result"]
+        assert with_metrics["metrics"]["log"]["solutions"][-1]["objective"] == with_metrics["objective"]
+        plain = run_job(url, body)["result"]
+        assert "metrics" not in plain
+    finally:
+        service.stop()
+        server.shutdown()
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["id"] for line in lines] == ["job-0", "job-1"]
+    assert all(line["status"] == "OPTIMAL" and line["nodes"] == default_instance().num_nodes and "metrics" in line for line in lines)
+
+def test_cli_metrics(capsys):
+    assert cli.main(["solve", "--json", "--metrics", "--time-limit", "20"]) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert result["metrics"]["response"]["wall_time"] > 0
+    assert result["metrics"]["log"]["solutions"]
+
+#-----------------------------------------------------------------------------------------
+# Feedback
+#-----------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    for n, N in ((6, 2), (9, 2), (12, 3)):
+        solver, status, model, log = run_case(random_instance(random.Random(n), n, N=N), 60)
+        metrics = solve_metrics(solver, model, log)
+        parsed = metrics["log"]
+        print(f"n={n}, N={N}: {solver.StatusName(status)} in {solver.WallTime():.2f}s, "
+              f"{metrics['model_size']['variables']} -> {parsed['presolved_model'].get('variables')} variables, "
+              f"presolve {parsed.get('presolve_time', 0):.2f}s, "
+              f"first solution at {parsed.get('first_solution_time', float('nan')):.2f}s")
+        for s in parsed["solutions"]:
+            print(f"    {s['time']:7.2f}s  {s['objective']:>10}  {s['worker']}")
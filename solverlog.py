@@ -0,0 +1,133 @@
+import re
+
+# ---------------- Solver Log Metrics ----------------
+# Captures CP-SAT's search log through log_callback (nothing goes to stdout)
+# and turns it into a JSON-ready dict of metrics next to the response
+# statistics, so every result can carry how its solve went:
+#
+#   log = SearchLog()
+#   log.attach(solver)
+#   status = solver.Solve(model)
+#   metrics = solve_metrics(solver, model, log)
+#
+# Metrics hold the model sizes before and after presolve, presolve time and
+# the count of every presolve rule applied, the time and worker of each
+# improving solution and bound, and the per-worker summary tables the log
+# ends with ("Search stats", "Solutions", "LNS stats", ...).
+
+RESPONSE_FIELDS = ("num_booleans", "num_integers", "num_conflicts", "num_branches", "num_restarts",
+                   "num_binary_propagations", "num_integer_propagations", "num_lp_iterations",
+                   "wall_time", "user_time", "deterministic_time", "gap_integral")
+
+_TIME = r"([\d.e+-]+)s"
+_WORKER = r"([^\s(]*)"                 # worker name, without its "(...)" details
+_SOLUTION = re.compile(rf"^#(\d+)\s+{_TIME}\s+best:(\S+)\s+next:\[(\S*)\]\s*{_WORKER}")
+_BOUND = re.compile(rf"^#Bound\s+{_TIME}\s+best:(\S+)\s+next:\[(\S*)\]\s*{_WORKER}")
+_DONE = re.compile(rf"^#Done\s+{_TIME}\s*{_WORKER}")
+_RULE = re.compile(r"^\s+- rule '(.*)' was applied (\S+) times?\.")
+_TABLE_ROW = re.compile(r"^\s+'(.+?)':\s*(.*)$")
+
+
+class SearchLog:
+    """Collects the search log of the solvers it is attached to."""
+
+    def __init__(self):
+        self.lines = []
+
+    def attach(self, solver):
+        solver.parameters.log_search_progress = True
+        solver.parameters.log_to_stdout = False
+        solver.log_callback = self.write
+
+    def write(self, text):
+        self.lines.extend(text.split("\n"))
+
+    def metrics(self):
+        return parse_log(self.lines)
+
+
+def number(text):
+    """int or float of a log value such as 1'068, 0.21s or inf; text otherwise."""
+    text = text.replace("'", "").rstrip("s") if re.fullmatch(r"[\d.'e+-]+s?|[+-]?inf", text) else text
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    return text
+
+
+def _lower_bound(interval):
+    return number(interval.split(",")[0]) if interval else None
+
+
+def parse_log(lines):
+    """Structured metrics of a CP-SAT search log (a list of lines)."""
+    metrics = {"model": {}, "presolved_model": {}, "presolve_rules": {}, "solutions": [], "bounds": [],
+               "tables": {}}
+    section = metrics["model"]
+    table = None
+    for line in lines:
+        if table is not None:
+            row = _TABLE_ROW.match(line)
+            if row:
+                values = [number(v) for v in re.split(r"\s{2,}", row.group(2).strip())]
+                columns = table["columns"]
+                table["rows"][row.group(1)] = dict(zip(columns, values)) if len(values) == len(columns) \
+                    else values
+                continue
+            metrics["tables"][table["title"]] = table["rows"]
+            table = None
+
+        if line.startswith("Starting presolve at"):
+            metrics["presolve_start"] = number(line.split()[-1])
+        elif line.startswith("Starting search at"):
+            parts = line.split()
+            metrics["search_start"] = number(parts[3])
+            metrics["workers"] = number(parts[5])
+        elif line.startswith("Presolved optimization model"):
+            section = metrics["presolved_model"]
+        elif line.startswith("#Variables:"):
+            section["variables"] = number(line.split()[1])
+        elif re.match(r"^#k\w+:", line):
+            name, count = line.split()[:2]
+            section.setdefault("constraints", {})[name[2:-1]] = number(count)
+        elif _RULE.match(line):
+            rule, times = _RULE.match(line).groups()
+            metrics["presolve_rules"][rule] = number(times)
+        elif _SOLUTION.match(line):
+            index, at, best, _, worker = _SOLUTION.match(line).groups()
+            metrics["solutions"].append({"time": number(at), "objective": number(best), "worker": worker})
+        elif _BOUND.match(line):
+            at, _, interval, worker = _BOUND.match(line).groups()
+            metrics["bounds"].append({"time": number(at), "bound": _lower_bound(interval), "worker": worker})
+        elif _DONE.match(line):
+            at, worker = _DONE.match(line).groups()
+            metrics["done"] = {"time": number(at), "worker": worker}
+        elif line and not line[0].isspace() and not line.startswith("#") and re.search(r"\S\s{2,}\S", line):
+            title, *columns = re.split(r"\s{2,}", line.strip())
+            table = {"title": re.sub(r"\s*\(\d+\)$", "", title), "columns": columns, "rows": {}}
+    if table is not None:
+        metrics["tables"][table["title"]] = table["rows"]
+
+    if "presolve_start" in metrics and "search_start" in metrics:
+        metrics["presolve_time"] = metrics["search_start"] - metrics["presolve_start"]
+    if metrics["solutions"]:
+        metrics["first_solution_time"] = metrics["solutions"][0]["time"]
+    return metrics
+
+
+def response_metrics(solver):
+    """Statistics of the last response (the ResponseStats() numbers)."""
+    response = solver.ResponseProto()
+    return {name: getattr(response, name) for name in RESPONSE_FIELDS}
+
+
+def solve_metrics(solver, model, log=None):
+    """Response statistics, model size and, with a SearchLog, the parsed log."""
+    proto = model.Proto()
+    metrics = {"response": response_metrics(solver),
+               "model_size": {"variables": len(proto.variables), "constraints": len(proto.constraints)}}
+    if log is not None:
+        metrics["log"] = log.metrics()
+    return metrics
@@ -0,0 +1,78 @@
+import random
+
+from ortools.sat.python import cp_model
+
+import evaluator
+import fuzz
+from instance import default_instance, random_instance
+from optimisetester import build_model, solve, time_matrices
+
+#-----------------------------------------------------------------------------------------
+# Sortie intervals: (62) as a NoOverlap of optional launch-to-rendezvous intervals
+#-----------------------------------------------------------------------------------------
+
+def run_case(inst, compact_delay=False):
+    results = []
+    for intervals in (False, True):
+        model, var = build_model(inst, compact_delay=compact_delay, sortie_intervals=intervals)
+        solver, status = solve(model, max_time_in_seconds=30, num_search_workers=8)
+        results.append((solver, status, var))
+    return results
+
+def values(solver, var):
+    return {f: {key: solver.Value(v) for key, v in family.items()} for f, family in var.items()}
+
+#-----------------------------------------------------------------------------------------
+# Tests
+#-----------------------------------------------------------------------------------------
+def test_one_no_overlap_per_tandem():
+    inst = random_instance(random.Random(2), 6, N=3)
+    rows, interval_rows = {}, {}
+    model, _ = build_model(inst, rows=rows)
+    intervals, _ = build_model(inst, rows=interval_rows, sortie_intervals=True)
+    added = [intervals.Proto().constraints[r] for r in interval_rows["62"]]
+    assert sum(c.has_no_overlap() for c in added) == inst.N
+    assert sum(c.has_interval() for c in added) == sum(len(c.no_overlap.intervals) for c in added)
+    assert len(interval_rows["62"]) < len(rows["62"])
+    assert all(len(interval_rows[f]) == len(rows[f]) for f in rows if f != "62")
+
+def test_interval_optimum_never_lower():
+    for seed in (1, 4):
+        (solver, status, _), (i_solver, i_status, _) = run_case(random_instance(random.Random(seed), 6, N=2))
+        assert status == i_status == cp_model.OPTIMAL
+        assert i_solver.ObjectiveValue() >= solver.ObjectiveValue()
+
+def test_sorties_of_a_tandem_do_not_overlap():
+    # The P-based (62) lets tandem 1 fly two sorties at once on the default instance
+    inst = default_instance()
+    t, t_prime = time_matrices(inst)
+    (solver, _, var), (i_solver, i_status, i_var) = run_case(inst)
+    assert evaluator.violations(inst, t, t_prime, values(solver, var), sortie_intervals=True) == ["62"]
+    assert i_status == cp_model.OPTIMAL and i_solver.ObjectiveValue() > solver.ObjectiveValue()
+    assert evaluator.violations(inst, t, t_prime, values(i_solver, i_var), sortie_intervals=True) == []
+    for k in inst.K:
+        busy = sorted((i_solver.Value(i_var["a"][k, i]), i_solver.Value(i_var["a"][k, l]))
+                      for (kk, i, j, l), v in i_var["y_drone"].items() if kk == k and i_solver.Value(v))
+        assert all(end <= start for (_, end), (start, _) in zip(busy, busy[1:]))
+
+def test_sortie_intervals_with_compact_delay():
+    inst = random_instance(random.Random(5), 6, N=2)
+    (_, _, _), (i_solver, i_status, i_var) = run_case(inst)
+    (_, _, _), (c_solver, c_status, _) = run_case(inst, compact_delay=True)
+    assert i_status == c_status == cp_model.OPTIMAL
+    assert c_solver.ObjectiveValue() == i_solver.ObjectiveValue()
+
+def test_sortie_intervals_fuzz():
+    stats, found = fuzz.run(instances=10, assignments=20, seed=5, sortie_intervals=True)
+    assert stats["feasible"] > 0
+    assert found == []
+
+#-----------------------------------------------------------------------------------------
+# Feedback
+#-----------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    for seed, n in ((1, 7), (2, 8), (3, 9), (6, 10)):
+        inst = random_instance(random.Random(seed), n, N=2)
+        print(f"seed {seed}, n={n}: " + ", ".join(
+            f"{label} {solver.StatusName(status)} {solver.ObjectiveValue()} in {solver.WallTime():.2f}s"
+            for label, (solver, status, _) in zip(("P rows", "intervals"), run_case(inst))))
@@ -0,0 +1,112 @@
+import time
+
+import numpy as np
+
+from ortools.sat.python import cp_model
+
+from optimisetester import build_model, solution_plan, solve, time_matrices
+from precheck import earliest_arrivals, useless_arcs
+
+# ---------------- Nearest-Neighbour Truck Arcs ----------------
+# build_model declares x[k, i, j] for every ordered pair of nodes, so K·n² arc
+# literals exist between nodes no sensible route connects. neighbour_arcs
+# keeps, for every node, only the arcs to and from its k nearest neighbours by
+# truck time t, plus all arcs out of and into the depot; build_model(arcs=...)
+# then declares just those. t is already a dense n x n array, so the
+# neighbours come from a partial sort of its rows (argpartition), O(n²) in
+# numpy.
+#
+# The big-M rows of (41,42) and (54) are not slack when an arc is unused (T is
+# usually the horizon, so a[j] >= a[i] + t[i][j] - T binds), so a removed arc
+# keeps them without its literal: the restricted model is the full model with
+# those arcs fixed unused, its optimum is never below the full one and its
+# plans are plans of the full model. The saving is in literals and in rows
+# that presolve reduces to bounds on a and u.
+#
+# Two safeguards widen the neighbourhood. sparse_arcs doubles k until every
+# affected area keeps a usable arc in and out wherever the full arc set has
+# one (see precheck.useless_arcs), and sparse_solve doubles k and solves again
+# while the restricted model is INFEASIBLE, up to the full arc set.
+
+
+def neighbour_arcs(t, k, depot=0):
+    """(n, n) mask of the arcs i -> j where j is among the k nearest of i or
+    i among the k nearest of j by t, plus the depot arcs."""
+    t = np.asarray(t)
+    n = len(t)
+    keep = np.zeros((n, n), dtype=bool)
+    if k >= n - 1:
+        keep[:] = True
+    else:
+        times = np.where(np.eye(n, dtype=bool), np.iinfo(t.dtype).max, t)
+        nearest = np.argpartition(times, k - 1, axis=1)[:, :k] if k > 0 else np.empty((n, 0), dtype=int)
+        keep[np.arange(n)[:, None], nearest] = True
+        keep |= keep.T
+        keep[depot, :] = keep[:, depot] = True
+    np.fill_diagonal(keep, False)
+    return keep
+
+
+def covers(arcs, usable):
+    """Whether `arcs` keeps a usable arc into and out of (to VR) every affected
+    area that has one among `usable`."""
+    kept = arcs & usable
+    into = kept[:, 1:].any(axis=0) | ~usable[:, 1:].any(axis=0)
+    out_of = kept[1:, 1:].any(axis=1) | ~usable[1:, 1:].any(axis=1)
+    return bool(into.all() and out_of.all())
+
+
+def sparse_arcs(inst, t, k=8):
+    """(k, arcs): the k-nearest-neighbour arc mask, with k widened until covers() holds."""
+    n = inst.num_nodes
+    usable = ~useless_arcs(inst, t, earliest_arrivals(inst, t)) & ~np.eye(n, dtype=bool)
+    k = min(k, n - 1)
+    while k < n - 1 and not covers(neighbour_arcs(t, k, inst.depot), usable):
+        k = min(2 * max(k, 1), n - 1)
+    return k, neighbour_arcs(t, k, inst.depot)
+
+
+def sparse_solve(inst, k=8, t=None, t_prime=None, compact_delay=False, max_time_in_seconds=30,
+                 num_search_workers=8, params=None):
+    """Solve `inst` on its nearest-neighbour arcs (see sparse_arcs), widening
+    k while the restricted model is INFEASIBLE; returns a dict with the last
+    solver, status, model and var, the "k" and number of "arcs" per tandem it
+    ended with, the per-solve log ("rounds") and, when a solution was found,
+    its "plan".
+    """
+    if t is None or t_prime is None:
+        t, t_prime = time_matrices(inst)
+    start = time.time()
+    deadline = start + max_time_in_seconds
+    full = inst.num_nodes - 1
+    k, arcs = sparse_arcs(inst, t, k)
+    result = {"rounds": []}
+    while True:
+        build_start = time.time()
+        model, var = build_model(inst, t, t_prime, compact_delay, arcs=arcs)
+        build_time = time.time() - build_start
+        solver, status = solve(model, max(0.0, deadline - time.time()), num_search_workers, params)
+        result.update(solver=solver, status=status, model=model, var=var, k=k, arcs=int(arcs.sum()))
+        result["rounds"].append({"k": k, "arcs": int(arcs.sum()), "status": solver.StatusName(status),
+                                 "build_time": build_time, "wall_time": solver.WallTime()})
+        if status != cp_model.INFEASIBLE or k >= full or time.time() >= deadline:
+            break
+        k = min(2 * max(k, 1), full)
+        arcs = neighbour_arcs(t, k, inst.depot)
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        result["plan"] = solution_plan(solver, var, inst)
+    result["wall_time"] = time.time() - start
+    return result
+
+
+if __name__ == "__main__":
+    import random
+
+    from instance import random_instance
+
+    for n in (20, 60, 120):
+        inst = random_instance(random.Random(n), n, N=2, grid=40, horizon=120)
+        t, _ = time_matrices(inst)
+        for k in (5, 10):
+            used, arcs = sparse_arcs(inst, t, k)
+            print(f"n={n}, k={k} (used {used}): {int(arcs.sum())} of {n * (n + 1)} arcs per tandem")
@@ -0,0 +1,179 @@
+import time
+
+from ortools.sat.python import cp_model
+
+import evaluator
+from optimisetester import FAMILIES, add_variables, objective, solution_plan, solve, time_matrices
+from solcache import add_hint, solution_values
+
+# ---------------- Lazy Subtour Elimination ----------------
+# Solves without the static order rows (41,42) and sequence rows (43,44),
+# 2·K·n² big-M rows that rarely bind, then looks for truck cycles that do not
+# pass through the depot in the returned routes. Only the violated cuts are
+# added, either
+#
+#   "subtour":  sum of x[k, i, j] over i, j in S  <=  |S| - 1   for every tandem
+#   "circuit":  one AddCircuit over the arcs of each offending tandem
+#
+# and the model is re-solved, hinted with the previous solution, until the
+# routes are cycle free. The time rows (54) already forbid cycles of positive
+# travel time, so cuts are only needed where travel times round to zero.
+#
+# Dropping (43,44) leaves P free, which can only relax (62); that row is
+# implied by (54) and (57-60) along a cycle-free route anyway. The returned
+# values complete u, y and P from the route order, so they satisfy the full
+# model (see evaluator.violations).
+
+STATIC = ("41,42", "43,44")         # families left out of the relaxed model
+CUTS = ("subtour", "circuit")
+
+
+def build_relaxed(inst, t, t_prime, compact_delay=False):
+    """build_model without the STATIC families; returns (model, var)."""
+    model = cp_model.CpModel()
+    var = add_variables(model, inst, compact_delay)
+    for name, add in FAMILIES.items():
+        if name not in STATIC:
+            add(model, inst, t, t_prime, var)
+    model.Minimize(objective(inst, t, t_prime, var))
+    return model, var
+
+
+def routes(inst, successors):
+    """Split one tandem's arcs {i: j} into the depot route and its subtours."""
+    route, node = [], inst.depot
+    while node in successors and successors[node] != inst.depot and successors[node] not in route:
+        node = successors[node]
+        route.append(node)
+    cycles, seen = [], set(route) | {inst.depot}
+    for start in successors:
+        if start in seen:
+            continue
+        cycle, node = [], start
+        while node not in seen:
+            seen.add(node)
+            cycle.append(node)
+            node = successors.get(node, start)
+        cycles.append(cycle)
+    return route, cycles
+
+
+def find_subtours(solver, var, inst):
+    """{k: (route, subtours)} of the solver's truck arcs, per tandem."""
+    x = var["x"]
+    found = {}
+    for k in inst.K:
+        successors = {i: j for (kk, i, j), v in x.items() if kk == k and solver.Value(v)}
+        found[k] = routes(inst, successors)
+    return found
+
+
+def subtour_cut(model, inst, var, nodes):
+    x = var["x"]
+    for k in inst.K:
+        model.Add(sum(x[k, i, j] for i in nodes for j in nodes if i != j) <= len(nodes) - 1)
+
+
+def circuit(model, inst, var, k):
+    """Single depot circuit for tandem k; unvisited nodes take self loops."""
+    x, depot = var["x"], inst.depot
+    departs = x.sum(x.index[k, depot, :])
+    arcs = [(i, j, v) for (kk, i, j), v in x.items() if kk == k]
+    idle = model.NewBoolVar(f"idle_{k}")
+    model.Add(idle + departs == 1)
+    arcs.append((depot, depot, idle))
+    for j in range(1, inst.num_nodes):
+        visited = x.sum(x.index[k, :, j])
+        skip = model.NewBoolVar(f"skip_{k}_{j}")
+        model.Add(skip + visited == 1)
+        model.Add(visited <= departs)       # a circuit without the depot is a subtour
+        arcs.append((j, j, skip))
+    model.AddCircuit(arcs)
+
+
+def complete_values(solver, var, inst, found):
+    """Solution values with u, y and P rebuilt from the cycle-free routes."""
+    values = {f: {key: solver.Value(v) for key, v in family.items()} for f, family in var.items()}
+    for f in ("u", "y", "P"):
+        values[f] = dict.fromkeys(values[f], 0)
+    for k, (route, _) in found.items():
+        order = {node: position for position, node in enumerate(route, 1)}
+        for node, position in order.items():
+            values["u"][k, node] = position
+            values["y"][k, node] = 1
+        for (kk, i, j) in values["P"]:
+            if kk == k and i != inst.depot:
+                values["P"][k, i, j] = int(order.get(j, 0) > order.get(i, 0))
+    return values
+
+
+def lazy_solve(inst, t=None, t_prime=None, compact_delay=False, cut="subtour", max_rounds=50,
+               max_time_in_seconds=30, num_search_workers=8, params=None):
+    """Solve `inst` with lazily added subtour cuts; returns a dict with the last
+    solver, status, model and var, the per-round log ("rounds"), and for a
+    cycle-free solution its completed "values" and "plan".
+
+    The status is that of the last relaxed solve when its routes are cycle
+    free (or it is INFEASIBLE), and UNKNOWN when time or rounds run out first.
+    """
+    if cut not in CUTS:
+        raise ValueError(f"Unknown cut: {cut}")
+    if t is None or t_prime is None:
+        t, t_prime = time_matrices(inst)
+    start = time.time()
+    model, var = build_relaxed(inst, t, t_prime, compact_delay)
+    result = {"model": model, "var": var, "status": cp_model.UNKNOWN, "rounds": [],
+              "build_time": time.time() - start}
+    deadline = start + max_time_in_seconds
+    for _ in range(max_rounds):
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            break
+        solver, status = solve(model, remaining, num_search_workers, params)
+        result["solver"] = solver
+        entry = {"status": solver.StatusName(status), "wall_time": solver.WallTime(),
+                 "constraints": len(model.Proto().constraints), "subtours": 0}
+        result["rounds"].append(entry)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            if status == cp_model.INFEASIBLE:
+                result["status"] = status
+            break
+        entry["objective"] = solver.ObjectiveValue()
+        found = find_subtours(solver, var, inst)
+        offending = [k for k, (_, cycles) in found.items() if cycles]
+        if not offending:
+            result["status"] = status
+            result["values"] = complete_values(solver, var, inst, found)
+            result["plan"] = solution_plan(solver, var, inst)
+            break
+        entry["subtours"] = sum(len(found[k][1]) for k in offending)
+        if cut == "circuit":
+            for k in offending:
+                circuit(model, inst, var, k)
+        else:
+            for k in offending:
+                for nodes in found[k][1]:
+                    subtour_cut(model, inst, var, nodes)
+        add_hint(model, var, {"values": solution_values(solver, var)})
+    result["wall_time"] = time.time() - start
+    return result
+
+
+if __name__ == "__main__":
+    import random
+
+    from instance import random_instance
+    from optimisetester import build_model
+
+    for n, N in ((8, 2), (12, 2), (16, 3)):
+        inst = random_instance(random.Random(n), n, N=N)
+        t, t_prime = time_matrices(inst)
+        full, _ = build_model(inst, t, t_prime)
+        result = lazy_solve(inst, t, t_prime, max_time_in_seconds=60)
+        solver = result["solver"]
+        print(f"n={n}, N={N}: {len(full.Proto().constraints)} static rows, lazy "
+              f"{[r['constraints'] for r in result['rounds']]} over {len(result['rounds'])} round(s), "
+              f"{solver.StatusName(result['status'])} {result['plan']['objective'] if 'plan' in result else None} "
+              f"in {result['wall_time']:.2f}s")
+        if "values" in result:
+            print("    full-model violations:", evaluator.violations(inst, t, t_prime, result["values"]))
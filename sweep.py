@@ -0,0 +1,151 @@
+import argparse
+import csv
+import dataclasses
+import itertools
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from ortools.sat.python import cp_model
+
+from instance import default_instance, load_instance
+from optimisetester import build_model, solution_plan, solve, time_matrices
+from sharedmat import SharedMatrices, attach
+from solcache import add_hint, solution_values
+from whatif import rebuild_model
+
+# ---------------- Parameter Sweep ----------------
+# Solves one scenario for many settings of alpha_value, beta_value, E, T,
+# horizon, WT_max and N. The travel matrices depend only on the nodes and are
+# computed once. Points with the same N share one built model: every point is
+# a copy of it with only the families its parameters feed into rebuilt (see
+# whatif.rebuild_model), and starts from the solution of the point before it
+# as a hint. Points are split into chains, one per N and at most `jobs` in
+# total; chains run in parallel processes, each reading the matrices from
+# shared memory.
+
+FIELDS = ("alpha_value", "beta_value", "E", "T", "horizon", "WT_max", "N")
+COLUMNS = ("status", "objective", "bound", "wall_time", "served", "unserved", "hinted")
+
+
+def point_instance(inst, point):
+    """`inst` with the sweep point {field: value} applied."""
+    changes = {}
+    for field, value in point.items():
+        if field not in FIELDS:
+            raise ValueError(f"Unsupported sweep parameter: {field}")
+        if field == "alpha_value":
+            changes["alpha"] = {i: value for i in inst.C}
+        elif field == "beta_value":
+            changes["beta"] = {i: value for i in inst.C}
+        else:
+            changes[field] = value
+    return dataclasses.replace(inst, **changes)
+
+
+def grid(**values):
+    """Cartesian product of {field: [values]} as a list of points."""
+    names = list(values)
+    return [dict(zip(names, combo)) for combo in itertools.product(*values.values())]
+
+
+def chains(points, jobs):
+    """Split point indices into chains: one per N, cut into runs of
+    neighbouring points until there are about `jobs` of them."""
+    by_n = {}
+    for index, point in enumerate(points):
+        by_n.setdefault(point.get("N"), []).append(index)
+    groups = list(by_n.values())
+    pieces = max(1, jobs // len(groups))
+    out = []
+    for group in groups:
+        size = -(-len(group) // pieces)
+        out += [group[start:start + size] for start in range(0, len(group), size)]
+    return out
+
+
+def run_chain(inst, points, matrices=None, compact_delay=False, max_time_in_seconds=30,
+              num_search_workers=8, params=None):
+    """Solve consecutive `points` that share N; returns one row per point."""
+    t, t_prime = attach(matrices) if matrices is not None else time_matrices(inst)
+    base = point_instance(inst, {"N": points[0]["N"]} if "N" in points[0] else {})
+    rows = {}
+    skeleton, var = build_model(base, t, t_prime, compact_delay, rows=rows)
+    previous = None
+    table = []
+    for point in points:
+        target = point_instance(inst, point)
+        model = rebuild_model(skeleton, var, rows, base, target, t, t_prime)
+        if previous is not None:
+            add_hint(model, var, previous)
+        solver, status = solve(model, max_time_in_seconds, num_search_workers, params)
+        row = dict(point, status=solver.StatusName(status), wall_time=solver.WallTime(),
+                   hinted=previous is not None)
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            plan = solution_plan(solver, var, target)
+            row.update(objective=solver.ObjectiveValue(), bound=solver.BestObjectiveBound(),
+                       served=len(target.C) - len(plan["unserved"]), unserved=len(plan["unserved"]))
+            previous = {"values": solution_values(solver, var)}
+        table.append(row)
+    return table
+
+
+def _run_chain(task):
+    indices, args = task
+    return indices, run_chain(*args)
+
+
+def sweep(inst, points, jobs=1, compact_delay=False, max_time_in_seconds=30, num_search_workers=8,
+          params=None):
+    """Solve `inst` at every point; returns the rows in the order of `points`."""
+    plan = chains(points, jobs)
+    rows = [None] * len(points)
+    if jobs > 1 and len(plan) > 1:
+        with SharedMatrices(*time_matrices(inst)) as shared, ProcessPoolExecutor(min(jobs, len(plan))) as pool:
+            tasks = [(indices, (inst, [points[i] for i in indices], shared.handle, compact_delay,
+                                max_time_in_seconds, num_search_workers, params)) for indices in plan]
+            results = list(pool.map(_run_chain, tasks))
+    else:
+        matrices = time_matrices(inst)
+        results = [_run_chain((indices, (inst, [points[i] for i in indices], matrices, compact_delay,
+                                         max_time_in_seconds, num_search_workers, params)))
+                   for indices in plan]
+    for indices, table in results:
+        for index, row in zip(indices, table):
+            rows[index] = row
+    return rows
+
+
+def write_table(rows, out, fields=()):
+    """Write sweep rows as CSV, point fields first."""
+    fields = list(fields) or [f for f in FIELDS if any(f in row for row in rows)]
+    writer = csv.DictWriter(out, fieldnames=fields + list(COLUMNS), extrasaction="ignore")
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def _values(text):
+    field, _, values = text.partition("=")
+    cast = float if field in ("alpha_value", "beta_value") else int
+    return field, [cast(v) for v in values.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve an instance over a grid of parameter values.")
+    parser.add_argument("instance", nargs="?")
+    parser.add_argument("--grid", type=_values, action="append", required=True, metavar="FIELD=V1,V2,...",
+                        help=f"values of one of {', '.join(FIELDS)} (repeat for a product grid)")
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--time-limit", type=float, default=30)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--compact-delay", action="store_true")
+    parser.add_argument("-o", "--output", help="CSV file (default: stdout)")
+    args = parser.parse_args()
+
+    inst = default_instance() if args.instance is None else load_instance(args.instance)
+    points = grid(**dict(args.grid))
+    rows = sweep(inst, points, args.jobs, args.compact_delay, args.time_limit, args.workers)
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            write_table(rows, f, [field for field, _ in args.grid])
+    else:
+        write_table(rows, sys.stdout, [field for field, _ in args.grid])
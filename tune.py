@@ -0,0 +1,194 @@
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from ortools.sat.python import cp_model
+
+from instance import random_instance
+from optimisetester import build_model, solve, time_matrices
+from sharedmat import SharedMatrices, attach
+
+# ---------------- Parameter Tuning ----------------
+# Searches CP-SAT parameters on a set of generated instances and writes the
+# best configuration as a profile file that optimisetester.solve can load
+# (see optimisetester.load_profile). A configuration is scored by its mean
+# time to reach the target gap, with unfinished runs counted as twice the
+# time limit (PAR2).
+#
+# Times are wall-clock seconds. Parallel evaluation (jobs > 1) would let
+# the solves compete for cores and skew that clock, so it runs at most one
+# job per core and pins every configuration to its share of them (see
+# pinned_configs).
+
+SEARCH_SPACE = {
+    "num_search_workers": [1, 4, 8],
+    "linearization_level": [0, 1, 2],
+    "search_branching": ["AUTOMATIC_SEARCH", "FIXED_SEARCH", "PORTFOLIO_SEARCH"],
+    "symmetry_level": [0, 2],
+    "cp_model_presolve": [True, False],
+    "cp_model_probing_level": [0, 2],
+}
+
+
+def benchmark_instances(count, n, N=2, seed=0):
+    rng = random.Random(seed)
+    return [random_instance(rng, n, N=N) for _ in range(count)]
+
+
+def time_to_target(params, inst, target_gap=0.0, time_limit=10.0, matrices=None):
+    """Seconds the configuration needs to reach `target_gap` on `inst`.
+
+    matrices is (t, t_prime) or a sharedmat.MatrixHandle; by default they are
+    computed from `inst`.
+    """
+    t, t_prime = attach(matrices) if matrices is not None else time_matrices(inst)
+    model, _ = build_model(inst, t, t_prime)
+    params = dict(params, relative_gap_limit=target_gap)
+    solver, status = solve(model, max_time_in_seconds=time_limit, params=params)
+    if status == cp_model.OPTIMAL:
+        return solver.WallTime()
+    if status == cp_model.FEASIBLE:
+        obj, bound = solver.ObjectiveValue(), solver.BestObjectiveBound()
+        if abs(obj - bound) <= target_gap * max(1.0, abs(obj)):
+            return solver.WallTime()
+    return 2 * time_limit
+
+
+def _run_one(task):
+    index, params, inst, target_gap, time_limit, matrices = task
+    return index, time_to_target(params, inst, target_gap, time_limit, matrices)
+
+
+def pinned_configs(configs, jobs, cores=None):
+    """(configs, jobs) for running solves side by side without oversubscribing.
+
+    jobs is capped at the cores, and each configuration's num_search_workers
+    (8 when unset, as in optimisetester.solve) at cores // jobs, so that
+    jobs x workers <= cores.
+    """
+    cores = cores or os.cpu_count() or 1
+    jobs = max(1, min(jobs, cores))
+    workers = cores // jobs
+    return [dict(params, num_search_workers=min(params.get("num_search_workers", 8), workers))
+            for params in configs], jobs
+
+
+def evaluate(configs, instances, target_gap, time_limit, jobs=1):
+    """Mean PAR2 time-to-target of every configuration over `instances`.
+
+    Scores are wall-clock seconds. With jobs > 1 the configurations run
+    pinned by pinned_configs, so a configuration asking for more search
+    workers than its share of the cores is scored with the smaller count.
+    """
+    times = [[] for _ in configs]
+    if jobs > 1:
+        configs, jobs = pinned_configs(configs, jobs)
+    if jobs > 1:                    # still parallel on more than one core
+        # Every configuration runs on the same instances: publish their matrices once
+        shared = [SharedMatrices(*time_matrices(inst)) for inst in instances]
+        try:
+            tasks = [(c, params, inst, target_gap, time_limit, matrices.handle)
+                     for c, params in enumerate(configs) for inst, matrices in zip(instances, shared)]
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(_run_one, tasks))
+        finally:
+            for matrices in shared:
+                matrices.close()
+    else:
+        tasks = [(c, params, inst, target_gap, time_limit, None)
+                 for c, params in enumerate(configs) for inst in instances]
+        results = map(_run_one, tasks)
+    for c, seconds in results:
+        times[c].append(seconds)
+    return [sum(ts) / len(ts) for ts in times]
+
+
+# ---------------- Search Strategies ----------------
+def grid_configs(space=SEARCH_SPACE):
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*space.values())]
+
+
+def random_configs(count, rng, space=SEARCH_SPACE):
+    configs = []
+    seen = set()
+    total = math.prod(len(v) for v in space.values())
+    while len(configs) < min(count, total):
+        params = {name: rng.choice(values) for name, values in space.items()}
+        key = tuple(params.values())
+        if key not in seen:
+            seen.add(key)
+            configs.append(params)
+    return configs
+
+
+def successive_halving(configs, instances, target_gap, time_limit, jobs=1, eta=2):
+    """Evaluate on a growing prefix of `instances`, keeping the best 1/eta each round."""
+    rounds = max(1, math.ceil(math.log(max(len(configs), 1), eta)))
+    scored = []
+    for r in range(rounds + 1):
+        m = max(1, len(instances) * eta ** r // eta ** rounds)
+        scores = evaluate(configs, instances[:m], target_gap, time_limit, jobs)
+        scored = sorted(zip(scores, range(len(configs))), key=lambda s: s[0])
+        if len(configs) == 1 or r == rounds:
+            break
+        keep = max(1, math.ceil(len(configs) / eta))
+        configs = [configs[c] for _, c in scored[:keep]]
+        scored = scored[:keep]
+    return [(score, configs[c]) for score, c in scored]
+
+
+def tune(instances, strategy="random", configs=20, target_gap=0.0, time_limit=10.0,
+         jobs=1, seed=0, space=SEARCH_SPACE):
+    """Return [(score, params), ...] best first."""
+    rng = random.Random(seed)
+    if strategy == "grid":
+        candidates = grid_configs(space)
+    else:
+        candidates = random_configs(configs, rng, space)
+    if strategy == "halving":
+        return successive_halving(candidates, instances, target_gap, time_limit, jobs)
+    scores = evaluate(candidates, instances, target_gap, time_limit, jobs)
+    return sorted(zip(scores, candidates), key=lambda s: s[0])
+
+
+def write_profile(path, ranked, **meta):
+    score, params = ranked[0]
+    profile = {
+        "params": params,
+        "score": score,
+        **meta,
+        "ranking": [{"score": s, "params": p} for s, p in ranked[:10]],
+    }
+    with open(path, "w") as f:
+        json.dump(profile, f, indent=2)
+    return profile
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tune CP-SAT parameters on generated instances.")
+    parser.add_argument("--strategy", choices=["grid", "random", "halving"], default="random")
+    parser.add_argument("--configs", type=int, default=20, help="configurations sampled (random/halving)")
+    parser.add_argument("--instances", type=int, default=6)
+    parser.add_argument("--nodes", type=int, default=7)
+    parser.add_argument("--tandems", type=int, default=2)
+    parser.add_argument("--target-gap", type=float, default=0.0)
+    parser.add_argument("--time-limit", type=float, default=10.0)
+    parser.add_argument("--jobs", type=int, default=1, help="solves run in parallel (at most one per core)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="profile.json")
+    args = parser.parse_args()
+
+    instances = benchmark_instances(args.instances, args.nodes, args.tandems, args.seed)
+    ranked = tune(instances, args.strategy, args.configs, args.target_gap,
+                  args.time_limit, args.jobs, args.seed)
+    write_profile(args.output, ranked, strategy=args.strategy, target_gap=args.target_gap,
+                  time_limit=args.time_limit, instances=args.instances, nodes=args.nodes,
+                  tandems=args.tandems, seed=args.seed)
+    for score, params in ranked[:5]:
+        print(f"{score:8.3f}s  {params}")
+    print(f"Profile written to {args.output}")
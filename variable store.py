@@ -0,0 +1,73 @@
+import random
+import time
+
+import numpy as np
+import pytest
+
+from instance import default_instance, model_size, random_instance
+from optimisetester import build_model, proper_sorties, solve
+from varstore import VarArray, distinct
+
+#-----------------------------------------------------------------------------------------
+# Variable store: families as NumPy arrays of proto indices, -1 where absent
+#-----------------------------------------------------------------------------------------
+
+def run_case(inst):
+    rows = {}
+    start = time.time()
+    model, var = build_model(inst, rows=rows)
+    return model, var, rows, time.time() - start
+
+#-----------------------------------------------------------------------------------------
+# Tests
+#-----------------------------------------------------------------------------------------
+def test_store_reads_like_a_dict():
+    model, var, _, _ = run_case(default_instance())
+    x, delay = var["x"], var["delay"]
+    assert x[1, 2, 3].Name() == "x_1_2_3"
+    assert (1, 2, 3) in x and (1, 2, 2) not in x and (2, 0, 1) not in x and (0, 1) not in x
+    assert x.get((0, 3, 3)) is None
+    assert list(x)[:3] == [(0, 0, 1), (0, 0, 2), (0, 0, 3)]
+    assert [v.Index() for v in x.values()] == [int(i) for i in x.index[x.index >= 0]]
+    assert (0, 0) not in delay and delay[0, 1].Name() == "delay_0_1"
+
+def test_store_sizes_match_model_size():
+    inst = random_instance(random.Random(5), 6, N=3)
+    for compact in (False, True):
+        _, var = build_model(inst, compact_delay=compact)
+        size = model_size(inst, compact)
+        assert {name: len(family) for name, family in var.items()} == \
+            {name: size[name] for name in var}
+    assert list(var["delay"]) == sorted(inst.C)
+
+def test_store_slices():
+    model, var, _, _ = run_case(default_instance())
+    y_drone, sorties = var["y_drone"], proper_sorties(var)
+    launched = {v.Name() for v in y_drone.vars(sorties[1, 4])}
+    expected = {f"y_drone_1_4_{j}_{l}" for j in range(1, 8) for l in range(1, 8) if len({4, j, l}) == 3}
+    assert launched == expected
+    assert y_drone.sum(sorties[0, :, 3, 3]) == 0
+    assert distinct(3, 2).tolist() == [[False, True, True], [True, False, True], [True, True, False]]
+
+def test_store_model_unchanged():
+    model, var, rows, _ = run_case(default_instance())
+    assert len(model.Proto().constraints) == 3061
+    assert len(rows["62"]) == 2 * (7 * 6 + 7 * 6 * 5)    # distinct (i, l, b) per tandem
+    solver, _ = solve(model, max_time_in_seconds=20)
+    assert solver.ObjectiveValue() == 433
+
+def test_store_unset_key():
+    store = VarArray(None, (2, 3))
+    assert len(store) == 0 and (1, 1) not in store
+    with pytest.raises(KeyError):
+        store[1, 1]
+    assert np.all(store.index == -1)
+
+#-----------------------------------------------------------------------------------------
+# Feedback
+#-----------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    for n in (8, 12, 16, 20):
+        model, var, rows, elapsed = run_case(random_instance(random.Random(0), n, N=2))
+        print(f"n={n}: {len(model.Proto().variables)} variables, {len(model.Proto().constraints)} "
+              f"constraints, built in {elapsed:.2f}s")
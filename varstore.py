@@ -0,0 +1,93 @@
+import numpy as np
+
+from ortools.sat.python import cp_model
+
+# ---------------- Variable Store ----------------
+# A variable family kept as an integer array of CP-SAT proto indices instead
+# of a tuple-keyed dict of variable objects. Position (k, i, j, l) of the array
+# holds the index of variable y_drone[k, i, j, l], or -1 where the family has
+# no such variable. Slices select whole groups at once, e.g. all sorties of
+# tandem k launched at i:
+#
+#   y_drone.vars(y_drone.index[k, i])
+#
+# Variable objects are only created when a key or slice is read, so a built
+# model holds one integer per variable on the Python side. For everything
+# else a VarArray reads like the dict it replaces: var["x"][k, i, j], `in`,
+# keys(), items() and len() all work, with keys in ascending order.
+
+
+class VarArray:
+    """Variables of one family, stored by key in a NumPy index array."""
+
+    def __init__(self, model, shape):
+        self.model = model
+        self.index = np.full(shape, -1, dtype=np.int32)
+
+    def _key(self, key):
+        return key if isinstance(key, tuple) else (key,)
+
+    def __setitem__(self, key, v):
+        self.index[self._key(key)] = v.Index()
+
+    def __getitem__(self, key):
+        key = self._key(key)
+        if key not in self:
+            raise KeyError(key[0] if len(key) == 1 else key)
+        return self.model.GetIntVarFromProtoIndex(int(self.index[key]))
+
+    def __contains__(self, key):
+        key = self._key(key)
+        if len(key) != self.index.ndim:
+            return False
+        for k, size in zip(key, self.index.shape):
+            if not isinstance(k, (int, np.integer)) or not 0 <= k < size:
+                return False
+        return bool(self.index[key] >= 0)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.index >= 0))
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):
+        keys = np.argwhere(self.index >= 0).tolist()
+        if self.index.ndim == 1:
+            return [key[0] for key in keys]
+        return [tuple(key) for key in keys]
+
+    def values(self):
+        return self.vars(self.index[self.index >= 0])
+
+    def items(self):
+        return list(zip(self.keys(), self.values()))
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    # ---- vectorized access ----
+    def vars(self, index):
+        """Variables of the present (>= 0) entries of an index array or slice."""
+        index = np.asarray(index).ravel()
+        return [self.model.GetIntVarFromProtoIndex(int(i)) for i in index[index >= 0]]
+
+    def sum(self, index):
+        """Sum of the variables of an index array or slice (0 when none is present)."""
+        terms = self.vars(index)
+        return cp_model.LinearExpr.Sum(terms) if terms else 0
+
+
+def masked(index, keep):
+    """Copy of an index array with -1 wherever `keep` is False."""
+    return np.where(keep, index, -1)
+
+
+def distinct(n, dims):
+    """Boolean mask over range(n)**dims that is True where all coordinates differ."""
+    grids = np.ix_(*[np.arange(n)] * dims)
+    keep = np.ones((n,) * dims, dtype=bool)
+    for a in range(dims):
+        for b in range(a + 1, dims):
+            keep &= grids[a] != grids[b]
+    return keep
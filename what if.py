@@ -0,0 +1,76 @@
+import random
+
+import pytest
+from ortools.sat.python import cp_model
+
+from instance import random_instance
+from optimisetester import build_model, solve
+from whatif import WhatIf, apply_delta
+
+#-----------------------------------------------------------------------------------------
+# What-if re-solve: patched copy of the baseline model vs a model rebuilt from scratch
+#-----------------------------------------------------------------------------------------
+
+def baseline(seed=0):
+    return WhatIf(random_instance(random.Random(seed), 5, N=2), max_time_in_seconds=20)
+
+def run_case(base, **delta):
+    result = base.ask(max_time_in_seconds=20, **delta)
+    model, _ = build_model(apply_delta(base.inst, delta))
+    solver, status = solve(model, max_time_in_seconds=20)
+    assert status == cp_model.OPTIMAL
+    return result, solver.ObjectiveValue()
+
+#-----------------------------------------------------------------------------------------
+# Tests
+#-----------------------------------------------------------------------------------------
+def test_whatif_deadline():
+    base = baseline(1)
+    result, rebuilt = run_case(base, D={i: 5 for i in base.inst.C})
+    assert result["status"] == "OPTIMAL" and result["plan"]["objective"] == rebuilt
+
+def test_whatif_road_access():
+    base = baseline(2)
+    result, rebuilt = run_case(base, VT=base.inst.C)
+    assert result["plan"]["objective"] == rebuilt
+
+def test_whatif_weights_and_capacity():
+    base = baseline(3)
+    result, rebuilt = run_case(base, w={i: 8 for i in base.inst.C}, WT_max=4)
+    assert result["plan"]["objective"] == rebuilt
+
+def test_whatif_drone_set_and_endurance():
+    base = baseline(4)
+    result, rebuilt = run_case(base, VD=set(), E=1)
+    assert result["plan"]["objective"] == rebuilt
+    assert result["plan"]["drone"] == {}
+
+def test_whatif_penalties_diff():
+    base = baseline(5)
+    result, rebuilt = run_case(base, beta={i: 0 for i in base.inst.C})
+    assert result["plan"]["objective"] == rebuilt
+    assert result["diff"]["objective"] == rebuilt - base.plan["objective"]
+
+def test_whatif_unchanged_is_empty_diff():
+    base = baseline(6)
+    result = base.ask(D={})
+    assert result["diff"]["objective"] == 0
+    assert result["diff"]["newly_unserved"] == result["diff"]["newly_served"] == []
+
+def test_whatif_rejects_structural_change():
+    with pytest.raises(ValueError):
+        baseline(7).ask(N=3)
+
+#-----------------------------------------------------------------------------------------
+# Feedback
+#-----------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    base = baseline(1)
+    scenarios = [
+        ("tight deadlines", dict(D={i: 5 for i in base.inst.C})),
+        ("all roads damaged", dict(VT=base.inst.C)),
+        ("no drones", dict(VD=set())),
+    ]
+    for label, delta in scenarios:
+        result, rebuilt = run_case(base, **delta)
+        print(f"{label}: what-if={result['plan']['objective']} rebuilt={rebuilt} diff={result['diff']}")
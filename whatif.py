@@ -0,0 +1,164 @@
+import dataclasses
+
+from ortools.sat.python import cp_model
+
+from optimisetester import (FAMILIES, apply_params, build_model, objective, solution_plan,
+                            time_matrices)
+
+# ---------------- What-if Re-solve ----------------
+# Answers "what if" questions against a solved baseline without rebuilding the
+# model: each question copies the baseline CpModelProto, clears only the rows of
+# the constraint families its parameters feed into, posts those families again
+# with the changed parameters, warm-starts from the baseline solution and
+# reports the new plan with a diff against the baseline. The horizon only
+# bounds the time variables, so it is patched into their domains.
+
+# Instance field -> constraint families built from it
+AFFECTS = {
+    "D": ["63"],
+    "w": ["45"],
+    "WT_max": ["45"],
+    "E": ["61"],
+    "T": ["53", "54", "55,56", "57,60", "61", "62", "63"],
+    "horizon": [],
+    "VT": ["40", "49"],
+    "VD": ["y_drone", "45", "46", "49", "63"],
+    "alpha": [],
+    "beta": [],
+}
+OBJECTIVE_FIELDS = {"alpha", "beta"}
+TIMES = ("a", "a_prime", "delay")       # families whose domains end at the horizon
+
+
+def apply_delta(inst, delta):
+    """Copy of `inst` with `delta` applied.
+
+    D, alpha, beta and w take {node: value} updates; VT and VD take the new
+    sets; E, T, horizon and WT_max take new values.
+    """
+    changes = {}
+    for field, value in delta.items():
+        if field not in AFFECTS:
+            raise ValueError(f"Unsupported what-if parameter: {field}")
+        if field in ("D", "alpha", "beta"):
+            changes[field] = {**getattr(inst, field), **value}
+        elif field == "w":
+            w = list(inst.w)
+            for node, weight in value.items():
+                w[node] = weight
+            changes[field] = w
+        elif field in ("VT", "VD"):
+            changes[field] = set(value)
+        else:
+            changes[field] = value
+    return dataclasses.replace(inst, **changes)
+
+
+def rebuild_model(model, var, rows, base, inst, t, t_prime):
+    """Copy of `model`, built for `base` with row indices `rows`, rebuilt for
+    `inst` where it differs. Raises ValueError for fields outside AFFECTS."""
+    fields = [f.name for f in dataclasses.fields(inst) if getattr(inst, f.name) != getattr(base, f.name)]
+    model = model.Clone()
+    constraints = model.Proto().constraints
+    families = []
+    for field in fields:
+        if field not in AFFECTS:
+            raise ValueError(f"Unsupported what-if parameter: {field}")
+        families += [f for f in AFFECTS[field] if f not in families]
+    for family in families:
+        for index in rows[family]:
+            constraints[index].copy_from(type(constraints[index])())
+        FAMILIES[family](model, inst, t, t_prime, var)
+    if "horizon" in fields:
+        variables = model.Proto().variables
+        for f in TIMES:
+            for v in var[f].values():
+                variables[v.Index()].domain[1] = inst.horizon
+    if OBJECTIVE_FIELDS & set(fields):
+        model.Minimize(objective(inst, t, t_prime, var))
+    return model
+
+
+def plan_diff(old, new):
+    """What changed between two solution_plan results."""
+    def split(before, after):
+        return {
+            "added": sorted(set(after) - set(before)),
+            "removed": sorted(set(before) - set(after)),
+            "retimed": {key: (before[key], after[key]) for key in sorted(set(before) & set(after))
+                        if before[key] != after[key]},
+        }
+    return {
+        "objective": new["objective"] - old["objective"],
+        "truck": split(old["truck"], new["truck"]),
+        "drone": split(old["drone"], new["drone"]),
+        "newly_unserved": sorted(set(new["unserved"]) - set(old["unserved"])),
+        "newly_served": sorted(set(old["unserved"]) - set(new["unserved"])),
+    }
+
+
+class WhatIf:
+    """A solved baseline that what-if questions are answered against."""
+
+    def __init__(self, inst, compact_delay=False, max_time_in_seconds=30,
+                 num_search_workers=8, params=None):
+        self.inst = inst
+        self.t, self.t_prime = time_matrices(inst)
+        self.rows = {}
+        self.model, self.var = build_model(inst, self.t, self.t_prime, compact_delay, rows=self.rows)
+        self.num_search_workers = num_search_workers
+        self.params = params
+        solver, self.status = self._solve(self.model, max_time_in_seconds)
+        if self.status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            raise RuntimeError(f"Baseline has no solution: {solver.StatusName(self.status)}")
+        self.values = {(f, key): solver.Value(v) for f, family in self.var.items()
+                       for key, v in family.items()}
+        self.plan = solution_plan(solver, self.var, inst)
+
+    def _solve(self, model, max_time_in_seconds):
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = max_time_in_seconds
+        solver.parameters.num_search_workers = self.num_search_workers
+        if self.params:
+            apply_params(solver, self.params)
+        return solver, solver.Solve(model)
+
+    def delta_model(self, inst):
+        """Copy of the baseline model rebuilt for `inst` where it differs."""
+        model = rebuild_model(self.model, self.var, self.rows, self.inst, inst, self.t, self.t_prime)
+        for (f, key), value in self.values.items():
+            model.AddHint(self.var[f][key], value)
+        return model
+
+    def ask(self, max_time_in_seconds=10, **delta):
+        """Re-solve with `delta` applied (see apply_delta) and diff against the baseline."""
+        inst = apply_delta(self.inst, delta)
+        model = self.delta_model(inst)
+        solver, status = self._solve(model, max_time_in_seconds)
+        result = {"status": solver.StatusName(status), "instance": inst, "delta": delta}
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            plan = solution_plan(solver, self.var, inst)
+            result.update(plan=plan, diff=plan_diff(self.plan, plan))
+        return result
+
+
+if __name__ == "__main__":
+    from instance import default_instance
+
+    baseline = WhatIf(default_instance())
+    print("Baseline objective:", baseline.plan["objective"])
+    questions = [
+        ("node 4 deadline moves to 30", dict(D={4: 30})),
+        ("road to node 6 closes", dict(VT=baseline.inst.VT | {6})),
+        ("node 2 needs 3 more units", dict(w={2: baseline.inst.w[2] + 3})),
+        ("unserved penalty doubles", dict(beta={i: 2 * b for i, b in baseline.inst.beta.items()})),
+    ]
+    for label, delta in questions:
+        result = baseline.ask(**delta)
+        print(f"\n{label}: {result['status']}")
+        if "diff" in result:
+            print("  objective:", result["plan"]["objective"], f"({result['diff']['objective']:+})")
+            for part in ("truck", "drone"):
+                for change, items in result["diff"][part].items():
+                    if items:
+                        print(f"  {part} {change}: {items}")